@@ -0,0 +1,38 @@
+"""add_invoice_number_counters
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b4c5d6e7f8'
+down_revision: Union[str, Sequence[str], None] = 'f2a3b4c5d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'invoice_number_counters',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Continue from the numbers handed out so far, which followed the highest invoice id
+    op.execute(
+        "INSERT INTO invoice_number_counters (name, last_value) "
+        "SELECT 'invoice_number', COALESCE(MAX(id), 0) FROM invoices"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('invoice_number_counters')
@@ -0,0 +1,52 @@
+"""add_revaluation_jobs
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, Sequence[str], None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'revaluation_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('base_currency', sa.String(length=10), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('phase', sa.String(length=20), nullable=True),
+        sa.Column('checkpoint_id', sa.Integer(), nullable=True),
+        sa.Column('invoices_total', sa.Integer(), nullable=True),
+        sa.Column('invoices_processed', sa.Integer(), nullable=True),
+        sa.Column('invoices_changed', sa.Integer(), nullable=True),
+        sa.Column('expenses_total', sa.Integer(), nullable=True),
+        sa.Column('expenses_processed', sa.Integer(), nullable=True),
+        sa.Column('expenses_changed', sa.Integer(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_revaluation_jobs_id'), 'revaluation_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_revaluation_jobs_user_id'), 'revaluation_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_revaluation_jobs_user_id'), table_name='revaluation_jobs')
+    op.drop_index(op.f('ix_revaluation_jobs_id'), table_name='revaluation_jobs')
+    op.drop_table('revaluation_jobs')
@@ -1,7 +1,7 @@
 """add_client_deposit_fields
 
 Revision ID: add_client_deposit_fields
-Revises: final_merge_heads
+Revises: b2c3d4e5f6a7
 Create Date: 2025-01-20 12:00:00.000000
 
 """
@@ -12,7 +12,7 @@ from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
 revision = 'add_client_deposit_fields'
-down_revision = 'final_merge_heads'
+down_revision = 'b2c3d4e5f6a7'
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,55 @@
+"""add_ar_aging_snapshots
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, Sequence[str], None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'ar_aging_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('currency', sa.String(length=10), nullable=True),
+        sa.Column('current', sa.Float(), nullable=True),
+        sa.Column('days_1_30', sa.Float(), nullable=True),
+        sa.Column('days_31_60', sa.Float(), nullable=True),
+        sa.Column('days_61_90', sa.Float(), nullable=True),
+        sa.Column('days_over_90', sa.Float(), nullable=True),
+        sa.Column('total_outstanding', sa.Float(), nullable=True),
+        sa.Column('open_invoices', sa.Integer(), nullable=True),
+        sa.Column('trailing_sales', sa.Float(), nullable=True),
+        sa.Column('dso', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ar_aging_snapshots_id'), 'ar_aging_snapshots', ['id'], unique=False)
+    op.create_index('ix_ar_aging_snapshots_user_id_snapshot_date', 'ar_aging_snapshots', ['user_id', 'snapshot_date'], unique=True)
+    op.create_index(
+        'ix_invoices_created_by_due_date', 'invoices', ['created_by', 'due_date'], unique=False,
+        postgresql_include=['client_id', 'status', 'total_amount', 'paid_amount', 'exchange_rate'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_invoices_created_by_due_date', table_name='invoices')
+    op.drop_index('ix_ar_aging_snapshots_user_id_snapshot_date', table_name='ar_aging_snapshots')
+    op.drop_index(op.f('ix_ar_aging_snapshots_id'), table_name='ar_aging_snapshots')
+    op.drop_table('ar_aging_snapshots')
@@ -0,0 +1,46 @@
+"""add_tenant_covering_indexes
+
+Revision ID: c3d4e5f6a7b8
+Revises: add_client_deposit_fields, add_deposit_return_history, add_tax_columns_to_recurring_invoices
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, Sequence[str], None] = (
+    'add_client_deposit_fields',
+    'add_deposit_return_history',
+    'add_tax_columns_to_recurring_invoices',
+)
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_invoices_created_by_status_issue_date',
+        'invoices',
+        ['created_by', 'status', 'issue_date'],
+        unique=False,
+        postgresql_include=['currency', 'total_amount', 'base_currency_amount', 'paid_amount', 'client_id'],
+    )
+    op.create_index(
+        'ix_expenses_created_by_date_category_id',
+        'expenses',
+        ['created_by', 'date', 'category_id'],
+        unique=False,
+        postgresql_include=['base_currency_amount', 'vendor'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_created_by_date_category_id', table_name='expenses')
+    op.drop_index('ix_invoices_created_by_status_issue_date', table_name='invoices')
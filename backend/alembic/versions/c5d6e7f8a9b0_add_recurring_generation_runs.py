@@ -0,0 +1,54 @@
+"""add_recurring_generation_runs
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d6e7f8a9b0'
+down_revision: Union[str, Sequence[str], None] = 'b4c5d6e7f8a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'recurring_generation_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=True),
+        sa.Column('shards', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('as_of', sa.Date(), nullable=True),
+        sa.Column('worker', sa.String(length=100), nullable=True),
+        sa.Column('generated', sa.Integer(), nullable=True),
+        sa.Column('failed', sa.Integer(), nullable=True),
+        sa.Column('batches', sa.Integer(), nullable=True),
+        sa.Column('shards_done', sa.Integer(), nullable=True),
+        sa.Column('shards_skipped', sa.Integer(), nullable=True),
+        sa.Column('duration_ms', sa.Float(), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['requested_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_recurring_generation_runs_id'), 'recurring_generation_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_recurring_generation_runs_requested_by'), 'recurring_generation_runs', ['requested_by'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_recurring_generation_runs_requested_by'), table_name='recurring_generation_runs')
+    op.drop_index(op.f('ix_recurring_generation_runs_id'), table_name='recurring_generation_runs')
+    op.drop_table('recurring_generation_runs')
@@ -0,0 +1,56 @@
+"""add_change_log_and_sync_indexes
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, Sequence[str], None] = 'c3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UPDATED_AT_INDEXES = [
+    ('ix_invoices_created_by_updated_at', 'invoices', ['created_by', 'updated_at']),
+    ('ix_expenses_created_by_updated_at', 'expenses', ['created_by', 'updated_at']),
+    ('ix_clients_created_by_updated_at', 'clients', ['created_by', 'updated_at']),
+    ('ix_recurring_invoices_created_by_updated_at', 'recurring_invoices', ['created_by', 'updated_at']),
+    ('ix_invoice_templates_user_id_updated_at', 'invoice_templates', ['user_id', 'updated_at']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_change_log_id'), 'change_log', ['id'], unique=False)
+    op.create_index('ix_change_log_user_id_id', 'change_log', ['user_id', 'id'], unique=False)
+
+    for name, table, columns in UPDATED_AT_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(UPDATED_AT_INDEXES):
+        op.drop_index(name, table_name=table)
+
+    op.drop_index('ix_change_log_user_id_id', table_name='change_log')
+    op.drop_index(op.f('ix_change_log_id'), table_name='change_log')
+    op.drop_table('change_log')
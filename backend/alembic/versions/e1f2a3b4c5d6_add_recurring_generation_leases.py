@@ -0,0 +1,40 @@
+"""add_recurring_generation_leases
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f2a3b4c5d6'
+down_revision: Union[str, Sequence[str], None] = 'd0e1f2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'recurring_generation_leases',
+        sa.Column('shard', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('worker', sa.String(length=100), nullable=True),
+        sa.Column('leased_until', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('shard')
+    )
+    op.create_index(
+        'ix_recurring_invoices_active_next_due_date', 'recurring_invoices', ['next_due_date'], unique=False,
+        postgresql_where=sa.text("is_active"),
+        sqlite_where=sa.text("is_active = 1"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recurring_invoices_active_next_due_date', table_name='recurring_invoices')
+    op.drop_table('recurring_generation_leases')
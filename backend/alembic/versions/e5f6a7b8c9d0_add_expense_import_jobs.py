@@ -0,0 +1,53 @@
+"""add_expense_import_jobs
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, Sequence[str], None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'expense_import_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('file_format', sa.String(length=10), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('total_bytes', sa.Integer(), nullable=True),
+        sa.Column('processed_bytes', sa.Integer(), nullable=True),
+        sa.Column('rows_read', sa.Integer(), nullable=True),
+        sa.Column('imported', sa.Integer(), nullable=True),
+        sa.Column('duplicates', sa.Integer(), nullable=True),
+        sa.Column('skipped', sa.Integer(), nullable=True),
+        sa.Column('failed', sa.Integer(), nullable=True),
+        sa.Column('errors', sa.Text(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_expense_import_jobs_id'), 'expense_import_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_expense_import_jobs_user_id'), 'expense_import_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_expense_import_jobs_user_id'), table_name='expense_import_jobs')
+    op.drop_index(op.f('ix_expense_import_jobs_id'), table_name='expense_import_jobs')
+    op.drop_table('expense_import_jobs')
@@ -25,6 +25,37 @@ class Settings(BaseSettings):
     PAYPAL_CLIENT_ID: Optional[str] = None
     PAYPAL_CLIENT_SECRET: Optional[str] = None
     PAYPAL_BASE_URL: str = "https://api-m.sandbox.paypal.com" # Default to sandbox
+    # On-demand request profiling
+    PROFILING_ENABLED: bool = False # Honour the X-Profile request header
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_REPORTS: int = 50
+    # Per-tenant ETag/LRU caching of dashboard, report and template reads
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    TEMPLATE_CONFIG_CACHE_SIZE: int = 512 # Built invoice-template configs kept per process, keyed by (id, updated_at)
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = 30.0 # Max wait for a coalesced report computation
+    # Server-sent event streams for live invoice/payment/email status updates
+    EVENT_STREAM_QUEUE_SIZE: int = 100
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    BATCH_MAX_REQUESTS: int = 20 # Sub-requests allowed in one /api/batch call
+    SYNC_CURSOR_LAG_SECONDS: int = 60 # /api/sync re-sends changes this recent; must exceed the longest flush-to-commit time
+    INVOICE_IMPORT_CHUNK_SIZE: int = 1000 # Invoices per transaction in bulk create/import
+    EXPENSE_IMPORT_BATCH_SIZE: int = 1000 # Statement rows per transaction in expense imports
+    # Dated exchange rates (exchange_rates table), quoted per unit of the reference currency
+    EXCHANGE_RATE_REFERENCE_CURRENCY: str = "USD"
+    EXCHANGE_RATE_FALLBACK: float = 80.0 # Used for a currency pair with no stored rates
+    REVALUATION_BATCH_SIZE: int = 5000 # Rows per UPDATE batch/checkpoint in base-currency revaluations
+    OVERDUE_BATCH_SIZE: int = 5000 # Invoices per UPDATE/commit in the daily overdue transition
+    AR_AGING_DSO_DAYS: int = 90 # Trailing sales window for days sales outstanding in receivables aging
+    CASH_FORECAST_HISTORY_DAYS: int = 365 # Payments used to learn each client's days-to-pay for the cash forecast
+    RECURRING_GENERATION_SHARDS: int = 8 # Partitions of system-wide recurring generation that workers claim
+    RECURRING_GENERATION_BATCH_SIZE: int = 100 # Templates per commit in recurring generation
+    RECURRING_GENERATION_LEASE_SECONDS: int = 600 # Shard lease lifetime where SKIP LOCKED is unavailable (SQLite)
+    # Server-side invoice PDFs (reportlab), rendered in a process pool and cached on disk by content hash
+    PDF_CACHE_DIR: str = "pdf_cache"
+    PDF_CACHE_MAX_MB: int = 1024 # Least recently used PDFs are swept above this size; 0 keeps everything
+    PDF_RENDER_WORKERS: int = 2
+    INVOICE_EXPORT_BATCH_SIZE: int = 200 # Invoices per render batch/progress commit in bulk PDF exports
     
     model_config = {
         "env_file": ".env"
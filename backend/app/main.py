@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, Base
-from app.routers import auth, clients, invoices, payments, dashboard, recurring_invoices, reports, client_auth, client_invoices, webhooks, reminders, templates, expenses, expense_categories
+from app.routers import auth, clients, invoices, payments, dashboard, recurring_invoices, reports, client_auth, client_invoices, webhooks, reminders, templates, expenses, expense_categories, profiling, sync, events, batch, revaluations
+from app.utils.profiling import ProfilingMiddleware
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -23,6 +24,9 @@ app.add_middleware(
     expose_headers=["Content-Disposition"],
 )
 
+# Opt-in request profiling (see app/utils/profiling.py)
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(clients.router, prefix="/api")
@@ -38,6 +42,11 @@ app.include_router(reminders.router, prefix="/api/reminders")
 app.include_router(templates.router, prefix="/api")
 app.include_router(expenses.router, prefix="/api")
 app.include_router(expense_categories.router, prefix="/api")
+app.include_router(profiling.router, prefix="/api")
+app.include_router(sync.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
+app.include_router(batch.router, prefix="/api")
+app.include_router(revaluations.router, prefix="/api")
 
 # Health check endpoint
 @app.get("/api/health")
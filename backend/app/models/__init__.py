@@ -9,3 +9,11 @@ from app.models.reminder import ReminderSetting, ReminderHistory
 from app.models.invoice_template import InvoiceTemplate, UserTemplateDefault
 from app.models.expense import Expense
 from app.models.expense_category import ExpenseCategory
+from app.models.change_log import ChangeLog
+from app.models.expense_import_job import ExpenseImportJob
+from app.models.revaluation_job import RevaluationJob
+from app.models.ar_aging_snapshot import ARAgingSnapshot
+from app.models.recurring_generation_lease import RecurringGenerationLease
+from app.models.invoice_export_job import InvoiceExportJob
+from app.models.invoice_number_counter import InvoiceNumberCounter
+from app.models.recurring_generation_run import RecurringGenerationRun
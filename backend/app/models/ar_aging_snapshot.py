@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
+from datetime import datetime
+from app.database import Base
+
+class ARAgingSnapshot(Base):
+    """One user's receivables aging totals at the end of a day, for aging history and DSO trends."""
+    __tablename__ = "ar_aging_snapshots"
+    __table_args__ = (
+        Index("ix_ar_aging_snapshots_user_id_snapshot_date", "user_id", "snapshot_date", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    snapshot_date = Column(Date, nullable=False)
+    currency = Column(String(10))  # User's base currency when the snapshot was taken
+
+    # Outstanding balance by days past due, in the base currency
+    current = Column(Float, default=0.0)
+    days_1_30 = Column(Float, default=0.0)
+    days_31_60 = Column(Float, default=0.0)
+    days_61_90 = Column(Float, default=0.0)
+    days_over_90 = Column(Float, default=0.0)
+    total_outstanding = Column(Float, default=0.0)
+    open_invoices = Column(Integer, default=0)
+
+    # Invoiced over the DSO window ending on snapshot_date, and the resulting days sales outstanding
+    trailing_sales = Column(Float, default=0.0)
+    dso = Column(Float, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime
+from app.database import Base
+
+class ChangeLog(Base):
+    """Append-only record of upserts and deletes, used as the /api/sync cursor."""
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)  # Monotonic change cursor
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    entity = Column(String(50), nullable=False)  # invoices, clients, expenses, recurring_invoices, invoice_templates
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)  # upsert, delete
+    changed_at = Column(DateTime, default=datetime.utcnow)
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, Date
+from sqlalchemy import Column, Integer, String, Float, Date, Index
 from app.database import Base
 
 class ExchangeRate(Base):
+    """Units of ``currency`` per one unit of EXCHANGE_RATE_REFERENCE_CURRENCY on ``date``."""
     __tablename__ = "exchange_rates"
+    __table_args__ = (
+        Index("ix_exchange_rates_currency_date", "currency", "date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     currency = Column(String(10), nullable=False)
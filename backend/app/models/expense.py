@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index(
+            "ix_expenses_created_by_date_category_id",
+            "created_by", "date", "category_id",
+            postgresql_include=["base_currency_amount", "vendor"],
+        ),
+        Index("ix_expenses_created_by_updated_at", "created_by", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     amount = Column(Float, nullable=False)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+class ExpenseImportJob(Base):
+    """Progress and outcome of a background bank/card statement import."""
+    __tablename__ = "expense_import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    filename = Column(String(255))
+    file_format = Column(String(10), nullable=False)  # csv, ofx
+    status = Column(String(20), default="pending")  # pending, running, completed, failed
+
+    # Progress; the file is streamed, so bytes are the only up-front measure of size
+    total_bytes = Column(Integer, default=0)
+    processed_bytes = Column(Integer, default=0)
+    rows_read = Column(Integer, default=0)
+
+    # Outcome counters
+    imported = Column(Integer, default=0)
+    duplicates = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)  # Credits/inflows, which aren't expenses
+    failed = Column(Integer, default=0)
+    errors = Column(Text)  # JSON list of {"row", "error"}, capped
+    error_message = Column(Text)  # Set when the whole job fails
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
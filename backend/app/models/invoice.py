@@ -1,10 +1,32 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Covers the per-user dashboard/report aggregates; INCLUDE is PostgreSQL-only and ignored elsewhere
+        Index(
+            "ix_invoices_created_by_status_issue_date",
+            "created_by", "status", "issue_date",
+            postgresql_include=["currency", "total_amount", "base_currency_amount", "paid_amount", "client_id"],
+        ),
+        Index("ix_invoices_created_by_updated_at", "created_by", "updated_at"),
+        # Receivables aging and its drill-down by due date
+        Index(
+            "ix_invoices_created_by_due_date",
+            "created_by", "due_date",
+            postgresql_include=["client_id", "status", "total_amount", "paid_amount", "exchange_rate"],
+        ),
+        # Candidates for the daily overdue transition; holds only sent invoices
+        Index(
+            "ix_invoices_sent_due_date",
+            "due_date",
+            postgresql_where=text("status = 'sent'"),
+            sqlite_where=text("status = 'sent'"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String(50), unique=True, nullable=False, index=True)
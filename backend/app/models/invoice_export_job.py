@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+class InvoiceExportJob(Base):
+    """Progress of a background bulk render of invoice PDFs for a ZIP export."""
+    __tablename__ = "invoice_export_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    filters = Column(Text)  # JSON of the GET /invoices filters the export selects by
+    invoice_ids = Column(Text)  # JSON list of the matching invoice ids, fixed when the export starts
+    status = Column(String(20), default="pending")  # pending, running, completed, failed
+
+    invoices_total = Column(Integer, default=0)
+    invoices_processed = Column(Integer, default=0)
+    rendered = Column(Integer, default=0)  # PDFs drawn by this job
+    cached = Column(Integer, default=0)  # PDFs already in the disk cache
+    failed = Column(Integer, default=0)
+    error_message = Column(Text)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
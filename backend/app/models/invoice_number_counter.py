@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class InvoiceNumberCounter(Base):
+    """The last value handed out by a number counter (see app.utils.invoice_numbers)."""
+    __tablename__ = "invoice_number_counters"
+
+    name = Column(String(50), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+class RecurringGenerationLease(Base):
+    """Which worker holds a shard of recurring-invoice generation, and until when (databases without SKIP LOCKED)."""
+    __tablename__ = "recurring_generation_leases"
+
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    worker = Column(String(100), nullable=True)
+    leased_until = Column(DateTime, nullable=True)
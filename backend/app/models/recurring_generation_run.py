@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Float, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+class RecurringGenerationRun(Base):
+    """A background system-wide run of recurring-invoice generation and its summary."""
+    __tablename__ = "recurring_generation_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    requested_by = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    shard = Column(Integer, nullable=True)  # only this shard; None walks all of them
+    shards = Column(Integer, nullable=True)
+    status = Column(String(20), default="pending")  # pending, running, completed, failed
+
+    as_of = Column(Date, nullable=True)
+    worker = Column(String(100), nullable=True)
+    generated = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    batches = Column(Integer, default=0)
+    shards_done = Column(Integer, default=0)
+    shards_skipped = Column(Integer, default=0)  # leased by other workers
+    duration_ms = Column(Float, nullable=True)
+    details = Column(Text)  # JSON list of the templates that failed
+    error_message = Column(Text)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
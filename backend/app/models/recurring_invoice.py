@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Boolean, Enum, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 from app.database import Base
@@ -13,6 +13,16 @@ class RecurrenceFrequency(enum.Enum):
 
 class RecurringInvoice(Base):
     __tablename__ = "recurring_invoices"
+    __table_args__ = (
+        Index("ix_recurring_invoices_created_by_updated_at", "created_by", "updated_at"),
+        # Due-template lookup of recurring generation; holds only active templates
+        Index(
+            "ix_recurring_invoices_active_next_due_date",
+            "next_due_date",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     template_name = Column(String(200), nullable=False)
@@ -54,14 +64,17 @@ class RecurringInvoice(Base):
     # Relationships
     client = relationship("Client", back_populates="recurring_invoices")
     created_by_user = relationship("User", back_populates="recurring_invoices")
-    template_items = relationship("RecurringInvoiceTemplateItem", back_populates="recurring_invoice", cascade="all, delete-orphan")
+    template_items = relationship(
+        "RecurringInvoiceTemplateItem", back_populates="recurring_invoice", cascade="all, delete-orphan",
+        order_by="(RecurringInvoiceTemplateItem.sort_order, RecurringInvoiceTemplateItem.id)"
+    )
     generated_invoices = relationship("Invoice", back_populates="recurring_template", foreign_keys="Invoice.recurring_template_id")
 
 class RecurringInvoiceTemplateItem(Base):
     __tablename__ = "recurring_invoice_template_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    recurring_invoice_id = Column(Integer, ForeignKey("recurring_invoices.id"), nullable=False)
+    recurring_invoice_id = Column(Integer, ForeignKey("recurring_invoices.id"), nullable=False, index=True)
     description = Column(String(500), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
     rate = Column(Float, nullable=False)
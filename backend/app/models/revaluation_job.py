@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+class RevaluationJob(Base):
+    """Progress of a background recompute of base-currency amounts for one user."""
+    __tablename__ = "revaluation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    base_currency = Column(String(10), nullable=False)
+    status = Column(String(20), default="pending")  # pending, running, completed, failed
+
+    # Checkpoint: rows of ``phase`` with id <= checkpoint_id are done
+    phase = Column(String(20), default="invoices")  # invoices, expenses, aggregates, done
+    checkpoint_id = Column(Integer, default=0)
+
+    invoices_total = Column(Integer, default=0)
+    invoices_processed = Column(Integer, default=0)
+    invoices_changed = Column(Integer, default=0)
+    expenses_total = Column(Integer, default=0)
+    expenses_processed = Column(Integer, default=0)
+    expenses_changed = Column(Integer, default=0)
+    error_message = Column(Text)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
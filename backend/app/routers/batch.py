@@ -0,0 +1,46 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from app.config import settings
+from app.models.user import User
+from app.schemas.batch import BatchRequest
+from app.utils.batch import dispatch_get, render_result, validate_path
+from app.utils.dependencies import get_current_user
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+@router.post("")
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Run several GET requests in one round trip, e.g. everything the dashboard page needs.
+    Sub-requests each get their own session and share this request's authentication.
+    They run on the event loop, so their blocking DB work runs one after another.
+    Responses come back in request order as {id, path, status, body}; a sub-request
+    that fails gets a 500 entry without failing the batch.
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_REQUESTS} requests"
+        )
+
+    for sub_request in batch.requests:
+        error = validate_path(sub_request.path)
+        if error:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{sub_request.path}: {error}"
+            )
+
+    results = await asyncio.gather(*[
+        dispatch_get(request, sub_request.path, current_user) for sub_request in batch.requests
+    ])
+
+    body = b'{"responses": [' + b", ".join(
+        render_result(sub_request.id, sub_request.path, *result)
+        for sub_request, result in zip(batch.requests, results)
+    ) + b"]}"
+    return Response(content=body, media_type="application/json")
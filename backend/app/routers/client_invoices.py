@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, literal, select, union_all
 from typing import List
 from app.database import get_db
 from app.models.invoice import Invoice
@@ -9,7 +10,11 @@ from app.schemas.invoice import InvoiceResponse
 from app.schemas.payment import PaymentResponse
 from app.schemas.client import ClientProfileUpdate, ClientResponse
 from app.utils.dependencies import get_current_client
+from app.utils.events import event_stream_response, client_channel
 from app.utils.exchange_rates import ExchangeRateManager
+from app.utils.fast_json import FastJSONResponse
+from app.utils.read_models import fetch_invoice_rows
+from app.utils.response_cache import data_versions, response_cache
 from app.schemas.dashboard import ClientDashboardResponse
 from pydantic import BaseModel
 import uuid
@@ -47,45 +52,58 @@ def get_client_dashboard(
     """
     Retrieve aggregated dashboard data for the authenticated client.
     """
-    invoices = db.query(Invoice).filter(Invoice.client_id == current_client.id).order_by(Invoice.issue_date.desc()).all()
-    
-    if not invoices:
-        return ClientDashboardResponse(
-            outstanding_amount=0.0,
-            total_invoices=0,
-            recent_invoices=[]
-        )
-
-    client_invoice_ids = [invoice.id for invoice in invoices]
-    payments = db.query(Payment).filter(Payment.invoice_id.in_(client_invoice_ids)).all()
-    
     rate_manager = ExchangeRateManager(db)
-    target_currency = current_client.base_currency
-    
-    total_invoiced_converted = 0.0
-    for invoice in invoices:
-        rate = rate_manager.get_exchange_rate(invoice.currency, target_currency)
-        total_invoiced_converted += invoice.total_amount * rate
-        
-    total_paid_converted = 0.0
-    invoice_currency_map = {invoice.id: invoice.currency for invoice in invoices}
-    for payment in payments:
-        payment_currency = invoice_currency_map.get(payment.invoice_id)
-        if payment_currency:
-            rate = rate_manager.get_exchange_rate(payment_currency, target_currency)
-            total_paid_converted += payment.amount * rate
-            
-    outstanding_amount = total_invoiced_converted - total_paid_converted
-    
-    recent_invoices = invoices[:5]
-    for inv in recent_invoices:
-        inv.balance = inv.total_amount - inv.paid_amount
 
-    return ClientDashboardResponse(
-        outstanding_amount=outstanding_amount,
-        total_invoices=len(invoices),
-        recent_invoices=recent_invoices
-    )
+    # Any invoice or payment write for the client bumps the owning user's data version
+    cache_key = None
+    if settings.RESPONSE_CACHE_ENABLED:
+        epoch, version = data_versions.get(current_client.created_by)
+        cache_key = (
+            f"client-dashboard|{current_client.id}|{current_client.base_currency}|"
+            f"{epoch}.{version}|rates.{rate_manager.table.version}"
+        )
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            body, media_type = cached
+            return Response(content=body, media_type=media_type)
+
+    # Per-currency totals in one statement; history length only changes the sums
+    invoice_totals = select(
+        literal("invoice").label("kind"), Invoice.currency, func.count(Invoice.id), func.sum(Invoice.total_amount)
+    ).where(Invoice.client_id == current_client.id).group_by(Invoice.currency)
+    payment_totals = select(
+        literal("payment").label("kind"), Invoice.currency, func.count(Payment.id), func.sum(Payment.amount)
+    ).join(Invoice, Payment.invoice_id == Invoice.id).where(
+        Invoice.client_id == current_client.id
+    ).group_by(Invoice.currency)
+    totals = db.execute(union_all(invoice_totals, payment_totals)).all()
+
+    total_invoices = sum(count for kind, _, count, _ in totals if kind == "invoice")
+    if not total_invoices:
+        content = {"outstanding_amount": 0.0, "total_invoices": 0, "recent_invoices": []}
+    else:
+        # Payments count against the outstanding amount, so convert them negated in the same step
+        outstanding_amount = rate_manager.convert_total(
+            [(amount or 0.0) if kind == "invoice" else -(amount or 0.0) for kind, _, _, amount in totals],
+            [currency for _, currency, _, _ in totals],
+            current_client.base_currency
+        )
+        recent_invoices = fetch_invoice_rows(
+            db,
+            db.query(Invoice).filter(Invoice.client_id == current_client.id).order_by(
+                Invoice.issue_date.desc(), Invoice.id.desc()
+            ).limit(5)
+        )
+        content = {
+            "outstanding_amount": outstanding_amount,
+            "total_invoices": total_invoices,
+            "recent_invoices": recent_invoices,
+        }
+
+    response = FastJSONResponse(content)
+    if cache_key is not None:
+        response_cache.set(cache_key, response.body, response.media_type)
+    return response
 
 @router.get("/invoices", response_model=List[InvoiceResponse])
 async def get_client_invoices(
@@ -145,6 +163,20 @@ async def get_client_payments(
     
     return payments
 
+@router.get("/events")
+async def stream_client_events(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_client: Client = Depends(get_current_client)
+):
+    """
+    Server-sent events for the authenticated client: ``invoice.updated``, ``invoice.deleted``
+    and ``payment.received`` for their invoices, so the portal can stop polling after checkout.
+    """
+    # Hand the pooled connection back; the stream can stay open for hours
+    db.close()
+    return event_stream_response(request, client_channel(current_client.id))
+
 @router.put("/profile", response_model=ClientResponse)
 async def update_client_profile(
     profile_data: ClientProfileUpdate,
@@ -8,6 +8,8 @@ from app.schemas.client import ClientCreate, ClientUpdate, ClientResponse, Depos
 from app.utils.dependencies import get_current_user
 from app.utils.auth import get_password_hash
 from app.utils.mail import send_generic_email
+from app.utils.fast_json import FastJSONResponse
+from app.utils.read_models import fetch_client_rows
 from pathlib import Path
 import os
 import uuid
@@ -21,18 +23,31 @@ router = APIRouter(prefix="/clients", tags=["Clients"])
 
 @router.get("", response_model=List[ClientResponse])
 async def get_clients(
+    fields: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    clients = db.query(Client).order_by(Client.created_at.desc()).all()
-    return clients
+    clients = fetch_client_rows(db, db.query(Client).filter(
+        Client.created_by == current_user.id
+    ).order_by(Client.created_at.desc()), fields)
+    return FastJSONResponse(clients)
 
 @router.get("/{client_id}", response_model=ClientResponse)
 async def get_client(
     client_id: int,
+    fields: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    if fields is not None:
+        rows = fetch_client_rows(db, db.query(Client).filter(Client.id == client_id), fields)
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Client not found"
+            )
+        return FastJSONResponse(rows[0])
+
     client = db.query(Client).filter(Client.id == client_id).first()
     if not client:
         raise HTTPException(
@@ -342,7 +357,7 @@ async def get_all_deposit_history(
     Get all deposit return history across all clients.
     """
     results = []
-    clients = db.query(Client).all()
+    clients = db.query(Client).filter(Client.created_by == current_user.id).all()
     
     for client in clients:
         deposit_returns = db.query(DepositReturnHistory).filter(
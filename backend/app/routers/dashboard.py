@@ -1,26 +1,32 @@
 
 
 from fastapi import APIRouter, Depends
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func, extract
-from app.database import get_db
 from app.models.invoice import Invoice
 from app.models.expense import Expense
 from app.models.client import Client
 from app.models.user import User
 from app.utils.dependencies import get_current_user
+from app.utils.response_cache import CachedRoute
+from app.utils.single_flight import get_single_flight
 from app.utils.profit_calculator import calculate_profit_summary, calculate_monthly_profit
 
-router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"], route_class=CachedRoute)
+
+statistics_flight = get_single_flight("dashboard.stats")
+profit_dashboard_flight = get_single_flight("dashboard.profit")
 
 @router.get("/stats")
 async def get_statistics(
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    return await statistics_flight.run_in_session(current_user.id, current_user.id, _compute_statistics, current_user)
 
+def _compute_statistics(db: Session, current_user: User) -> dict:
     # Total invoices
-    total_invoices = db.query(Invoice).count()
+    total_invoices = db.query(Invoice).filter(Invoice.created_by == current_user.id).count()
     
 
     # Multi-currency revenue calculation
@@ -28,12 +34,14 @@ async def get_statistics(
     # For other currencies, use base_currency_amount
     base_currency = current_user.base_currency or "INR"
     base_currency_revenue = db.query(func.sum(Invoice.total_amount)).filter(
+        Invoice.created_by == current_user.id,
         Invoice.status.in_(["sent", "paid", "overdue"]),
         Invoice.currency == base_currency
     ).scalar() or 0
 
     # Converted revenue from other currencies
     converted_revenue = db.query(func.sum(Invoice.base_currency_amount)).filter(
+        Invoice.created_by == current_user.id,
         Invoice.status.in_(["sent", "paid", "overdue"]),
         Invoice.currency != base_currency
     ).scalar() or 0
@@ -42,11 +50,13 @@ async def get_statistics(
 
     # Multi-currency pending amount calculation
     base_currency_pending = db.query(func.sum(Invoice.total_amount - Invoice.paid_amount)).filter(
+        Invoice.created_by == current_user.id,
         Invoice.status.in_(["sent", "overdue"]),
         Invoice.currency == base_currency
     ).scalar() or 0
 
     converted_pending = db.query(func.sum(Invoice.base_currency_amount - Invoice.paid_amount)).filter(
+        Invoice.created_by == current_user.id,
         Invoice.status.in_(["sent", "overdue"]),
         Invoice.currency != base_currency
     ).scalar() or 0
@@ -54,7 +64,7 @@ async def get_statistics(
     pending_amount = base_currency_pending + converted_pending
     
     # Total clients
-    total_clients = db.query(Client).count()
+    total_clients = db.query(Client).filter(Client.created_by == current_user.id).count()
     
     # Calculate profit metrics
     profit_data = calculate_profit_summary(db, current_user.id, base_currency=base_currency)
@@ -70,6 +80,8 @@ async def get_statistics(
     # Recent invoices with client data
     recent_invoices = db.query(Invoice).options(
         selectinload(Invoice.client)
+    ).filter(
+        Invoice.created_by == current_user.id
     ).order_by(
         Invoice.created_at.desc()
     ).limit(5).all()
@@ -87,6 +99,7 @@ async def get_statistics(
         extract('year', Invoice.issue_date).label('year'),
         func.sum(Invoice.base_currency_amount).label('revenue')
     ).filter(
+        Invoice.created_by == current_user.id,
         Invoice.status.in_(["sent", "paid", "overdue"])
     ).group_by('month', 'year').order_by('year', 'month').all()
     
@@ -94,9 +107,11 @@ async def get_statistics(
     status_breakdown = db.query(
         Invoice.status,
         func.count(Invoice.id).label('count')
+    ).filter(
+        Invoice.created_by == current_user.id
     ).group_by(Invoice.status).all()
     
-    return {
+    return jsonable_encoder({
         "stats": {
             "total_invoices": total_invoices,
             "total_revenue": float(total_revenue),
@@ -118,14 +133,18 @@ async def get_statistics(
             {"status": r.status, "count": r.count}
             for r in status_breakdown
         ]
-    }
+    })
 
 @router.get("/profit")
 async def get_profit_dashboard(
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get detailed profit dashboard data"""
+    return await profit_dashboard_flight.run_in_session(
+        current_user.id, current_user.id, _compute_profit_dashboard, current_user
+    )
+
+def _compute_profit_dashboard(db: Session, current_user: User) -> dict:
     base_currency = current_user.base_currency or "INR"
     
     # Current year profit summary
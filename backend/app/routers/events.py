@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.user import User
+from app.utils.dependencies import get_current_user
+from app.utils.events import event_stream_response, user_channel
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-sent events for the current user: ``invoice.updated``, ``invoice.deleted``,
+    ``payment.received`` and ``email.status``, plus ``resync`` if the stream fell behind.
+    """
+    # Hand the pooled connection back; the stream can stay open for hours
+    db.close()
+    return event_stream_response(request, user_channel(current_user.id))
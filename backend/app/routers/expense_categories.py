@@ -7,8 +7,9 @@ from app.models.expense_category import ExpenseCategory
 from app.models.user import User
 from app.schemas.expense_category import ExpenseCategoryCreate, ExpenseCategoryUpdate, ExpenseCategoryResponse
 from app.utils.dependencies import get_current_user
+from app.utils.response_cache import CachedRoute
 
-router = APIRouter(prefix="/expense-categories", tags=["Expense Categories"])
+router = APIRouter(prefix="/expense-categories", tags=["Expense Categories"], route_class=CachedRoute)
 
 @router.get("", response_model=List[ExpenseCategoryResponse])
 async def get_expense_categories(
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, and_, or_
 from typing import List, Optional
 from app.database import get_db
 from app.models.expense import Expense
 from app.models.expense_category import ExpenseCategory
+from app.models.expense_import_job import ExpenseImportJob
 from app.models.user import User
-from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseSummary, ExpenseFilter
+from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseSummary, ExpenseFilter, ExpenseImportJobResponse
 from app.utils.dependencies import get_current_user
+from app.utils.fast_json import FastJSONResponse
+from app.utils.read_models import EXPENSE_READ
+from app.utils.expense_import import run_expense_import
 from datetime import datetime, date
+import json
+import os
+import shutil
+import tempfile
 
 router = APIRouter(prefix="/expenses", tags=["Expenses"])
 
@@ -25,14 +34,13 @@ async def get_expenses(
     min_amount: Optional[float] = Query(None),
     max_amount: Optional[float] = Query(None),
     search: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    include: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get expenses with optional filtering"""
-    query = db.query(Expense).options(
-        joinedload(Expense.category),
-        joinedload(Expense.client)
-    ).filter(Expense.created_by == current_user.id)
+    query = db.query(Expense).filter(Expense.created_by == current_user.id)
     
     # Apply filters
     if category_id:
@@ -59,7 +67,14 @@ async def get_expenses(
             )
         )
     
-    expenses = query.order_by(Expense.date.desc()).offset(skip).limit(limit).all()
+    query = query.order_by(Expense.date.desc()).offset(skip).limit(limit)
+    if fields is not None or include is not None:
+        return FastJSONResponse(EXPENSE_READ.fetch(db, query, EXPENSE_READ.fieldset(fields, include)))
+
+    expenses = query.options(
+        joinedload(Expense.category),
+        joinedload(Expense.client)
+    ).all()
     return expenses
 
 @router.post("", response_model=ExpenseResponse)
@@ -105,10 +120,22 @@ async def create_expense(
 @router.get("/{expense_id}", response_model=ExpenseResponse)
 async def get_expense(
     expense_id: int,
+    fields: Optional[str] = Query(None),
+    include: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific expense"""
+    if fields is not None or include is not None:
+        rows = EXPENSE_READ.fetch(
+            db,
+            db.query(Expense).filter(Expense.id == expense_id, Expense.created_by == current_user.id),
+            EXPENSE_READ.fieldset(fields, include)
+        )
+        if not rows:
+            raise HTTPException(status_code=404, detail="Expense not found")
+        return FastJSONResponse(rows[0])
+
     expense = db.query(Expense).options(
         joinedload(Expense.category),
         joinedload(Expense.client),
@@ -352,3 +379,109 @@ async def export_expenses_csv(
     response.headers["Content-Disposition"] = f"attachment; filename=expenses_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     
     return response
+
+@router.post("/import", response_model=ExpenseImportJobResponse, status_code=202)
+async def import_expense_statement(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    default_category_id: int = Form(..., description="Category for rows whose category/vendor can't be resolved"),
+    format: Optional[str] = Form(None, description="csv or ofx; inferred from the file name when omitted"),
+    mapping: Optional[str] = Form(None, description='JSON column mapping, e.g. {"date": "Txn Date", "debit": "Withdrawal"}'),
+    currency: Optional[str] = Form(None, description="Currency of the statement; defaults to your base currency"),
+    payment_method: Optional[str] = Form(None),
+    date_format: Optional[str] = Form(None, description="strptime format, e.g. %d/%m/%Y; common formats are detected"),
+    debit_sign: str = Form("negative", pattern="^(negative|positive)$", description="Sign of money going out in the amount column"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import a bank or card statement in the background. Poll GET /expenses/import/{job_id} for progress.
+    """
+    file_format = (format or os.path.splitext(file.filename or "")[1].lstrip(".")).lower()
+    if file_format == "qfx":
+        file_format = "ofx"
+    if file_format not in ("csv", "ofx"):
+        raise HTTPException(status_code=400, detail="Unsupported statement format; use csv or ofx")
+
+    column_mapping = None
+    if mapping:
+        try:
+            column_mapping = json.loads(mapping)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="mapping must be a JSON object")
+        if not isinstance(column_mapping, dict):
+            raise HTTPException(status_code=400, detail="mapping must be a JSON object")
+
+    category = db.query(ExpenseCategory).filter(
+        ExpenseCategory.id == default_category_id,
+        ExpenseCategory.created_by == current_user.id
+    ).first()
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    # Spool the upload to disk; the import runs after this request has finished
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_format}") as spooled:
+        await run_in_threadpool(shutil.copyfileobj, file.file, spooled)
+        path = spooled.name
+
+    job = ExpenseImportJob(
+        user_id=current_user.id,
+        filename=file.filename,
+        file_format=file_format,
+        status="pending",
+        total_bytes=os.path.getsize(path)
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    background_tasks.add_task(run_expense_import, job.id, path, {
+        "default_category_id": default_category_id,
+        "mapping": column_mapping,
+        "currency": currency,
+        "payment_method": payment_method,
+        "date_format": date_format,
+        "debit_sign": debit_sign,
+    })
+    return _import_job_response(job)
+
+@router.get("/import/{job_id}", response_model=ExpenseImportJobResponse)
+async def get_expense_import_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Progress and result of a statement import"""
+    job = db.query(ExpenseImportJob).filter(
+        ExpenseImportJob.id == job_id,
+        ExpenseImportJob.user_id == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return _import_job_response(job)
+
+def _import_job_response(job: ExpenseImportJob) -> dict:
+    if job.status == "completed":
+        progress = 1.0
+    elif job.total_bytes:
+        progress = min((job.processed_bytes or 0) / job.total_bytes, 1.0)
+    else:
+        progress = 0.0
+
+    return {
+        "id": job.id,
+        "filename": job.filename,
+        "file_format": job.file_format,
+        "status": job.status,
+        "progress": round(progress, 4),
+        "rows_read": job.rows_read or 0,
+        "imported": job.imported or 0,
+        "duplicates": job.duplicates or 0,
+        "skipped": job.skipped or 0,
+        "failed": job.failed or 0,
+        "errors": json.loads(job.errors) if job.errors else [],
+        "error_message": job.error_message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
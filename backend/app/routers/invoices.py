@@ -1,18 +1,31 @@
 from app.utils.template_renderer import get_template_renderer
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Form, File, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Form, File, UploadFile, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy import and_, func
 from typing import List, Optional
 from app.database import get_db
 from app.models.invoice import Invoice, InvoiceItem
-from app.models.client import Client
 from app.models.email_history import EmailHistory, EmailStatus
+from app.models.invoice_export_job import InvoiceExportJob
 from app.models.user import User
-from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse
+from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceBulkCreate, InvoiceImportResponse, OverdueRunResponse, InvoiceExportJobResponse
 from app.schemas.email_history import EmailHistoryResponse
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, get_current_active_superuser
 from app.utils.mail import send_email
 from app.utils.exchange_rates import ExchangeRateManager
+from app.utils.fast_json import FastJSONResponse
+from app.utils.invoice_numbers import next_invoice_numbers
+from app.utils.invoice_export import create_export_job, export_filename, job_invoice_ids, run_invoice_export, stream_invoice_zip
+from app.utils.invoice_filters import filtered_invoices
+from app.utils.invoice_import import InvoiceImporter, chunked, iter_csv_rows, iter_jsonl_rows
+from app.utils import pdf_renderer
+from app.utils.invoice_pdf import PDFRenderingUnavailable, invoice_pdf, invoice_pdf_attachment, pdf_filename
+from app.utils.item_diff import apply_item_diff
+from app.utils.overdue import mark_overdue_invoices
+from app.config import settings
+from fastapi.concurrency import run_in_threadpool
+from app.utils.read_models import fetch_invoice_rows
 import tempfile
 import os
 import json
@@ -109,6 +122,38 @@ async def get_email_history(
     
     return enhanced_history
 
+@router.get("/{invoice_id}/pdf")
+async def download_invoice_pdf(
+    invoice_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Server-rendered PDF of the invoice, served from the disk cache when unchanged."""
+    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    if not invoice:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invoice not found"
+        )
+
+    try:
+        key, pdf = await invoice_pdf(db, invoice)
+    except PDFRenderingUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF rendering is not available on this server"
+        )
+
+    headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'attachment; filename="{pdf_filename(invoice)}"',
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=pdf, media_type="application/pdf", headers=headers)
+
 @router.get("", response_model=List[InvoiceResponse])
 async def get_invoices(
     status: Optional[str] = Query(None),
@@ -125,65 +170,33 @@ async def get_invoices(
     amount_range: Optional[str] = Query(None),
     amount_min: Optional[float] = Query(None),
     amount_max: Optional[float] = Query(None),
+    # Sparse fieldsets, e.g. fields=id,invoice_number,client.name&include=client
+    fields: Optional[str] = Query(None),
+    include: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Invoice).join(Invoice.client)
-    
-    if status:
-        query = query.filter(Invoice.status == status)
-    if payment_status:
-        query = query.filter(Invoice.payment_status == payment_status)
-    if client_id:
-        query = query.filter(Invoice.client_id == client_id)
-    if currency:
-        query = query.filter(Invoice.currency == currency)
-    
-    # Add recurring filter
-    if recurring == 'true':
-        query = query.filter(Invoice.generated_by_template == True)
-    elif recurring == 'false':
-        query = query.filter(Invoice.generated_by_template == False)
-    
-    # Add date range filters
-    if date_from:
-        query = query.filter(Invoice.issue_date >= date_from)
-    if date_to:
-        query = query.filter(Invoice.issue_date <= date_to)
-    
-    # Add amount range filters
-    if amount_min is not None:
-        query = query.filter(Invoice.total_amount >= amount_min)
-    if amount_max is not None:
-        query = query.filter(Invoice.total_amount <= amount_max)
-    
-    # Add search functionality
-    if search:
-        search_term = f"%{search.lower()}%"
-        query = query.filter(
-            or_(
-                Invoice.invoice_number.ilike(search_term),
-                Client.name.ilike(search_term),
-                Client.company.ilike(search_term),
-                Invoice.status.ilike(search_term),
-                Invoice.payment_status.ilike(search_term)
-            )
-        )
-    
-    invoices = query.order_by(Invoice.created_at.desc()).all()
-    
-    # Calculate balance for each invoice
-    for invoice in invoices:
-        invoice.balance = invoice.total_amount - invoice.paid_amount
-    
-    return invoices
+    query = filtered_invoices(db, {
+        "status": status, "payment_status": payment_status, "client_id": client_id, "currency": currency,
+        "search": search, "recurring": recurring, "date_from": date_from, "date_to": date_to,
+        "amount_min": amount_min, "amount_max": amount_max,
+    })
+    
+    # Column-only read path: rows already carry balance, client and items
+    invoices = fetch_invoice_rows(db, query.order_by(Invoice.created_at.desc()), fields, include)
+    return FastJSONResponse(invoices)
 
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
 async def get_invoice(
     invoice_id: int,
+    fields: Optional[str] = Query(None),
+    include: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    if fields is not None or include is not None:
+        return _get_sparse_invoice(db, invoice_id, fields, include)
+
     invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
     if not invoice:
         raise HTTPException(
@@ -194,11 +207,21 @@ async def get_invoice(
     invoice.balance = invoice.total_amount - invoice.paid_amount
 
     # Get template configuration
-    template_renderer = get_template_renderer(db, invoice.id)
+    template_renderer = get_template_renderer(db, invoice)
     invoice.template_config = template_renderer.get_template_config()
 
     return invoice
 
+def _get_sparse_invoice(db: Session, invoice_id: int, fields: Optional[str], include: Optional[str]):
+    """Column-only variant of get_invoice; template_config is only computed when included."""
+    rows = fetch_invoice_rows(db, db.query(Invoice).filter(Invoice.id == invoice_id), fields, include)
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invoice not found"
+        )
+    return FastJSONResponse(rows[0])
+
 @router.post("", response_model=InvoiceResponse, status_code=status.HTTP_201_CREATED)
 async def create_invoice(
     invoice_data: InvoiceCreate,
@@ -206,8 +229,7 @@ async def create_invoice(
     current_user: User = Depends(get_current_user)
 ):
     # Generate invoice number
-    last_invoice = db.query(Invoice).order_by(Invoice.id.desc()).first()
-    invoice_number = f"INV-{(last_invoice.id + 1 if last_invoice else 1):05d}"
+    invoice_number = next_invoice_numbers(db)[0]
     
     # Calculate totals
     subtotal = sum(item.quantity * item.rate for item in invoice_data.items)
@@ -224,7 +246,7 @@ async def create_invoice(
             exchange_rate = invoice_data.exchange_rate
         else:
             rate_manager = ExchangeRateManager(db)
-            exchange_rate = await rate_manager.get_exchange_rate(invoice_data.currency, base_currency)
+            exchange_rate = rate_manager.get_exchange_rate(invoice_data.currency, base_currency, invoice_data.issue_date)
         base_currency_amount = total_amount * exchange_rate
     
     # Create invoice
@@ -268,6 +290,162 @@ async def create_invoice(
     invoice.balance = invoice.total_amount - invoice.paid_amount
     return invoice
 
+@router.post("/bulk", response_model=InvoiceImportResponse)
+async def bulk_create_invoices(
+    payload: InvoiceBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many invoices in one request. Each entry has the POST /invoices shape plus an
+    optional invoice_number; invalid entries are skipped and reported by their 1-based position.
+    """
+    importer = InvoiceImporter(db, current_user)
+    await run_in_threadpool(_import_all, importer, enumerate(payload.invoices, start=1))
+    return importer.result()
+
+@router.post("/import", response_model=InvoiceImportResponse)
+async def import_invoices(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None, description="csv or jsonl; inferred from the file name when omitted"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import invoices from a CSV or JSONL file, streamed in chunks. Errors are reported by line number.
+    """
+    file_format = (format or os.path.splitext(file.filename or "")[1].lstrip(".")).lower()
+    if file_format == "csv":
+        rows = iter_csv_rows(file.file)
+    elif file_format in ("jsonl", "ndjson"):
+        rows = iter_jsonl_rows(file.file)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported import format; use csv or jsonl"
+        )
+
+    importer = InvoiceImporter(db, current_user)
+    # Parsing runs in the worker thread too, so a large file never blocks the event loop
+    await run_in_threadpool(_import_all, importer, rows)
+    return importer.result()
+
+def _import_all(importer: InvoiceImporter, rows) -> None:
+    for chunk in chunked(rows, settings.INVOICE_IMPORT_CHUNK_SIZE):
+        importer.import_chunk(chunk)
+
+@router.post("/export", response_model=InvoiceExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_invoice_export(
+    background_tasks: BackgroundTasks,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    payment_status: Optional[str] = Query(None),
+    client_id: Optional[int] = Query(None),
+    currency: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    recurring: Optional[str] = Query(None),
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    amount_min: Optional[float] = Query(None),
+    amount_max: Optional[float] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Render the PDFs of every invoice matching the GET /invoices filters in the background.
+    Poll GET /invoices/export/{job_id} for progress, then download the ZIP from its download_url.
+    """
+    if pdf_renderer.canvas is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF rendering is not available on this server"
+        )
+
+    filters = {
+        "status": status_filter, "payment_status": payment_status, "client_id": client_id, "currency": currency,
+        "search": search, "recurring": recurring, "date_from": date_from, "date_to": date_to,
+        "amount_min": amount_min, "amount_max": amount_max,
+    }
+    job = create_export_job(db, current_user, {name: value for name, value in filters.items() if value is not None})
+    background_tasks.add_task(run_invoice_export, job.id)
+    return _export_job_response(job)
+
+@router.get("/export/{job_id}", response_model=InvoiceExportJobResponse)
+async def get_invoice_export(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Progress of a bulk PDF export"""
+    return _export_job_response(_get_export_job(db, job_id, current_user))
+
+@router.get("/export/{job_id}/download")
+async def download_invoice_export(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The exported invoices' PDFs as a ZIP archive, streamed as it is written. The
+    archive's manifest.csv lists invoices that could not be rendered or were deleted.
+    """
+    job = _get_export_job(db, job_id, current_user)
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is {job.status}; download it once it has completed"
+        )
+
+    return StreamingResponse(
+        stream_invoice_zip(current_user.id, job_invoice_ids(db, job)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(job)}"'}
+    )
+
+def _get_export_job(db: Session, job_id: int, current_user: User) -> InvoiceExportJob:
+    job = db.query(InvoiceExportJob).filter(
+        InvoiceExportJob.id == job_id,
+        InvoiceExportJob.user_id == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found")
+    return job
+
+def _export_job_response(job: InvoiceExportJob) -> dict:
+    if job.status == "completed":
+        progress = 1.0
+    elif job.invoices_total:
+        progress = min((job.invoices_processed or 0) / job.invoices_total, 1.0)
+    else:
+        progress = 0.0
+
+    return {
+        "id": job.id,
+        "status": job.status,
+        "filters": json.loads(job.filters or "{}"),
+        "progress": round(progress, 4),
+        "invoices_total": job.invoices_total or 0,
+        "invoices_processed": job.invoices_processed or 0,
+        "rendered": job.rendered or 0,
+        "cached": job.cached or 0,
+        "failed": job.failed or 0,
+        "download_url": f"/api/invoices/export/{job.id}/download" if job.status == "completed" else None,
+        "error_message": job.error_message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+@router.post("/mark-overdue", response_model=OverdueRunResponse)
+async def mark_overdue(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """
+    Move every user's sent invoices past their due date to overdue.
+    Meant to be called daily by a cron job.
+    """
+    return await run_in_threadpool(mark_overdue_invoices, db)
+
 @router.put("/{invoice_id}", response_model=InvoiceResponse)
 async def update_invoice(
     invoice_id: int,
@@ -304,41 +482,22 @@ async def update_invoice(
     if invoice_data.design_template_id is not None:
         invoice.design_template_id = invoice_data.design_template_id
 
-    # Update items if provided
+    # Apply only the item changes and move the stored subtotal by the difference
     if invoice_data.items is not None:
-        # Delete existing items
-        db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice.id).delete()
-        
-        # Recalculate totals based on current items and settings
-        subtotal = sum(item.quantity * item.rate for item in invoice_data.items)
-        tax_amount = (subtotal * invoice.tax_rate) / 100
-        total_amount = subtotal + tax_amount - invoice.discount
-        
-        invoice.subtotal = subtotal
-        invoice.tax_amount = tax_amount
-        invoice.total_amount = total_amount
-        
-        # Create new items
-        for item_data in invoice_data.items:
-            item = InvoiceItem(
-                invoice_id=invoice.id,
-                description=item_data.description,
-                quantity=item_data.quantity,
-                rate=item_data.rate,
-                amount=item_data.quantity * item_data.rate
-            )
-            db.add(item)
-    else:
-        # If items not provided, recalculate totals based on existing items and current tax/discount
         existing_items = db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice.id).all()
-        if existing_items:
-            subtotal = sum(item.quantity * item.rate for item in existing_items)
-            tax_amount = (subtotal * invoice.tax_rate) / 100
-            total_amount = subtotal + tax_amount - invoice.discount
-            
-            invoice.subtotal = subtotal
-            invoice.tax_amount = tax_amount
-            invoice.total_amount = total_amount
+        try:
+            diff = apply_item_diff(
+                db, existing_items, invoice_data.items,
+                lambda **values: InvoiceItem(invoice_id=invoice.id, **values)
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        invoice.subtotal = (invoice.subtotal or 0.0) + diff.amount_delta
+
+    # Tax and total follow from the stored subtotal and current tax/discount
+    subtotal = invoice.subtotal or 0.0
+    invoice.tax_amount = (subtotal * invoice.tax_rate) / 100
+    invoice.total_amount = subtotal + invoice.tax_amount - invoice.discount
     
     # Handle currency conversion
     base_currency = current_user.base_currency or "INR"
@@ -350,7 +509,7 @@ async def update_invoice(
             exchange_rate = invoice_data.exchange_rate
         else:
             rate_manager = ExchangeRateManager(db)
-            exchange_rate = await rate_manager.get_exchange_rate(invoice.currency, base_currency)
+            exchange_rate = rate_manager.get_exchange_rate(invoice.currency, base_currency, invoice.issue_date)
         base_currency_amount = invoice.total_amount * exchange_rate
 
     invoice.base_currency_amount = base_currency_amount
@@ -417,6 +576,9 @@ async def send_invoice_email(
 
     # Prepare attachment
     attachment_path = None
+    if attachment is None:
+        # No browser-rendered PDF uploaded: attach the server-rendered one
+        attachment = await invoice_pdf_attachment(db, invoice)
 
     # Prepare invoice data for email template
     invoice_data = {
@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from typing import List
+from app.config import settings
+from app.models.user import User
+from app.schemas.profiling import ProfilerArmRequest, ProfilerStatusResponse, ProfileReportResponse, SingleFlightStatsResponse, EventStreamStatsResponse
+from app.utils.dependencies import get_current_active_superuser
+from app.utils.profiling import profiler_arming, list_reports, get_report_path
+from app.utils.events import event_bus
+from app.utils.single_flight import single_flight_stats
+
+router = APIRouter(prefix="/admin/profiling", tags=["Profiling"])
+
+@router.get("/status", response_model=ProfilerStatusResponse)
+async def get_profiler_status(
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """Show whether header-based profiling is enabled and which paths are armed"""
+    return ProfilerStatusResponse(
+        header_enabled=settings.PROFILING_ENABLED,
+        armed=profiler_arming.snapshot()
+    )
+
+@router.post("/arm", response_model=ProfilerStatusResponse)
+async def arm_profiler(
+    arm_data: ProfilerArmRequest,
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """Profile the next N requests whose path starts with the given prefix"""
+    profiler_arming.arm(arm_data.path_prefix, arm_data.count)
+    return ProfilerStatusResponse(
+        header_enabled=settings.PROFILING_ENABLED,
+        armed=profiler_arming.snapshot()
+    )
+
+@router.delete("/arm", response_model=ProfilerStatusResponse)
+async def disarm_profiler(
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """Disarm all armed path prefixes"""
+    profiler_arming.disarm()
+    return ProfilerStatusResponse(
+        header_enabled=settings.PROFILING_ENABLED,
+        armed=profiler_arming.snapshot()
+    )
+
+@router.get("/reports", response_model=List[ProfileReportResponse])
+async def get_profile_reports(
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """List stored profile reports, newest first"""
+    return list_reports()
+
+@router.get("/reports/{report_name}")
+async def download_profile_report(
+    report_name: str,
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """Download a stored profile report"""
+    report_path = get_report_path(report_name)
+    if not report_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile report not found"
+        )
+
+    media_type = "text/html" if report_path.suffix == ".html" else "application/octet-stream"
+    return FileResponse(
+        path=str(report_path),
+        filename=report_path.name,
+        media_type=media_type
+    )
+
+@router.delete("/reports/{report_name}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_profile_report(
+    report_name: str,
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """Delete a stored profile report"""
+    report_path = get_report_path(report_name)
+    if not report_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile report not found"
+        )
+
+    report_path.unlink()
+    return None
+
+@router.get("/single-flight", response_model=List[SingleFlightStatsResponse])
+async def get_single_flight_stats(
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """Show call, execution and coalescing counters for each single-flight group"""
+    return single_flight_stats()
+
+@router.get("/event-streams", response_model=EventStreamStatsResponse)
+async def get_event_stream_stats(
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """Show open event streams and how many events were published or dropped"""
+    return event_bus.stats()
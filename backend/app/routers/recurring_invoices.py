@@ -1,173 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
-from app.models.invoice import Invoice, InvoiceItem
+from app.models.invoice import Invoice
+from app.models.recurring_generation_run import RecurringGenerationRun
 from app.models.recurring_invoice import RecurringInvoice, RecurringInvoiceTemplateItem
 from app.models.user import User
 from app.models.client import Client
-from app.models.email_history import EmailHistory, EmailStatus
 from app.schemas.recurring_invoice import (
     RecurringInvoiceCreate, RecurringInvoiceUpdate, RecurringInvoiceResponse,
     RecurringInvoiceListResponse, RecurringInvoiceHistoryItem, RecurringInvoicePreview,
-    RecurringInvoiceStats, RecurringInvoiceTemplateItemCreate
+    RecurringInvoiceStats, RecurringInvoiceTemplateItemCreate, RecurringGenerationRunResponse
+)
+from app.utils.dependencies import get_current_user, get_current_active_superuser
+from app.utils.fast_json import FastJSONResponse
+from app.utils.item_diff import apply_item_diff
+from app.utils.read_models import RECURRING_READ, RECURRING_LIST_FIELDS
+from app.utils.recurring_generation import (
+    create_generation_run, create_invoice_from_template, generate_due_invoices, run_generation,
+    send_recurring_invoice_email
 )
-from app.utils.dependencies import get_current_user
 from app.utils.recurring_invoice_utils import (
-    calculate_next_date, calculate_next_dates, validate_recurrence_config,
+    expand_schedule, next_occurrence_after, validate_recurrence_config,
     format_frequency_display
 )
-from app.utils.mail import send_email
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 import logging
-import uuid
 import json
 
 router = APIRouter(prefix="/recurring-invoices", tags=["Recurring Invoices"])
 logger = logging.getLogger(__name__)
 
-def create_invoice_from_template(template: RecurringInvoice, generation_date: date, db: Session) -> Invoice:
-    """
-    Create a new invoice from a recurring invoice template.
-    
-    Args:
-        template: The recurring invoice template
-        generation_date: The date for the new invoice
-        db: Database session
-    
-    Returns:
-        Created invoice instance
-    """
-    # Generate invoice number
-    last_invoice = db.query(Invoice).order_by(Invoice.id.desc()).first()
-    invoice_number = f"INV-{(last_invoice.id + 1 if last_invoice else 1):05d}"
-    
-    # Calculate totals from template items
-    subtotal = sum(item.amount for item in template.template_items)
-    tax_rate = 18.0  # Default tax rate
-    tax_amount = (subtotal * tax_rate) / 100
-    total_amount = subtotal + tax_amount  # No discount for recurring invoices by default
-    
-    # Create invoice
-    invoice = Invoice(
-        invoice_number=invoice_number,
-        client_id=template.client_id,
-        issue_date=generation_date,
-        due_date=generation_date + timedelta(days=30),  # 30 days due date
-        subtotal=subtotal,
-        tax_rate=tax_rate,
-        tax_amount=tax_amount,
-        discount=0.0,  # No discount by default
-        total_amount=total_amount,
-        status="draft",
-        notes=f"Generated from recurring template: {template.template_name}",
-        terms="Payment due within 30 days.",
-        created_by=template.created_by,
-        recurring_template_id=template.id,
-        generated_by_template=True
-    )
-    
-    db.add(invoice)
-    db.flush()  # Get invoice.id
-    
-    # Create invoice items from template items
-    for template_item in template.template_items:
-        invoice_item = InvoiceItem(
-            invoice_id=invoice.id,
-            description=template_item.description,
-            quantity=template_item.quantity,
-            rate=template_item.rate,
-            amount=template_item.amount
-        )
-        db.add(invoice_item)
-    
-    # Update template statistics
-    template.current_occurrence += 1
-    template.generation_count += 1
-    template.last_generated_at = datetime.utcnow()
-    
-    # Calculate next due date
-    template.next_due_date = calculate_next_date(
-        generation_date,
-        template.frequency,
-        template.interval_value,
-        template.day_of_week,
-        template.day_of_month
-    )
-    
-    # Check if we should deactivate the template
-    if template.occurrences_limit and template.current_occurrence >= template.occurrences_limit:
-        template.is_active = False
-    
-    if template.end_date and template.next_due_date > template.end_date:
-        template.is_active = False
-    
-    return invoice
-
-async def send_recurring_invoice_email(invoice: Invoice, template: RecurringInvoice, db: Session):
-    """
-    Send email for a generated recurring invoice if auto-send is enabled.
-    
-    Args:
-        invoice: The generated invoice
-        template: The template that generated it
-        db: Database session
-    """
-    if not template.auto_send or not template.email_subject:
-        return
-    
-    try:
-        # Get client email
-        client_email = invoice.client.email if invoice.client else None
-        if not client_email:
-            logger.warning(f"No email found for client {invoice.client_id}")
-            return
-        
-        # Prepare invoice data for email
-        invoice_data = {
-            'company_name': 'Webby Wonder',
-            'company_location': 'Mumbai, India',
-            'client_name': invoice.client.name if invoice.client else 'Client',
-            'invoice_number': invoice.invoice_number,
-            'total_amount': f"{invoice.total_amount:,.2f}",
-            'due_date': invoice.due_date.strftime('%d/%m/%Y') if invoice.due_date else 'N/A'
-        }
-        
-        # Generate tracking ID
-        tracking_id = str(uuid.uuid4())
-        
-        # Send email
-        await send_email(
-            subject=template.email_subject,
-            recipients=[client_email],
-            invoice_data=invoice_data,
-            attachment=None,  # No attachment for auto-send
-            tracking_id=tracking_id
-        )
-        
-        # Create email history record
-        email_history = EmailHistory(
-            invoice_id=invoice.id,
-            sent_to=client_email,
-            recipient=client_email,
-            subject=template.email_subject,
-            cc=None,
-            bcc=None,
-            body_preview=template.email_message[:500] if template.email_message else None,
-            attachment_filename=None,
-            status=EmailStatus.SENT,
-            tracking_id=tracking_id,
-            sent_at=datetime.utcnow()
-        )
-        db.add(email_history)
-        
-        logger.info(f"Auto-sent recurring invoice {invoice.invoice_number} to {client_email}")
-        
-    except Exception as e:
-        logger.error(f"Failed to auto-send recurring invoice {invoice.invoice_number}: {str(e)}")
-        # Increment failed generations counter
-        template.failed_generations += 1
-
 @router.post("/generate", status_code=status.HTTP_200_OK)
 async def generate_due_recurring_invoices(
     db: Session = Depends(get_db),
@@ -177,55 +40,63 @@ async def generate_due_recurring_invoices(
     Manually trigger generation of due recurring invoices.
     This endpoint can be called by a cron job or manually.
     """
-    today = date.today()
-    
-    # Get all active templates due for generation
-    templates = db.query(RecurringInvoice).filter(
-        RecurringInvoice.created_by == current_user.id,
-        RecurringInvoice.is_active == True,
-        RecurringInvoice.next_due_date <= today
-    ).all()
-    
-    generated_invoices = []
-    failed_generations = []
-    
-    for template in templates:
-        try:
-            # Check constraints before generation
-            if template.end_date and today > template.end_date:
-                template.is_active = False
-                continue
-            
-            if template.occurrences_limit and template.current_occurrence >= template.occurrences_limit:
-                template.is_active = False
-                continue
-            
-            # Generate invoice
-            invoice = create_invoice_from_template(template, today, db)
-            generated_invoices.append(invoice)
-            
-            # Send email if auto-send is enabled
-            if template.auto_send:
-                await send_recurring_invoice_email(invoice, template, db)
-            
-            logger.info(f"Generated recurring invoice {invoice.invoice_number} from template {template.template_name}")
-            
-        except Exception as e:
-            logger.error(f"Failed to generate invoice from template {template.template_name}: {str(e)}")
-            template.failed_generations += 1
-            failed_generations.append({
-                'template_id': template.id,
-                'template_name': template.template_name,
-                'error': str(e)
-            })
-    
-    db.commit()
+    result = await generate_due_invoices(db, user_id=current_user.id)
     
     return {
-        'message': f'Generated {len(generated_invoices)} invoices, {len(failed_generations)} failures',
-        'generated_invoices': len(generated_invoices),
-        'failed_generations': len(failed_generations),
-        'details': failed_generations
+        'message': f"Generated {result['generated']} invoices, {result['failed']} failures",
+        'generated_invoices': result['generated'],
+        'failed_generations': result['failed'],
+        'details': result['details']
+    }
+
+@router.post("/generate-all", response_model=RecurringGenerationRunResponse, status_code=status.HTTP_202_ACCEPTED)
+async def generate_all_due_recurring_invoices(
+    background_tasks: BackgroundTasks,
+    shard: Optional[int] = Query(None, ge=0),
+    shards: Optional[int] = Query(None, ge=1, le=1024),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """
+    Generate every user's due recurring invoices in the background, as one worker.
+    Several runs (or python -m app.utils.recurring_generation workers) can go at once.
+    Poll GET /recurring-invoices/generate-all/{run_id} for the summary.
+    """
+    run = create_generation_run(db, current_user, shard, shards)
+    background_tasks.add_task(run_generation, run.id)
+    return _run_response(run)
+
+@router.get("/generate-all/{run_id}", response_model=RecurringGenerationRunResponse)
+async def get_generation_run(
+    run_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """Status and summary of a system-wide generation run"""
+    run = db.query(RecurringGenerationRun).filter(RecurringGenerationRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Generation run not found")
+    return _run_response(run)
+
+def _run_response(run: RecurringGenerationRun) -> dict:
+    return {
+        "id": run.id,
+        "status": run.status,
+        "shard": run.shard,
+        "shards": run.shards,
+        "as_of": run.as_of,
+        "worker": run.worker,
+        "generated": run.generated or 0,
+        "failed": run.failed or 0,
+        "batches": run.batches or 0,
+        "shards_done": run.shards_done or 0,
+        "shards_skipped": run.shards_skipped or 0,
+        "duration_ms": run.duration_ms,
+        "details": json.loads(run.details) if run.details else [],
+        "error_message": run.error_message,
+        "created_at": run.created_at,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
     }
 
 @router.post("/{template_id}/generate", response_model=dict)
@@ -259,6 +130,7 @@ async def generate_single_recurring_invoice(
     try:
         # Generate invoice
         invoice = create_invoice_from_template(template, today, db)
+        db.flush()  # Get invoice.id
         
         # Send email if auto-send is enabled
         if template.auto_send:
@@ -336,6 +208,8 @@ async def get_recurring_invoices(
     is_active: Optional[bool] = Query(None),
     client_id: Optional[int] = Query(None),
     frequency: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    include: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -352,7 +226,14 @@ async def get_recurring_invoices(
     if frequency is not None:
         query = query.filter(RecurringInvoice.frequency == frequency)
     
-    templates = query.order_by(RecurringInvoice.created_at.desc()).all()
+    query = query.order_by(RecurringInvoice.created_at.desc())
+    if fields is not None or include is not None:
+        fieldset = RECURRING_READ.fieldset(
+            fields, include if include is not None else "client", default_fields=RECURRING_LIST_FIELDS
+        )
+        return FastJSONResponse(RECURRING_READ.fetch(db, query, fieldset))
+
+    templates = query.all()
     
     result = []
     for template in templates:
@@ -380,10 +261,28 @@ async def get_recurring_invoices(
 @router.get("/{template_id}", response_model=RecurringInvoiceResponse)
 async def get_recurring_invoice(
     template_id: int,
+    fields: Optional[str] = Query(None),
+    include: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific recurring invoice template."""
+    if fields is not None or include is not None:
+        rows = RECURRING_READ.fetch(
+            db,
+            db.query(RecurringInvoice).filter(
+                RecurringInvoice.id == template_id,
+                RecurringInvoice.created_by == current_user.id
+            ),
+            RECURRING_READ.fieldset(fields, include)
+        )
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Recurring invoice template not found"
+            )
+        return FastJSONResponse(rows[0])
+
     template = db.query(RecurringInvoice).filter(
         RecurringInvoice.id == template_id,
         RecurringInvoice.created_by == current_user.id
@@ -409,6 +308,8 @@ async def get_recurring_invoice(
         'current_occurrence': template.current_occurrence,
         'is_active': template.is_active,
         'auto_send': template.auto_send,
+        'tax_enabled': template.tax_enabled,
+        'tax_rate': template.tax_rate,
         'email_subject': template.email_subject,
         'email_message': template.email_message,
         'created_by': template.created_by,
@@ -461,12 +362,13 @@ async def create_recurring_invoice(
         )
     
     # Calculate first next due date
-    next_due_date = calculate_next_date(
+    next_due_date = next_occurrence_after(
         template_data.start_date,
         template_data.frequency,
         template_data.interval_value,
         template_data.day_of_week,
-        template_data.day_of_month
+        template_data.day_of_month,
+        template_data.start_date
     )
     
     # Create the template
@@ -520,6 +422,8 @@ async def create_recurring_invoice(
         'current_occurrence': template.current_occurrence,
         'is_active': template.is_active,
         'auto_send': template.auto_send,
+        'tax_enabled': template.tax_enabled,
+        'tax_rate': template.tax_rate,
         'email_subject': template.email_subject,
         'email_message': template.email_message,
         'created_by': template.created_by,
@@ -602,24 +506,19 @@ async def update_recurring_invoice(
     if template_data.email_message is not None:
         template.email_message = template_data.email_message
     
-    # Update items if provided
+    # Update items if provided, touching only the rows that changed
     if template_data.items is not None:
-        # Delete existing items
-        db.query(RecurringInvoiceTemplateItem).filter(
+        existing_items = db.query(RecurringInvoiceTemplateItem).filter(
             RecurringInvoiceTemplateItem.recurring_invoice_id == template.id
-        ).delete()
-        
-        # Create new items
-        for i, item_data in enumerate(template_data.items):
-            item = RecurringInvoiceTemplateItem(
-                recurring_invoice_id=template.id,
-                description=item_data.description,
-                quantity=item_data.quantity,
-                rate=item_data.rate,
-                amount=item_data.quantity * item_data.rate,
-                sort_order=i
+        ).all()
+        try:
+            apply_item_diff(
+                db, existing_items, template_data.items,
+                lambda **values: RecurringInvoiceTemplateItem(recurring_invoice_id=template.id, **values),
+                ordered=True
             )
-            db.add(item)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
     
     # Recalculate next due date if frequency or date-related fields changed
     if frequency_changed or template_data.start_date is not None:
@@ -638,12 +537,13 @@ async def update_recurring_invoice(
                 detail="Invalid recurrence configuration: " + "; ".join(errors)
             )
         
-        template.next_due_date = calculate_next_date(
+        template.next_due_date = next_occurrence_after(
             template.start_date,
             template.frequency,
             template.interval_value,
             template.day_of_week,
-            template.day_of_month
+            template.day_of_month,
+            template.start_date
         )
     
     template.updated_at = datetime.utcnow()
@@ -665,6 +565,8 @@ async def update_recurring_invoice(
         'current_occurrence': template.current_occurrence,
         'is_active': template.is_active,
         'auto_send': template.auto_send,
+        'tax_enabled': template.tax_enabled,
+        'tax_rate': template.tax_rate,
         'email_subject': template.email_subject,
         'email_message': template.email_message,
         'created_by': template.created_by,
@@ -743,6 +645,8 @@ async def toggle_recurring_invoice_status(
         'current_occurrence': template.current_occurrence,
         'is_active': template.is_active,
         'auto_send': template.auto_send,
+        'tax_enabled': template.tax_enabled,
+        'tax_rate': template.tax_rate,
         'email_subject': template.email_subject,
         'email_message': template.email_message,
         'created_by': template.created_by,
@@ -778,8 +682,10 @@ async def preview_upcoming_invoices(
             detail="Recurring invoice template not found"
         )
     
-    # Calculate next dates
-    next_dates = calculate_next_dates(
+    # Upcoming dates from the next due one, within the occurrences left
+    if template.occurrences_limit:
+        count = min(count, max(template.occurrences_limit - template.current_occurrence, 0))
+    next_dates = expand_schedule(
         template.start_date,
         template.frequency,
         template.interval_value,
@@ -787,7 +693,7 @@ async def preview_upcoming_invoices(
         template.day_of_month,
         count,
         template.end_date,
-        template.occurrences_limit
+        from_date=template.next_due_date
     )
     
     return RecurringInvoicePreview(
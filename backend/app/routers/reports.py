@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, extract
 from app.database import get_db
@@ -7,12 +7,21 @@ from app.models.expense import Expense
 from app.models.expense_category import ExpenseCategory
 from app.models.user import User
 from app.models.client import Client
-from app.utils.dependencies import get_current_user
-from datetime import datetime, timedelta
-from app.schemas.report import RevenueReportItem, TopClientReportItem, LatePayingClientsReportItem
-from typing import List
-
-router = APIRouter(prefix="/reports", tags=["Reports"])
+from app.utils.dependencies import get_current_user, get_current_active_superuser
+from app.utils import ar_aging
+from app.utils.cash_forecast import GRANULARITIES, cash_forecast
+from app.utils.response_cache import CachedRoute
+from app.utils.single_flight import get_single_flight
+from datetime import date, datetime, timedelta
+from app.schemas.report import (
+    RevenueReportItem, TopClientReportItem, LatePayingClientsReportItem,
+    AgingReport, AgingInvoiceItem, AgingSnapshotItem, AgingSnapshotRunResponse, CashForecast,
+)
+from typing import List, Optional
+
+router = APIRouter(prefix="/reports", tags=["Reports"], route_class=CachedRoute)
+
+profit_analysis_flight = get_single_flight("reports.profit_analysis")
 
 @router.get("/late-paying-clients", response_model=List[LatePayingClientsReportItem])
 async def get_late_paying_clients(
@@ -25,6 +34,7 @@ async def get_late_paying_clients(
         func.count(Invoice.id).label("overdue_invoices"),
         func.sum(Invoice.total_amount - Invoice.paid_amount).label("total_overdue_amount")
     ).join(Invoice, Client.id == Invoice.client_id).filter(
+        Invoice.created_by == current_user.id,
         Invoice.status == "overdue"
     ).group_by(Client.id, Client.name).order_by(
         func.count(Invoice.id).desc()
@@ -43,6 +53,7 @@ async def get_top_clients(
         Client.name.label("client_name"),
         func.sum(Invoice.base_currency_amount).label("total_revenue")
     ).join(Invoice, Client.id == Invoice.client_id).filter(
+        Invoice.created_by == current_user.id,
         Invoice.status.in_(["paid", "sent", "overdue"])
     ).group_by(Client.id, Client.name).order_by(
         func.sum(Invoice.base_currency_amount).desc()
@@ -61,6 +72,7 @@ async def get_revenue_report(
     query = db.query(
         func.sum(Invoice.base_currency_amount).label("total_revenue")
     ).filter(
+        Invoice.created_by == current_user.id,
         Invoice.status.in_(["paid", "sent", "overdue"])
     )
 
@@ -114,7 +126,7 @@ async def get_expenses_by_category(
         ExpenseCategory.name, ExpenseCategory.color
     ).order_by(func.sum(Expense.base_currency_amount).desc()).all()
 
-    return result
+    return [dict(row._mapping) for row in result]
 
 @router.get("/expenses/by-vendor")
 async def get_top_expense_vendors(
@@ -143,17 +155,22 @@ async def get_top_expense_vendors(
         func.sum(Expense.base_currency_amount).desc()
     ).limit(limit).all()
 
-    return result
+    return [dict(row._mapping) for row in result]
 
 @router.get("/profit-analysis")
 async def get_profit_analysis(
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     start_date: str = None,
     end_date: str = None,
     group_by: str = "month",
 ):
     """Get profit analysis (Revenue - Expenses)"""
+    return await profit_analysis_flight.run_in_session(
+        (current_user.id, start_date, end_date, group_by), current_user.id,
+        _compute_profit_analysis, current_user, start_date, end_date, group_by
+    )
+
+def _compute_profit_analysis(db: Session, current_user: User, start_date: str, end_date: str, group_by: str) -> dict:
     # Get revenue data
     revenue_query = db.query(
         func.sum(Invoice.base_currency_amount).label("total_revenue")
@@ -336,3 +353,56 @@ async def get_tax_deductible_expenses(
             for r in result
         ]
     }
+
+
+@router.get("/ar-aging", response_model=AgingReport)
+async def get_ar_aging(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Outstanding receivables by client and days past due, with DSO."""
+    return ar_aging.aging_report(db, current_user)
+
+@router.get("/ar-aging/invoices", response_model=List[AgingInvoiceItem])
+async def get_ar_aging_invoices(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    bucket: Optional[str] = None,
+    client_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Drill-down: the open invoices in one aging bucket and/or for one client."""
+    if bucket is not None and bucket not in ar_aging.BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {', '.join(ar_aging.BUCKETS)}")
+    return ar_aging.aging_invoices(db, current_user.id, bucket, client_id, skip=skip, limit=limit)
+
+@router.get("/ar-aging/history", response_model=List[AgingSnapshotItem])
+async def get_ar_aging_history(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    days: int = Query(90, ge=1, le=3660),
+):
+    """Daily aging totals and DSO from the stored snapshots, ending with today's current totals."""
+    return ar_aging.aging_history(db, current_user.id, days)
+
+@router.post("/ar-aging/snapshots", response_model=AgingSnapshotRunResponse)
+async def take_ar_aging_snapshots(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser),
+):
+    """Snapshot today's aging for every user; meant to be called daily by a cron job."""
+    today = date.today()
+    return {"snapshot_date": today, "snapshots": ar_aging.take_snapshots(db, today)}
+
+@router.get("/cash-forecast", response_model=CashForecast)
+async def get_cash_forecast(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    granularity: str = "month",
+    months: int = Query(12, ge=1, le=24),
+):
+    """Expected cash-in per week or month from open invoices and active recurring templates."""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    return cash_forecast(db, current_user, granularity, months)
@@ -0,0 +1,104 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.revaluation_job import RevaluationJob
+from app.models.user import User
+from app.schemas.revaluation import RevaluationCreate, RevaluationJobResponse
+from app.utils.dependencies import get_current_user
+from app.utils.revaluation import claim_job, create_revaluation_job, is_active, run_revaluation
+import re
+
+router = APIRouter(prefix="/revaluations", tags=["Revaluation"])
+
+@router.post("", response_model=RevaluationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_revaluation(
+    revaluation: RevaluationCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Recompute exchange rates and base-currency amounts of all your invoices and
+    expenses in the background, optionally switching base currency first.
+    Poll GET /revaluations/{job_id} for progress.
+    """
+    if revaluation.base_currency is not None and not re.fullmatch(r"[A-Za-z]{3}", revaluation.base_currency):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="base_currency must be a 3-letter currency code"
+        )
+
+    running = db.query(RevaluationJob.id).filter(
+        RevaluationJob.user_id == current_user.id,
+        RevaluationJob.status.in_(["pending", "running"])
+    ).all()
+    if any(is_active(job_id) for (job_id,) in running):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A revaluation is already running"
+        )
+
+    job = create_revaluation_job(db, current_user, revaluation.base_currency)
+    background_tasks.add_task(run_revaluation, job.id)
+    return _job_response(job)
+
+@router.get("/{job_id}", response_model=RevaluationJobResponse)
+async def get_revaluation(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Progress and result of a revaluation"""
+    return _job_response(_get_job(db, job_id, current_user))
+
+@router.post("/{job_id}/resume", response_model=RevaluationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def resume_revaluation(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Continue a failed or interrupted revaluation from its last checkpoint"""
+    job = _get_job(db, job_id, current_user)
+    if job.status == "completed":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Revaluation already completed")
+    if not claim_job(job.id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Revaluation is already running")
+
+    background_tasks.add_task(run_revaluation, job.id)
+    return _job_response(job)
+
+def _get_job(db: Session, job_id: int, current_user: User) -> RevaluationJob:
+    job = db.query(RevaluationJob).filter(
+        RevaluationJob.id == job_id,
+        RevaluationJob.user_id == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Revaluation not found")
+    return job
+
+def _job_response(job: RevaluationJob) -> dict:
+    total = (job.invoices_total or 0) + (job.expenses_total or 0)
+    processed = (job.invoices_processed or 0) + (job.expenses_processed or 0)
+    if job.status == "completed" or not total:
+        progress = 1.0 if job.status == "completed" else 0.0
+    else:
+        progress = min(processed / total, 1.0)
+
+    return {
+        "id": job.id,
+        "base_currency": job.base_currency,
+        "status": job.status,
+        "phase": job.phase,
+        "progress": round(progress, 4),
+        "invoices_total": job.invoices_total or 0,
+        "invoices_processed": job.invoices_processed or 0,
+        "invoices_changed": job.invoices_changed or 0,
+        "expenses_total": job.expenses_total or 0,
+        "expenses_processed": job.expenses_processed or 0,
+        "expenses_changed": job.expenses_changed or 0,
+        "error_message": job.error_message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,181 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from app.config import settings
+from app.database import get_db
+from app.models.change_log import ChangeLog
+from app.models.client import Client
+from app.models.expense import Expense
+from app.models.invoice import Invoice
+from app.models.invoice_template import InvoiceTemplate
+from app.models.recurring_invoice import RecurringInvoice
+from app.models.user import User
+from app.utils.change_log import DELETE
+from app.utils.dependencies import get_current_user
+from app.utils.fast_json import FastJSONResponse
+from app.utils.read_models import (
+    CLIENT_READ, EXPENSE_READ, RECURRING_READ, TEMPLATE_READ, IN_CLAUSE_CHUNK, fetch_invoice_rows
+)
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+# entity name -> (model, tenant column, read model; None means fetch_invoice_rows)
+SYNC_ENTITIES = {
+    "invoices": (Invoice, Invoice.created_by, None),
+    "clients": (Client, Client.created_by, CLIENT_READ),
+    "expenses": (Expense, Expense.created_by, EXPENSE_READ),
+    "recurring_invoices": (RecurringInvoice, RecurringInvoice.created_by, RECURRING_READ),
+    "invoice_templates": (InvoiceTemplate, InvoiceTemplate.user_id, TEMPLATE_READ),
+}
+
+@router.get("")
+async def get_changes(
+    cursor: Optional[int] = Query(None, ge=0, description="Cursor from the previous response; omit for a full snapshot"),
+    entities: Optional[str] = Query(None, description="Comma-separated subset of entities to sync"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum change-log entries, or snapshot records, per page"),
+    snapshot_page: Optional[str] = Query(None, description="next_page from the previous snapshot response"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delta sync. Returns the records upserted and the ids deleted since ``cursor``,
+    grouped by entity, plus the cursor to send next time. Without a cursor the
+    current state of every entity is returned as upserts, ``limit`` records per
+    page; follow ``next_page`` with ``snapshot_page`` until it is null.
+
+    On databases with concurrent writers a change_log id is taken at flush but
+    becomes visible at commit, so a lower id can show up after a higher one was
+    read. The cursor handed out therefore stops before the first change younger
+    than SYNC_CURSOR_LAG_SECONDS, and such changes are sent again next time.
+    """
+    names = _parse_entities(entities)
+
+    if cursor is None:
+        if snapshot_page is None:
+            # Take the cursor before reading, so changes racing with the snapshot are replayed next time
+            query = db.query(func.max(ChangeLog.id)).filter(ChangeLog.user_id == current_user.id)
+            horizon = _lag_horizon(db)
+            if horizon is not None:
+                query = query.filter(ChangeLog.changed_at <= horizon)
+            latest, entity, after_id = query.scalar() or 0, names[0], 0
+        else:
+            latest, entity, after_id = _parse_snapshot_page(snapshot_page, names)
+        changes, next_page = _snapshot_page(db, names, current_user.id, entity, after_id, limit)
+        return FastJSONResponse({
+            "cursor": latest,
+            "has_more": next_page is not None,
+            "snapshot": True,
+            "next_page": f"{latest}:{next_page[0]}:{next_page[1]}" if next_page else None,
+            "changes": changes,
+        })
+
+    entries = db.query(
+        ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.operation, ChangeLog.changed_at
+    ).filter(
+        ChangeLog.user_id == current_user.id,
+        ChangeLog.id > cursor,
+        ChangeLog.entity.in_(names)
+    ).order_by(ChangeLog.id).limit(limit + 1).all()
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    next_cursor = entries[-1].id if entries else cursor
+    horizon = _lag_horizon(db)
+    if horizon is not None:
+        for index, entry in enumerate(entries):
+            if entry.changed_at is not None and entry.changed_at > horizon:
+                # Hold the cursor here; the client polls again rather than paging on
+                next_cursor = entries[index - 1].id if index else cursor
+                has_more = False
+                break
+
+    # Only the latest operation per record matters
+    latest_operation = {}
+    for entry in entries:
+        latest_operation[(entry.entity, entry.entity_id)] = entry.operation
+
+    changes = {}
+    for name in names:
+        upserted = [entity_id for (entity, entity_id), op in latest_operation.items() if entity == name and op != DELETE]
+        deleted = [entity_id for (entity, entity_id), op in latest_operation.items() if entity == name and op == DELETE]
+        changes[name] = {
+            "upserts": _fetch_records(db, name, current_user.id, upserted) if upserted else [],
+            "deletes": deleted,
+        }
+
+    return FastJSONResponse({
+        "cursor": next_cursor,
+        "has_more": has_more,
+        "snapshot": False,
+        "changes": changes,
+    })
+
+def _parse_entities(entities: Optional[str]) -> List[str]:
+    if entities is None:
+        return list(SYNC_ENTITIES)
+
+    names = [name.strip() for name in entities.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SYNC_ENTITIES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown entities: {', '.join(unknown)}"
+        )
+    return names
+
+def _lag_horizon(db: Session) -> Optional[datetime]:
+    """changed_at after which change-log entries may still be overtaken; None where writers are serialized."""
+    if db.get_bind().dialect.name == "sqlite" or settings.SYNC_CURSOR_LAG_SECONDS <= 0:
+        return None
+    return datetime.utcnow() - timedelta(seconds=settings.SYNC_CURSOR_LAG_SECONDS)
+
+def _parse_snapshot_page(snapshot_page: str, names: List[str]) -> Tuple[int, str, int]:
+    """(sync cursor, entity, last id sent) from a next_page token."""
+    try:
+        latest, entity, after_id = snapshot_page.split(":")
+        latest, after_id = int(latest), int(after_id)
+    except ValueError:
+        latest, entity, after_id = None, None, None
+    if entity not in names:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid snapshot_page for these entities"
+        )
+    return latest, entity, after_id
+
+def _snapshot_page(db: Session, names: List[str], user_id: int, entity: str, after_id: int, limit: int):
+    """
+    Up to ``limit`` records of the user's entities in (entity, id) order, from the
+    one after ``after_id`` of ``entity``; returns them and the (entity, id) to continue from.
+    """
+    changes = {name: {"upserts": [], "deletes": []} for name in names}
+    remaining = limit
+    for name in names[names.index(entity):]:
+        model, tenant_column, read_model = SYNC_ENTITIES[name]
+        query = db.query(model).filter(tenant_column == user_id, model.id > after_id).order_by(model.id).limit(remaining)
+        records = _read(db, query, read_model)
+        changes[name]["upserts"] = records
+        remaining -= len(records)
+        if remaining == 0:
+            return changes, (name, records[-1]["id"])
+        after_id = 0
+    return changes, None
+
+def _fetch_records(db: Session, name: str, user_id: int, ids: List[int]) -> List[dict]:
+    """Current state of the given records, oldest change first."""
+    model, tenant_column, read_model = SYNC_ENTITIES[name]
+    base_query = db.query(model).filter(tenant_column == user_id)
+
+    records = []
+    for start in range(0, len(ids), IN_CLAUSE_CHUNK):
+        query = base_query.filter(model.id.in_(ids[start:start + IN_CLAUSE_CHUNK]))
+        records.extend(_read(db, query.order_by(model.updated_at, model.id), read_model))
+    return records
+
+def _read(db: Session, query, read_model) -> List[dict]:
+    if read_model is None:
+        return fetch_invoice_rows(db, query)
+    return read_model.fetch(db, query, read_model.fieldset())
@@ -13,9 +13,10 @@ from app.schemas.invoice_template import (
     UserTemplateDefaultResponse
 )
 from app.utils.dependencies import get_current_user
+from app.utils.response_cache import CachedRoute
 import json
 
-router = APIRouter(prefix="/templates", tags=["Invoice Templates"])
+router = APIRouter(prefix="/templates", tags=["Invoice Templates"], route_class=CachedRoute)
 
 @router.get("", response_model=List[InvoiceTemplateResponse])
 async def get_templates(
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = Field(None, description="Echoed back so the caller can match responses")
+    path: str = Field(..., description="GET path including query string, e.g. /api/reports/top-clients?limit=5")
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
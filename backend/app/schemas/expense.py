@@ -65,3 +65,24 @@ class ExpenseFilter(BaseModel):
     min_amount: Optional[float] = None
     max_amount: Optional[float] = None
     search: Optional[str] = None
+
+class ExpenseImportError(BaseModel):
+    row: int
+    error: str
+
+class ExpenseImportJobResponse(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    file_format: str
+    status: str
+    progress: float  # 0..1, by bytes of the statement file processed
+    rows_read: int
+    imported: int
+    duplicates: int
+    skipped: int
+    failed: int
+    errors: List[ExpenseImportError] = []
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -11,6 +11,9 @@ class InvoiceItemBase(BaseModel):
 class InvoiceItemCreate(InvoiceItemBase):
     pass
 
+class InvoiceItemUpdate(InvoiceItemBase):
+    id: Optional[int] = None  # existing item to update; omit for a new item
+
 
 
 class InvoiceItemResponse(InvoiceItemBase):
@@ -47,7 +50,7 @@ class InvoiceUpdate(BaseModel):
     status: Optional[str] = None
     notes: Optional[str] = None
     terms: Optional[str] = None
-    items: Optional[List[InvoiceItemCreate]] = None
+    items: Optional[List[InvoiceItemUpdate]] = None
     currency: Optional[str] = None
     exchange_rate: Optional[float] = None
     design_template_id: Optional[int] = None
@@ -75,3 +78,42 @@ class InvoiceResponse(InvoiceBase):
         from_attributes = True,
         exclude = {'created_by_user', 'payments'}
     )
+
+
+class InvoiceImportRow(InvoiceCreate):
+    invoice_number: Optional[str] = None  # Keep the number from the source system; allocated when omitted
+
+class InvoiceBulkCreate(BaseModel):
+    invoices: List[dict]  # Validated row by row as InvoiceImportRow so one bad row doesn't reject the batch
+
+class InvoiceImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class InvoiceImportResponse(BaseModel):
+    created: int
+    failed: int
+    errors: List[InvoiceImportError]
+
+class OverdueRunResponse(BaseModel):
+    as_of: date
+    transitioned: int
+    batches: int
+    tenants: int
+    duration_ms: float
+
+class InvoiceExportJobResponse(BaseModel):
+    id: int
+    status: str
+    filters: dict
+    progress: float  # 0..1, by invoices rendered or found in the PDF cache
+    invoices_total: int
+    invoices_processed: int
+    rendered: int
+    cached: int
+    failed: int
+    download_url: Optional[str] = None  # Set once every PDF is ready
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict
+
+class ProfilerArmRequest(BaseModel):
+    path_prefix: str = Field(..., description="Request path prefix, e.g. /api/dashboard/stats")
+    count: int = Field(5, ge=0, le=100, description="Number of matching requests to profile (0 disarms)")
+
+class ProfilerStatusResponse(BaseModel):
+    header_enabled: bool
+    armed: Dict[str, int]
+
+class ProfileReportResponse(BaseModel):
+    name: str
+    size: int
+    created_at: datetime
+
+class SingleFlightStatsResponse(BaseModel):
+    name: str
+    calls: int
+    executions: int
+    coalesced: int
+    coalesce_ratio: float
+    timeouts: int
+    errors: int
+    in_flight: int
+
+class EventStreamStatsResponse(BaseModel):
+    channels: int
+    subscribers: int
+    published: int
+    dropped: int
@@ -11,6 +11,9 @@ class RecurringInvoiceTemplateItemBase(BaseModel):
 class RecurringInvoiceTemplateItemCreate(RecurringInvoiceTemplateItemBase):
     pass
 
+class RecurringInvoiceTemplateItemUpdate(RecurringInvoiceTemplateItemBase):
+    id: Optional[int] = None  # existing item to update; omit for a new item
+
 class RecurringInvoiceTemplateItemResponse(RecurringInvoiceTemplateItemBase):
     id: int
     amount: float
@@ -56,7 +59,7 @@ class RecurringInvoiceUpdate(BaseModel):
     tax_rate: Optional[float] = None
     email_subject: Optional[str] = None
     email_message: Optional[str] = None
-    items: Optional[List[RecurringInvoiceTemplateItemCreate]] = None
+    items: Optional[List[RecurringInvoiceTemplateItemUpdate]] = None
 
 class RecurringInvoiceResponse(RecurringInvoiceBase):
     id: int
@@ -119,6 +122,30 @@ class RecurringInvoicePreview(BaseModel):
     day_of_week: Optional[int] = None
     day_of_month: Optional[int] = None
 
+class RecurringGenerationFailure(BaseModel):
+    template_id: int
+    template_name: str
+    error: str
+
+class RecurringGenerationRunResponse(BaseModel):
+    id: int
+    status: str
+    shard: Optional[int] = None
+    shards: Optional[int] = None
+    as_of: Optional[date] = None
+    worker: Optional[str] = None
+    generated: int
+    failed: int
+    batches: int
+    shards_done: int
+    shards_skipped: int
+    duration_ms: Optional[float] = None
+    details: List[RecurringGenerationFailure]
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
 class RecurringInvoiceStats(BaseModel):
     total_templates: int
     active_templates: int
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from datetime import date
+from typing import List, Optional
 
 class RevenueReportItem(BaseModel):
     total_revenue: float
@@ -26,3 +27,73 @@ class LatePayingClientsReportItem(BaseModel):
 
     class Config:
         orm_mode = True
+
+class AgingBuckets(BaseModel):
+    current: float
+    days_1_30: float
+    days_31_60: float
+    days_61_90: float
+    days_over_90: float
+    total_outstanding: float
+    open_invoices: int
+
+class ClientAgingItem(AgingBuckets):
+    client_id: int
+    client_name: Optional[str] = None
+
+class AgingReport(BaseModel):
+    as_of: date
+    currency: str
+    totals: AgingBuckets
+    trailing_sales: float
+    dso: Optional[float] = None
+    clients: List[ClientAgingItem]
+
+class AgingInvoiceItem(BaseModel):
+    invoice_id: int
+    invoice_number: str
+    client_id: int
+    client_name: Optional[str] = None
+    issue_date: date
+    due_date: date
+    days_past_due: int
+    status: str
+    currency: Optional[str] = None
+    balance: float
+    base_balance: float
+
+class AgingSnapshotItem(AgingBuckets):
+    snapshot_date: date
+    currency: Optional[str] = None
+    trailing_sales: float
+    dso: Optional[float] = None
+
+    class Config:
+        orm_mode = True
+
+class AgingSnapshotRunResponse(BaseModel):
+    snapshot_date: date
+    snapshots: int
+
+class CashForecastPeriod(BaseModel):
+    period_start: date
+    period_end: date
+    receivables: float
+    recurring: float
+    total: float
+    cumulative: float
+
+class CashForecastTotals(BaseModel):
+    receivables: float
+    recurring: float
+    total: float
+
+class CashForecast(BaseModel):
+    as_of: date
+    currency: str
+    granularity: str
+    open_invoices: int
+    recurring_templates: int
+    default_days_to_pay: float
+    totals: CashForecastTotals
+    periods: List[CashForecastPeriod]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class RevaluationCreate(BaseModel):
+    base_currency: Optional[str] = None  # switch to this base currency first; omit to re-apply current rates
+
+class RevaluationJobResponse(BaseModel):
+    id: int
+    base_currency: str
+    status: str
+    phase: str
+    progress: float  # 0..1, by invoice and expense rows processed
+    invoices_total: int
+    invoices_processed: int
+    invoices_changed: int
+    expenses_total: int
+    expenses_processed: int
+    expenses_changed: int
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
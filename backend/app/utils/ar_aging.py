@@ -0,0 +1,253 @@
+"""
+Accounts-receivable aging.
+
+An invoice is open while it is neither a draft nor paid and still has a
+balance (total - paid). Its balance is converted to the user's base currency
+with the invoice's stored exchange_rate. It is then bucketed by days past
+due_date on the as-of day: current (not yet due), 1-30, 31-60, 61-90 and
+over 90. The bucket edges become due_date cutoffs before the query runs.
+Bucketing is then a CASE over due_date, and the whole report is one
+GROUP BY client, bucket pass. Tenant totals are the sum of the client rows.
+
+DSO (days sales outstanding) is the total outstanding divided by the amount
+invoiced over the last AR_AGING_DSO_DAYS days, times that many days.
+
+ar_aging_snapshots keeps one row of tenant totals per day. Rows are written
+only by take_snapshots(), from the daily cron call to
+POST /api/reports/ar-aging/snapshots. Aging history and DSO trends then read
+one row per day instead of replaying invoices and payments. The history
+never writes: its last row, today's, is computed when it is read.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.ar_aging_snapshot import ARAgingSnapshot
+from app.models.client import Client
+from app.models.invoice import Invoice
+from app.models.user import User
+from app.utils.bulk_insert import bulk_insert
+from app.utils.response_cache import mark_tenant_dirty
+from app.utils.tenancy import SKIP_TENANT_SCOPE
+
+BUCKETS = ("current", "days_1_30", "days_31_60", "days_61_90", "days_over_90")
+# Last day past due of every bucket but the open-ended last one
+BUCKET_LIMITS = (0, 30, 60, 90)
+CLOSED_STATUSES = ("draft", "paid")
+# Balances below this are rounding leftovers, not receivables
+MIN_BALANCE = 0.005
+
+
+def _balance():
+    return Invoice.total_amount - func.coalesce(Invoice.paid_amount, 0.0)
+
+
+def base_balance():
+    return _balance() * func.coalesce(Invoice.exchange_rate, 1.0)
+
+
+def open_invoice_criteria() -> tuple:
+    return Invoice.status.notin_(CLOSED_STATUSES), _balance() > MIN_BALANCE
+
+
+def _bucket_expression(as_of: date):
+    """Index into BUCKETS of an invoice's due_date on ``as_of``."""
+    return case(
+        *[(Invoice.due_date >= as_of - timedelta(days=limit), index) for index, limit in enumerate(BUCKET_LIMITS)],
+        else_=len(BUCKET_LIMITS),
+    )
+
+
+def bucket_due_range(bucket: str, as_of: date) -> Tuple[Optional[date], Optional[date]]:
+    """(earliest, latest) due_date of ``bucket`` on ``as_of``; None is unbounded."""
+    index = BUCKETS.index(bucket)
+    earliest = as_of - timedelta(days=BUCKET_LIMITS[index]) if index < len(BUCKET_LIMITS) else None
+    latest = as_of - timedelta(days=BUCKET_LIMITS[index - 1] + 1) if index > 0 else None
+    return earliest, latest
+
+
+def _empty_row() -> dict:
+    row = {bucket: 0.0 for bucket in BUCKETS}
+    row.update(total_outstanding=0.0, open_invoices=0)
+    return row
+
+
+def _add(row: dict, bucket_index: int, count: int, amount: Optional[float]) -> None:
+    row[BUCKETS[bucket_index]] += amount or 0.0
+    row["total_outstanding"] += amount or 0.0
+    row["open_invoices"] += count
+
+
+def _grouped_buckets(db: Session, key, as_of: date, user_id: Optional[int] = None) -> Dict[int, dict]:
+    """Aging rows keyed by ``key`` (client_id or created_by), from one grouped pass."""
+    bucket = _bucket_expression(as_of).label("bucket")
+    query = db.query(key, bucket, func.count(Invoice.id), func.sum(base_balance())).filter(*open_invoice_criteria())
+    if user_id is not None:
+        query = query.filter(Invoice.created_by == user_id)
+    else:
+        query = query.execution_options(**{SKIP_TENANT_SCOPE: True})
+
+    rows: Dict[int, dict] = {}
+    for group, bucket_index, count, amount in query.group_by(key, bucket):
+        _add(rows.setdefault(group, _empty_row()), bucket_index, count, amount)
+    return rows
+
+
+def trailing_sales(db: Session, as_of: date, user_id: Optional[int] = None) -> Dict[int, float]:
+    """Base-currency amount invoiced per user over the DSO window ending on ``as_of``."""
+    query = db.query(Invoice.created_by, func.sum(Invoice.base_currency_amount)).filter(
+        Invoice.status != "draft",
+        Invoice.issue_date > as_of - timedelta(days=settings.AR_AGING_DSO_DAYS),
+        Invoice.issue_date <= as_of,
+    )
+    if user_id is not None:
+        query = query.filter(Invoice.created_by == user_id)
+    else:
+        query = query.execution_options(**{SKIP_TENANT_SCOPE: True})
+    return {owner: amount or 0.0 for owner, amount in query.group_by(Invoice.created_by)}
+
+
+def compute_dso(outstanding: float, sales: float) -> Optional[float]:
+    if sales <= 0:
+        return None
+    return round(outstanding / sales * settings.AR_AGING_DSO_DAYS, 1)
+
+
+def _rounded(row: dict) -> dict:
+    return {key: round(value, 2) if isinstance(value, float) else value for key, value in row.items()}
+
+
+def aging_report(db: Session, user: User, as_of: Optional[date] = None) -> dict:
+    """Aging buckets for every client with open invoices, plus the tenant totals and DSO."""
+    as_of = as_of or date.today()
+    by_client = _grouped_buckets(db, Invoice.client_id, as_of, user.id)
+    names = dict(db.query(Client.id, Client.name).filter(Client.created_by == user.id)) if by_client else {}
+
+    totals = _empty_row()
+    clients = []
+    for client_id, row in by_client.items():
+        for key in totals:
+            totals[key] += row[key]
+        clients.append({"client_id": client_id, "client_name": names.get(client_id), **_rounded(row)})
+    clients.sort(key=lambda row: (-row["total_outstanding"], row["client_id"]))
+
+    sales = trailing_sales(db, as_of, user.id).get(user.id, 0.0)
+    return {
+        "as_of": as_of,
+        "currency": user.base_currency or "INR",
+        "totals": _rounded(totals),
+        "trailing_sales": round(sales, 2),
+        "dso": compute_dso(totals["total_outstanding"], sales),
+        "clients": clients,
+    }
+
+
+def aging_invoices(
+    db: Session,
+    user_id: int,
+    bucket: Optional[str] = None,
+    client_id: Optional[int] = None,
+    as_of: Optional[date] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[dict]:
+    """Open invoices behind an aging cell, oldest due date first."""
+    as_of = as_of or date.today()
+    query = db.query(
+        Invoice.id, Invoice.invoice_number, Invoice.client_id, Client.name, Invoice.issue_date,
+        Invoice.due_date, Invoice.status, Invoice.currency, _balance(), base_balance(),
+    ).join(Client, Client.id == Invoice.client_id).filter(Invoice.created_by == user_id, *open_invoice_criteria())
+
+    if bucket is not None:
+        earliest, latest = bucket_due_range(bucket, as_of)
+        if earliest is not None:
+            query = query.filter(Invoice.due_date >= earliest)
+        if latest is not None:
+            query = query.filter(Invoice.due_date <= latest)
+    if client_id is not None:
+        query = query.filter(Invoice.client_id == client_id)
+
+    rows = query.order_by(Invoice.due_date, Invoice.id).offset(skip).limit(limit).all()
+    return [
+        {
+            "invoice_id": invoice_id,
+            "invoice_number": invoice_number,
+            "client_id": invoice_client_id,
+            "client_name": client_name,
+            "issue_date": issue_date,
+            "due_date": due_date,
+            "days_past_due": max((as_of - due_date).days, 0),
+            "status": status,
+            "currency": currency,
+            "balance": round(balance, 2),
+            "base_balance": round(base_amount, 2),
+        }
+        for (invoice_id, invoice_number, invoice_client_id, client_name, issue_date,
+             due_date, status, currency, balance, base_amount) in rows
+    ]
+
+
+def _snapshot_rows(db: Session, as_of: date, user_id: Optional[int] = None) -> List[dict]:
+    """Snapshot values of ``user_id``, or of every user with open invoices or recent sales."""
+    by_user = _grouped_buckets(db, Invoice.created_by, as_of, user_id)
+    sales = trailing_sales(db, as_of, user_id)
+    user_ids = {user_id} if user_id is not None else set(by_user) | set(sales)
+    if not user_ids:
+        return []
+
+    currencies = dict(db.query(User.id, User.base_currency).filter(User.id.in_(user_ids)))
+    rows = []
+    for owner in sorted(user_ids):
+        totals = by_user.get(owner) or _empty_row()
+        owner_sales = sales.get(owner, 0.0)
+        rows.append({
+            "user_id": owner,
+            "snapshot_date": as_of,
+            "currency": currencies.get(owner) or "INR",
+            **_rounded(totals),
+            "trailing_sales": round(owner_sales, 2),
+            "dso": compute_dso(totals["total_outstanding"], owner_sales),
+        })
+    return rows
+
+
+def take_snapshots(db: Session, as_of: Optional[date] = None, user_id: Optional[int] = None) -> int:
+    """
+    Write (or overwrite) the ``as_of`` snapshot of ``user_id``, or of every user
+    with open invoices or recent sales. Returns the number of snapshots written.
+    """
+    as_of = as_of or date.today()
+    rows = _snapshot_rows(db, as_of, user_id)
+    now = datetime.utcnow()
+    for row in rows:
+        row["created_at"] = now
+
+    table = ARAgingSnapshot.__table__
+    connection = db.connection()
+    stale = delete(table).where(table.c.snapshot_date == as_of)
+    if user_id is not None:
+        stale = stale.where(table.c.user_id == user_id)
+    connection.execute(stale)
+    if rows:
+        bulk_insert(connection, table, rows)
+    # Cached history responses of every user whose rows changed (None: all users)
+    mark_tenant_dirty(db, user_id)
+    db.commit()
+    return len(rows)
+
+
+def aging_history(db: Session, user_id: int, days: int) -> List[object]:
+    """
+    The user's stored daily snapshots for the last ``days`` days, then today's
+    totals as they stand now.
+    """
+    today = date.today()
+    history: List[object] = db.query(ARAgingSnapshot).filter(
+        ARAgingSnapshot.user_id == user_id,
+        ARAgingSnapshot.snapshot_date > today - timedelta(days=days),
+        ARAgingSnapshot.snapshot_date < today,
+    ).order_by(ARAgingSnapshot.snapshot_date).all()
+    return history + _snapshot_rows(db, today, user_id)
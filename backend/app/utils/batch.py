@@ -0,0 +1,137 @@
+"""
+In-process dispatch of GET sub-requests for /api/batch.
+
+Each sub-request is run through the full ASGI app (middleware, routing,
+response caching) exactly as if it had arrived over HTTP, with its own
+request scope and therefore its own DB session. The user authenticated
+by the batch request is handed down through ``scope["state"]`` so that
+get_current_user can adopt it instead of repeating the token check and
+user lookup.
+
+Sub-requests are started together but share the event loop. Most endpoints
+are ``async def`` and make blocking DB calls, so they run one after another.
+Only the work an endpoint hands to the threadpool overlaps, as the dashboard
+and profit reports do through their single-flight groups. A batch saves
+round trips and token checks, not server time.
+
+A sub-request that raises is answered with a 500 entry of its own, so the
+rest of the batch still returns. Binary and streaming endpoints are refused
+up front. Any other sub-response that turns out not to be JSON is cut off
+when its headers arrive, so its body is never produced or buffered, and it
+is answered with a 406 entry.
+"""
+import asyncio
+import json
+import logging
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import Request
+
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+BATCH_USER_STATE = "batch_user"
+
+INTERNAL_ERROR_BODY = b'{"detail": "Internal Server Error"}'
+NOT_JSON_BODY = b'{"detail": "Only JSON responses can be batched"}'
+
+# Paths that can't be answered as a single JSON document
+EXCLUDED_PREFIXES = (
+    "/api/batch", "/api/events", "/api/client-portal/events", "/api/admin/profiling/reports/",
+)
+EXCLUDED_PATTERNS = (
+    re.compile(r"/api/invoices/\d+/pdf"),
+    re.compile(r"/api/invoices/export/\d+/download"),
+)
+
+
+class _NotJSON(Exception):
+    """Raised from send() to stop a sub-response that isn't JSON."""
+
+
+def validate_path(path: str) -> Optional[str]:
+    """Return an error message for paths that may not be batched, else None."""
+    parts = urlsplit(path)
+    if parts.scheme or parts.netloc or not parts.path.startswith("/api/"):
+        return "Only relative /api/ paths can be batched"
+    if parts.path.startswith(EXCLUDED_PREFIXES) or any(
+        pattern.fullmatch(parts.path.rstrip("/")) for pattern in EXCLUDED_PATTERNS
+    ):
+        return "This endpoint cannot be batched"
+    return None
+
+
+async def dispatch_get(request: Request, path: str, user: User) -> Tuple[int, str, bytes]:
+    """Run ``GET path`` against the app; returns (status, content type, body)."""
+    parts = urlsplit(path)
+    headers = [(b"accept", b"application/json")]
+    authorization = request.headers.get("authorization")
+    if authorization:
+        # Still forwarded: CachedRoute keys its ETags and LRU on the bearer token
+        headers.append((b"authorization", authorization.encode("latin-1")))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": request.url.scheme,
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "root_path": "",
+        "query_string": parts.query.encode(),
+        "headers": headers,
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "state": {BATCH_USER_STATE: user},
+    }
+
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Never disconnect; the response completes on its own
+        await asyncio.Event().wait()
+
+    status_code = 500
+    content_type = ""
+    chunks: List[bytes] = []
+
+    async def send(message):
+        nonlocal status_code, content_type
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"content-type":
+                    content_type = value.decode("latin-1")
+            # Error pages pass through as text; a successful body has to be JSON
+            if 200 <= status_code < 300 and status_code != 204 and not content_type.startswith("application/json"):
+                raise _NotJSON(content_type)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except _NotJSON:
+        return 406, "application/json", NOT_JSON_BODY
+    except Exception as e:
+        # The error middleware may already have sent a 500 before re-raising
+        logger.warning(f"Batched GET {path} failed: {e!r}")
+        return 500, "application/json", INTERNAL_ERROR_BODY
+    return status_code, content_type, b"".join(chunks)
+
+
+def render_result(request_id: Optional[str], path: str, status_code: int, content_type: str, body: bytes) -> bytes:
+    """One element of the batch response; JSON bodies are spliced in without re-parsing."""
+    head = json.dumps({"id": request_id, "path": path, "status": status_code})[:-1]
+    if content_type.startswith("application/json") and body:
+        payload = body
+    else:
+        payload = json.dumps(body.decode("utf-8", errors="replace") if body else None).encode()
+    return head.encode() + b', "body": ' + payload + b"}"
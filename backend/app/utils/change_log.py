@@ -0,0 +1,117 @@
+"""
+Change capture for delta sync.
+
+Every flush that inserts, updates or deletes a tracked entity appends a row
+to ``change_log`` in the same transaction, so the log commits or rolls back
+together with the data. Changes to child rows (invoice items and payments,
+recurring template items) are recorded as an upsert of their parent.
+The change_log id is the sync cursor handed out by /api/sync.
+
+Bulk ``query.update()``/``query.delete()`` statements bypass the flush and
+are not captured; callers that bulk-modify tracked entities should also touch
+the parent objects (as update_invoice does for its items).
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Tuple
+
+from sqlalchemy import DateTime, event, inspect, literal, select
+
+from app.database import SessionLocal
+from app.models.change_log import ChangeLog
+from app.models.client import Client
+from app.models.expense import Expense
+from app.models.invoice import Invoice, InvoiceItem
+from app.models.invoice_template import InvoiceTemplate
+from app.models.payment import Payment
+from app.models.recurring_invoice import RecurringInvoice, RecurringInvoiceTemplateItem
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# model -> (entity name, tenant column)
+TRACKED_ENTITIES = {
+    Invoice: ("invoices", "created_by"),
+    Client: ("clients", "created_by"),
+    Expense: ("expenses", "created_by"),
+    RecurringInvoice: ("recurring_invoices", "created_by"),
+    InvoiceTemplate: ("invoice_templates", "user_id"),
+}
+
+# child model -> (parent model, foreign key attribute)
+CHILD_ENTITIES = {
+    InvoiceItem: (Invoice, "invoice_id"),
+    Payment: (Invoice, "invoice_id"),
+    RecurringInvoiceTemplateItem: (RecurringInvoice, "recurring_invoice_id"),
+}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _record_changes(session, flush_context):
+    # (entity, entity_id) -> (user_id, operation); a delete always wins over an upsert
+    changes: Dict[Tuple[str, int], Tuple[int, str]] = {}
+    parents_to_resolve = defaultdict(set)
+
+    def record(model, obj, operation):
+        entity, tenant_column = TRACKED_ENTITIES[model]
+        state = inspect(obj)
+        key = (entity, state.identity[0] if state.identity else state.dict.get("id"))
+        if changes.get(key, (None, None))[1] != DELETE:
+            changes[key] = (state.dict.get(tenant_column), operation)
+
+    for obj in session.deleted:
+        if type(obj) in TRACKED_ENTITIES:
+            record(type(obj), obj, DELETE)
+
+    for obj in list(session.new) + [o for o in session.dirty if session.is_modified(o)]:
+        if type(obj) in TRACKED_ENTITIES:
+            record(type(obj), obj, UPSERT)
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if type(obj) in CHILD_ENTITIES:
+            parent_model, foreign_key = CHILD_ENTITIES[type(obj)]
+            parent_id = inspect(obj).dict.get(foreign_key)
+            if parent_id is not None and (TRACKED_ENTITIES[parent_model][0], parent_id) not in changes:
+                parents_to_resolve[parent_model].add(parent_id)
+
+    connection = session.connection()
+    for parent_model, parent_ids in parents_to_resolve.items():
+        entity, tenant_column = TRACKED_ENTITIES[parent_model]
+        table = parent_model.__table__
+        owners = connection.execute(
+            select(table.c.id, table.c[tenant_column]).where(table.c.id.in_(parent_ids))
+        )
+        for parent_id, user_id in owners:
+            changes[(entity, parent_id)] = (user_id, UPSERT)
+
+    rows = [
+        {"user_id": user_id, "entity": entity, "entity_id": entity_id, "operation": operation}
+        for (entity, entity_id), (user_id, operation) in changes.items()
+        if user_id is not None
+    ]
+    if rows:
+        connection.execute(ChangeLog.__table__.insert(), rows)
+
+
+def record_bulk_changes(connection, model, entity_ids, operation: str = UPSERT) -> None:
+    """
+    Log rows written with Core bulk statements, which bypass the after_flush capture.
+    Uses a single INSERT ... SELECT so the cost doesn't grow with per-row parameters.
+    """
+    if not entity_ids:
+        return
+    entity, tenant_column = TRACKED_ENTITIES[model]
+    table = model.__table__
+    log = ChangeLog.__table__
+    connection.execute(
+        log.insert().from_select(
+            ["user_id", "entity", "entity_id", "operation", "changed_at"],
+            select(
+                table.c[tenant_column],
+                literal(entity),
+                table.c.id,
+                literal(operation),
+                literal(datetime.utcnow(), DateTime),
+            ).where(table.c.id.in_(entity_ids)).order_by(table.c.id),
+        )
+    )
@@ -1,17 +1,27 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.client import Client
 from app.utils.auth import verify_token
+from app.utils.batch import BATCH_USER_STATE
+from app.utils.tenancy import scope_session_to_user
 
 security = HTTPBearer()
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
+    batch_user = getattr(request.state, BATCH_USER_STATE, None)
+    if batch_user is not None:
+        # Sub-request of /api/batch: adopt the already authenticated user without a SELECT
+        user = db.merge(batch_user, load=False)
+        scope_session_to_user(db, user.id)
+        return user
+
     token = credentials.credentials
     payload = verify_token(token)
     
@@ -35,6 +45,8 @@ async def get_current_user(
             detail="User not found"
         )
     
+    # Everything queried through this request's session is now limited to this user's rows
+    scope_session_to_user(db, user.id)
     return user
 
 async def get_current_client(
@@ -73,15 +85,16 @@ async def get_current_client(
     return client
 
 async def get_current_active_superuser(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """
     Get current active superuser. Raises exception if user is not a superuser.
     """
-    user = await get_current_user(credentials, db)
+    user = await get_current_user(request, credentials, db)
     
-    if not user.is_superuser:
+    if user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges"
@@ -0,0 +1,232 @@
+"""
+In-process pub/sub for live updates over server-sent events.
+
+Committed writes to invoices, payments and email history publish small
+events to the owning user's channel and, for invoices and payments, to the
+invoice client's portal channel. /api/events/stream and
+/api/client-portal/events hold one bounded queue per subscriber and send a
+comment line as a heartbeat when the channel is quiet, so proxies keep the
+connection open and dead clients are noticed.
+
+A subscriber that falls behind by more than EVENT_STREAM_QUEUE_SIZE events
+has its backlog dropped and receives a single ``resync`` event instead;
+it should refetch (e.g. through /api/sync) rather than replay.
+
+Like the response cache, the bus lives in process memory and so matches the
+single uvicorn worker in the Procfile.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Set, Tuple
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import event, inspect, select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.email_history import EmailHistory
+from app.models.invoice import Invoice
+from app.models.payment import Payment
+
+Channel = Tuple[str, int]
+
+_PENDING_KEY = "event_bus_pending"
+
+INVOICE_FIELDS = ("invoice_number", "status", "payment_status", "total_amount", "paid_amount", "currency")
+
+
+def user_channel(user_id: int) -> Channel:
+    return ("user", user_id)
+
+
+def client_channel(client_id: int) -> Channel:
+    return ("client", client_id)
+
+
+class Subscription:
+    """Bounded queue owned by one connected stream."""
+
+    def __init__(self, channel: Channel, max_size: int):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def _put(self, message: dict) -> None:
+        # Runs on the subscriber's event loop
+        if self.queue.full():
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"event": "resync", "data": {}})
+            return
+        self.queue.put_nowait(message)
+
+    def deliver(self, message: dict) -> None:
+        """Thread-safe hand-off; publishers may run in the threadpool."""
+        self.loop.call_soon_threadsafe(self._put, message)
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[Channel, Set[Subscription]] = defaultdict(set)
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, channel: Channel) -> Subscription:
+        subscription = Subscription(channel, settings.EVENT_STREAM_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+            self.dropped += subscription.dropped
+
+    def publish(self, channel: Channel, event_name: str, data: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+            self.published += 1
+        for subscription in subscribers:
+            try:
+                subscription.deliver({"event": event_name, "data": data})
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "channels": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self.published,
+                "dropped": self.dropped,
+            }
+
+
+event_bus = EventBus()
+
+
+def _format(message: dict) -> str:
+    return f"event: {message['event']}\ndata: {json.dumps(message['data'], default=str)}\n\n"
+
+
+async def _stream(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+    heartbeat = settings.EVENT_STREAM_HEARTBEAT_SECONDS
+    try:
+        yield f"retry: {int(heartbeat * 1000)}\n\n"
+        while not await request.is_disconnected():
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            yield _format(message)
+    finally:
+        event_bus.unsubscribe(subscription)
+
+
+def event_stream_response(request: Request, channel: Channel) -> StreamingResponse:
+    """Subscribe to ``channel`` and stream its events until the client disconnects."""
+    subscription = event_bus.subscribe(channel)
+    return StreamingResponse(
+        _stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _invoice_owners(session, invoice_ids: Set[int]) -> Dict[int, Tuple[int, int]]:
+    """invoice id -> (created_by, client_id), read with Core so nothing is loaded or flushed."""
+    if not invoice_ids:
+        return {}
+    table = Invoice.__table__
+    rows = session.connection().execute(
+        select(table.c.id, table.c.created_by, table.c.client_id).where(table.c.id.in_(invoice_ids))
+    )
+    return {invoice_id: (created_by, client_id) for invoice_id, created_by, client_id in rows}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_events(session, flush_context):
+    # (channel, event, record id) -> data; later flushes in the transaction overwrite earlier ones
+    pending: Dict[Tuple[Channel, str, int], dict] = session.info.setdefault(_PENDING_KEY, {})
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Invoice) and (obj in session.new or session.is_modified(obj)):
+            values = inspect(obj).dict
+            data = {"invoice_id": values.get("id")}
+            data.update({field: values[field] for field in INVOICE_FIELDS if field in values})
+            if "total_amount" in values and "paid_amount" in values:
+                data["balance"] = (values["total_amount"] or 0) - (values["paid_amount"] or 0)
+            for channel in _channels(values.get("created_by"), values.get("client_id")):
+                pending[(channel, "invoice.updated", data["invoice_id"])] = data
+
+    for obj in session.deleted:
+        if isinstance(obj, Invoice):
+            values = inspect(obj).dict
+            for channel in _channels(values.get("created_by"), values.get("client_id")):
+                pending[(channel, "invoice.deleted", values.get("id"))] = {"invoice_id": values.get("id")}
+
+    payments = [obj for obj in session.new if isinstance(obj, Payment)]
+    emails = [
+        obj for obj in session.dirty
+        if isinstance(obj, EmailHistory) and inspect(obj).attrs.status.history.has_changes()
+    ]
+    owners = _invoice_owners(
+        session, {inspect(obj).dict.get("invoice_id") for obj in payments + emails} - {None}
+    )
+
+    for payment in payments:
+        values = inspect(payment).dict
+        created_by, client_id = owners.get(values.get("invoice_id"), (None, None))
+        data = {
+            "payment_id": values.get("id"),
+            "invoice_id": values.get("invoice_id"),
+            "amount": values.get("amount"),
+            "payment_method": values.get("payment_method"),
+            "payment_date": values.get("payment_date"),
+        }
+        for channel in _channels(created_by, client_id):
+            pending[(channel, "payment.received", data["payment_id"])] = data
+
+    for email in emails:
+        values = inspect(email).dict
+        created_by, _ = owners.get(values.get("invoice_id"), (None, None))
+        if created_by is not None:
+            status = values.get("status")
+            pending[(user_channel(created_by), "email.status", values.get("id"))] = {
+                "email_id": values.get("id"),
+                "invoice_id": values.get("invoice_id"),
+                "tracking_id": values.get("tracking_id"),
+                "status": status.value if status is not None else None,
+            }
+
+
+def _channels(user_id, client_id) -> List[Channel]:
+    channels = []
+    if user_id is not None:
+        channels.append(user_channel(user_id))
+    if client_id is not None:
+        channels.append(client_channel(client_id))
+    return channels
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_pending(session):
+    for (channel, event_name, _), data in session.info.pop(_PENDING_KEY, {}).items():
+        event_bus.publish(channel, event_name, data)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
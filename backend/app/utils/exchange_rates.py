@@ -1,15 +1,171 @@
+"""
+Dated exchange rates.
+
+Rates are stored in the exchange_rates table as units of a currency per one
+unit of EXCHANGE_RATE_REFERENCE_CURRENCY on a day, and are loaded from files
+by app.utils.rate_feeds. The first lookup reads the whole table into a
+RateTable. It has one row per day that has rates and one column per
+currency. A gap is filled with the previous day's rate, or with the first
+known rate for days before it. Lookups and conversions then run in memory.
+Converting an array of amounts is a single numpy gather when numpy is
+installed, and a plain loop otherwise.
+
+Like the response cache, the table is process-wide. The importer calls
+invalidate_rate_table() after writing.
+"""
+import bisect
+import itertools
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
 from sqlalchemy.orm import Session
+
+from app.config import settings
 from app.models.exchange_rate import ExchangeRate
-from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# One date for every amount, a date per amount, or None for the latest rates
+Dates = Union[None, date, Sequence[Optional[date]]]
+
+
+class RateTable:
+    """Per-day rate matrix; column 0 is the reference currency."""
+
+    def __init__(self, reference: str, records: Iterable[Tuple[str, date, float]], version: int = 0):
+        self.reference = reference.upper()
+        # Distinguishes reloads, for caches of converted amounts
+        self.version = version
+        self.columns: Dict[str, int] = {self.reference: 0}
+        by_day: Dict[int, Dict[int, float]] = {}
+        for currency, day, rate in records:
+            currency = currency.upper()
+            if currency == self.reference:
+                continue
+            column = self.columns.setdefault(currency, len(self.columns))
+            by_day.setdefault(day.toordinal(), {})[column] = rate
+
+        self.days: List[int] = sorted(by_day)
+        width = len(self.columns)
+        first_known = [1.0] + [None] * (width - 1)
+        rows = []
+        current = list(first_known)
+        for day in self.days:
+            for column, rate in by_day[day].items():
+                current[column] = rate
+                if first_known[column] is None:
+                    first_known[column] = rate
+            rows.append(list(current))
+        self.rows = [
+            [first_known[column] if rate is None else rate for column, rate in enumerate(row)]
+            for row in rows
+        ]
+        if np is not None:
+            self.matrix = np.array(self.rows, dtype=float).reshape(len(self.rows), width)
+            self.day_array = np.array(self.days, dtype=np.int64)
+
+    def column(self, currency: Optional[str]) -> Optional[int]:
+        return self.columns.get(currency.upper()) if currency else None
+
+    def row_index(self, on: Optional[date]) -> int:
+        if on is None:
+            return len(self.days) - 1
+        return max(bisect.bisect_right(self.days, on.toordinal()) - 1, 0)
+
+    def rate(self, from_currency: str, to_currency: str, on: Optional[date] = None) -> float:
+        if from_currency == to_currency:
+            return 1.0
+        source, target = self.column(from_currency), self.column(to_currency)
+        if source is None or target is None:
+            return settings.EXCHANGE_RATE_FALLBACK
+        if not self.days:
+            # Only the reference currency is known
+            return 1.0
+        row = self.rows[self.row_index(on)]
+        return row[target] / row[source]
+
+    def factors(self, currencies: Sequence[Optional[str]], to_currency: str, on: Dates = None):
+        """Multiplier converting each entry of ``currencies`` into ``to_currency``."""
+        if np is None or not self.days:
+            dates = [on] * len(currencies) if on is None or isinstance(on, date) else on
+            return [self.rate(currency or to_currency, to_currency, day) for currency, day in zip(currencies, dates)]
+
+        target = self.column(to_currency)
+        # Resolve each distinct currency once; None means already in to_currency
+        resolved = {}
+        for currency in set(currencies):
+            if not currency or currency.upper() == to_currency.upper():
+                resolved[currency] = -2
+            else:
+                column = self.column(currency)
+                resolved[currency] = -1 if column is None or target is None else column
+        columns = np.fromiter((resolved[currency] for currency in currencies), dtype=np.intp, count=len(currencies))
+
+        if on is None or isinstance(on, date):
+            rows = np.full(len(currencies), self.row_index(on), dtype=np.intp)
+        else:
+            latest = self.days[-1]
+            ordinals = np.fromiter(
+                (day.toordinal() if day is not None else latest for day in on), dtype=np.int64, count=len(on)
+            )
+            rows = np.maximum(np.searchsorted(self.day_array, ordinals, side="right") - 1, 0)
+
+        known = columns >= 0
+        ratios = self.matrix[rows, target if target is not None else 0] / self.matrix[rows, np.where(known, columns, 0)]
+        return np.where(columns == -2, 1.0, np.where(known, ratios, settings.EXCHANGE_RATE_FALLBACK))
+
+
+_table: Optional[RateTable] = None
+_table_lock = threading.Lock()
+_table_loads = itertools.count(1)
+
+
+def get_rate_table(db: Session) -> RateTable:
+    """The loaded rate table, reading exchange_rates on first use."""
+    global _table
+    table = _table
+    if table is None:
+        with _table_lock:
+            if _table is None:
+                records = db.query(ExchangeRate.currency, ExchangeRate.date, ExchangeRate.rate).order_by(
+                    ExchangeRate.date
+                ).all()
+                _table = RateTable(settings.EXCHANGE_RATE_REFERENCE_CURRENCY, records, next(_table_loads))
+            table = _table
+    return table
+
+
+def invalidate_rate_table() -> None:
+    global _table
+    with _table_lock:
+        _table = None
+
 
 class ExchangeRateManager:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_exchange_rate(self, from_currency: str, to_currency: str) -> float:
-        if from_currency == to_currency:
-            return 1.0
+    @property
+    def table(self) -> RateTable:
+        return get_rate_table(self.db)
+
+    def get_exchange_rate(self, from_currency: str, to_currency: str, on: Optional[date] = None) -> float:
+        """Rate from ``from_currency`` to ``to_currency`` on ``on`` (latest known when omitted)."""
+        return self.table.rate(from_currency, to_currency, on)
+
+    def convert(self, amounts: Sequence[float], currencies: Sequence[Optional[str]], to_currency: str, on: Dates = None):
+        """Convert ``amounts[i]`` from ``currencies[i]``; returns a numpy array when numpy is available."""
+        factors = self.table.factors(currencies, to_currency, on)
+        if np is None or isinstance(factors, list):
+            return [(amount or 0.0) * factor for amount, factor in zip(amounts, factors)]
+        return np.nan_to_num(np.asarray(amounts, dtype=float)) * factors
 
-        # For simplicity, returning a fixed rate.
-        # In a real application, you would fetch this from an API and store it in the database.
-        return 80.0
+    def convert_total(self, amounts: Sequence[float], currencies: Sequence[Optional[str]], to_currency: str, on: Dates = None) -> float:
+        if not len(amounts):
+            return 0.0
+        converted = self.convert(amounts, currencies, to_currency, on)
+        return float(converted.sum() if np is not None and not isinstance(converted, list) else sum(converted))
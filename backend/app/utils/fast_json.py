@@ -0,0 +1,26 @@
+"""
+JSON response class backed by orjson.
+
+orjson serializes dicts, lists, dates and datetimes natively, which makes it
+several times faster than ``json.dumps`` for large list payloads. When orjson
+isn't installed the response falls back to FastAPI's encoder and the
+standard library.
+"""
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders plain rows (dicts/lists/dates) with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
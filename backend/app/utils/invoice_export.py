@@ -0,0 +1,182 @@
+"""
+Bulk export of invoice PDFs as one streamed ZIP archive.
+
+An export job selects invoices with the GET /invoices filters (see
+app.utils.invoice_filters) when it is created and keeps their ids. The job
+and every download of it work on those ids only, so invoices created or
+changed to match the filters later are not added. The job walks them in id
+order, INVOICE_EXPORT_BATCH_SIZE at a time. For each batch it builds the
+documents, takes the PDFs already in the disk cache and renders the rest
+side by side in the render pool (app.utils.invoice_pdf). It then commits
+its progress, which GET /invoices/export/{job_id} reports.
+
+The archive is never assembled. stream_invoice_zip() writes one stored ZIP
+entry per invoice into a sink. The sink is drained into a response chunk
+whenever it holds STREAM_CHUNK_BYTES, so a download holds at most one batch
+of PDFs in memory at any export size. Entries are stored rather than
+deflated because the PDF page streams are already compressed. An invoice
+edited after the job ran has a new cache key, and its PDF is rendered while
+the archive streams. The archive ends with MANIFEST_NAME, a CSV with one
+line per invoice of the job. It names each invoice's file, or says that
+the invoice could not be rendered or has been deleted since.
+"""
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.invoice import Invoice
+from app.models.invoice_export_job import InvoiceExportJob
+from app.models.user import User
+from app.utils.invoice_filters import filtered_invoices
+from app.utils.invoice_pdf import invoice_document, pdf_filename, render_documents
+from app.utils.tenancy import scope_session_to_user
+
+# Bytes of ZIP data gathered before a chunk is handed to the response
+STREAM_CHUNK_BYTES = 64 * 1024
+MANIFEST_NAME = "manifest.csv"
+
+
+class _ZipSink:
+    """Write-only, unseekable file for ZipFile; drain() hands over what was written since."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _matching_ids(db: Session, user_id: int, filters: dict) -> List[int]:
+    query = filtered_invoices(db, filters).filter(Invoice.created_by == user_id)
+    return [invoice_id for (invoice_id,) in query.with_entities(Invoice.id).order_by(Invoice.id)]
+
+
+def create_export_job(db: Session, user: User, filters: dict) -> InvoiceExportJob:
+    invoice_ids = _matching_ids(db, user.id, filters)
+    job = InvoiceExportJob(
+        user_id=user.id,
+        filters=json.dumps(filters),
+        invoice_ids=json.dumps(invoice_ids),
+        status="pending",
+        invoices_total=len(invoice_ids)
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def export_filename(job: InvoiceExportJob) -> str:
+    return f"invoices-export-{job.id}.zip"
+
+
+def job_invoice_ids(db: Session, job: InvoiceExportJob) -> List[int]:
+    """Ids of the invoices ``job`` exports, in id order."""
+    if job.invoice_ids is None:
+        # Jobs created before the ids were kept select by their filters
+        return _matching_ids(db, job.user_id, json.loads(job.filters or "{}"))
+    return json.loads(job.invoice_ids)
+
+
+def _invoice_batches(
+    db: Session, invoice_ids: List[int], batch_size: Optional[int] = None
+) -> Iterator[Tuple[List[int], List[Invoice]]]:
+    """
+    Batches of ``invoice_ids`` and the invoices still there among them, in id
+    order, with their client and items.
+    """
+    batch_size = batch_size or settings.INVOICE_EXPORT_BATCH_SIZE
+    for start in range(0, len(invoice_ids), batch_size):
+        ids = invoice_ids[start:start + batch_size]
+        yield ids, db.query(Invoice).options(
+            joinedload(Invoice.client), selectinload(Invoice.items)
+        ).filter(Invoice.id.in_(ids)).order_by(Invoice.id).all()
+
+
+def run_invoice_export(job_id: int) -> None:
+    """Background task body: render every PDF of ``job_id`` into the cache."""
+    db = SessionLocal()
+    try:
+        job = db.query(InvoiceExportJob).filter(InvoiceExportJob.id == job_id).first()
+        scope_session_to_user(db, job.user_id)
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        try:
+            for ids, batch in _invoice_batches(db, job_invoice_ids(db, job)):
+                pdfs, rendered = render_documents([invoice_document(db, invoice) for invoice in batch])
+                failed = pdfs.count(None)
+                job.invoices_processed = (job.invoices_processed or 0) + len(ids)
+                job.rendered = (job.rendered or 0) + rendered
+                job.cached = (job.cached or 0) + len(batch) - rendered - failed
+                # Invoices deleted since the export started count as failed too
+                job.failed = (job.failed or 0) + failed + len(ids) - len(batch)
+                db.commit()
+            job.status = "completed"
+        except Exception as exc:
+            db.rollback()
+            job.status = "failed"
+            job.error_message = str(exc)[:1000]
+
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+def stream_invoice_zip(user_id: int, invoice_ids: List[int]) -> Iterator[bytes]:
+    """The ZIP archive of the invoices' PDFs and its manifest, in chunks of about STREAM_CHUNK_BYTES."""
+    # Its own session: the stream outlives the request's dependencies
+    db = SessionLocal()
+    scope_session_to_user(db, user_id)
+    sink = _ZipSink()
+    manifest = io.StringIO()
+    lines = csv.writer(manifest)
+    lines.writerow(["invoice_id", "invoice_number", "file", "status"])
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for ids, batch in _invoice_batches(db, invoice_ids):
+                pdfs, _ = render_documents([invoice_document(db, invoice) for invoice in batch])
+                found = {invoice.id: (invoice, pdf) for invoice, pdf in zip(batch, pdfs)}
+                for invoice_id in ids:
+                    if invoice_id not in found:
+                        lines.writerow([invoice_id, "", "", "deleted"])
+                        continue
+                    invoice, pdf = found[invoice_id]
+                    if pdf is None:
+                        lines.writerow([invoice_id, invoice.invoice_number, "", "render failed"])
+                        continue
+                    entry = zipfile.ZipInfo(
+                        pdf_filename(invoice).replace("/", "-"),
+                        date_time=(invoice.updated_at or datetime.utcnow()).timetuple()[:6]
+                    )
+                    archive.writestr(entry, pdf)
+                    lines.writerow([invoice_id, invoice.invoice_number, entry.filename, "exported"])
+                    if sink.size >= STREAM_CHUNK_BYTES:
+                        yield sink.drain()
+            archive.writestr(
+                zipfile.ZipInfo(MANIFEST_NAME, date_time=datetime.utcnow().timetuple()[:6]), manifest.getvalue()
+            )
+        yield sink.drain()
+    finally:
+        db.close()
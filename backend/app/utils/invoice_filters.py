@@ -0,0 +1,62 @@
+"""
+The GET /invoices filters as a reusable query.
+
+INVOICE_FILTERS names the query parameters. filtered_invoices() applies the
+ones that are set to a query of invoices joined to their clients. Bulk
+exports keep the filters as JSON and apply them again when they run.
+"""
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Query, Session
+
+from app.models.client import Client
+from app.models.invoice import Invoice
+
+INVOICE_FILTERS = (
+    "status", "payment_status", "client_id", "currency", "search", "recurring",
+    "date_from", "date_to", "amount_min", "amount_max",
+)
+
+
+def filtered_invoices(db: Session, filters: Optional[dict] = None) -> Query:
+    """Invoices joined to their client, narrowed by the set values of ``filters``."""
+    filters = filters or {}
+    query = db.query(Invoice).join(Invoice.client)
+
+    if filters.get("status"):
+        query = query.filter(Invoice.status == filters["status"])
+    if filters.get("payment_status"):
+        query = query.filter(Invoice.payment_status == filters["payment_status"])
+    if filters.get("client_id"):
+        query = query.filter(Invoice.client_id == filters["client_id"])
+    if filters.get("currency"):
+        query = query.filter(Invoice.currency == filters["currency"])
+
+    if filters.get("recurring") == 'true':
+        query = query.filter(Invoice.generated_by_template == True)
+    elif filters.get("recurring") == 'false':
+        query = query.filter(Invoice.generated_by_template == False)
+
+    if filters.get("date_from"):
+        query = query.filter(Invoice.issue_date >= filters["date_from"])
+    if filters.get("date_to"):
+        query = query.filter(Invoice.issue_date <= filters["date_to"])
+
+    if filters.get("amount_min") is not None:
+        query = query.filter(Invoice.total_amount >= filters["amount_min"])
+    if filters.get("amount_max") is not None:
+        query = query.filter(Invoice.total_amount <= filters["amount_max"])
+
+    if filters.get("search"):
+        search_term = f"%{filters['search'].lower()}%"
+        query = query.filter(
+            or_(
+                Invoice.invoice_number.ilike(search_term),
+                Client.name.ilike(search_term),
+                Client.company.ilike(search_term),
+                Invoice.status.ilike(search_term),
+                Invoice.payment_status.ilike(search_term)
+            )
+        )
+    return query
@@ -0,0 +1,255 @@
+"""
+Bulk invoice creation for POST /api/invoices/bulk and /api/invoices/import.
+
+Rows are processed in chunks of INVOICE_IMPORT_CHUNK_SIZE invoices. Each chunk is
+validated with one Pydantic call, given a block of invoice numbers, written with
+executemany INSERTs (app.utils.bulk_insert) and committed on its own, so a
+failing chunk doesn't undo the ones before it.
+Rows that fail validation are skipped and reported by row number.
+
+Import files are read as a stream:
+
+  * JSONL - one InvoiceImportRow object per line.
+  * CSV   - one row per invoice item. Consecutive rows with the same
+            ``invoice_ref`` form one invoice; without that column every row is
+            an invoice with a single item (item_description, item_quantity,
+            item_rate). The other columns are InvoiceImportRow fields.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceItem
+from app.models.user import User
+from app.schemas.invoice import InvoiceImportRow
+from app.utils.bulk_insert import bulk_insert
+from app.utils.change_log import record_bulk_changes
+from app.utils.exchange_rates import ExchangeRateManager
+from app.utils.invoice_numbers import next_invoice_numbers
+from app.utils.response_cache import mark_tenant_dirty
+from app.utils.tenancy import SKIP_TENANT_SCOPE
+
+ITEM_COLUMNS = {"item_description": "description", "item_quantity": "quantity", "item_rate": "rate"}
+
+_rows_adapter = TypeAdapter(List[InvoiceImportRow])
+
+# A source row: (row number for the error report, raw dict or a parse error message)
+SourceRow = Tuple[int, object]
+
+
+class InvoiceImporter:
+    """Validates and inserts invoice rows for one user, one chunk at a time."""
+
+    def __init__(self, db: Session, user: User):
+        self.db = db
+        self.user = user
+        self.base_currency = user.base_currency or "INR"
+        self.rate_manager = ExchangeRateManager(db)
+        # Tenant-scoped, so only the user's own clients are accepted
+        self.client_ids = {client_id for (client_id,) in db.query(Client.id).all()}
+        self.created = 0
+        self.errors: List[dict] = []
+
+    def result(self) -> dict:
+        errors = sorted(self.errors, key=lambda error: error["row"])
+        return {"created": self.created, "failed": len(errors), "errors": errors}
+
+    def import_chunk(self, rows: List[SourceRow]) -> None:
+        valid = self._validate(rows)
+        if not valid:
+            return
+
+        # One block of numbers per chunk, skipping numbers the chunk brings itself
+        numbers = iter(next_invoice_numbers(
+            self.db,
+            sum(1 for _, row in valid if row.invoice_number is None),
+            taken=[row.invoice_number for _, row in valid if row.invoice_number is not None],
+        ))
+        now = datetime.utcnow()
+        invoice_rows = []
+        for _, row in valid:
+            if row.invoice_number is None:
+                row.invoice_number = next(numbers)
+            invoice_rows.append(self._invoice_values(row, now))
+
+        try:
+            connection = self.db.connection()
+            bulk_insert(connection, Invoice.__table__, invoice_rows)
+            # Read the ids back by number: RETURNING in parameter order would make
+            # SQLite fall back to one INSERT per row
+            table = Invoice.__table__
+            ids_by_number = dict(connection.execute(
+                select(table.c.invoice_number, table.c.id).where(
+                    table.c.invoice_number.in_([values["invoice_number"] for values in invoice_rows])
+                )
+            ).all())
+            inserted = [ids_by_number[values["invoice_number"]] for values in invoice_rows]
+
+            item_rows = [
+                {
+                    "invoice_id": invoice_id,
+                    "description": item.description,
+                    "quantity": item.quantity,
+                    "rate": item.rate,
+                    "amount": item.quantity * item.rate,
+                }
+                for invoice_id, (_, row) in zip(inserted, valid)
+                for item in row.items
+            ]
+            if item_rows:
+                bulk_insert(connection, InvoiceItem.__table__, item_rows)
+
+            record_bulk_changes(connection, Invoice, inserted)
+            mark_tenant_dirty(self.db, self.user.id)
+            self.db.commit()
+        except SQLAlchemyError as exc:
+            self.db.rollback()
+            message = f"Chunk rolled back: {str(getattr(exc, 'orig', None) or exc)[:200]}"
+            self.errors.extend({"row": row_number, "errors": [message]} for row_number, _ in valid)
+            return
+
+        self.created += len(inserted)
+
+    def _validate(self, rows: List[SourceRow]) -> List[Tuple[int, InvoiceImportRow]]:
+        parsed = []
+        for row_number, raw in rows:
+            if isinstance(raw, str):
+                self.errors.append({"row": row_number, "errors": [raw]})
+            else:
+                parsed.append((row_number, raw))
+
+        try:
+            models = _rows_adapter.validate_python([raw for _, raw in parsed])
+            candidates = list(zip([row_number for row_number, _ in parsed], models))
+        except ValidationError as exc:
+            # Report the failing rows and validate the rest in a second, clean pass
+            failures: Dict[int, List[str]] = {}
+            for error in exc.errors():
+                index, *location = error["loc"]
+                failures.setdefault(index, []).append(f"{'.'.join(map(str, location)) or 'row'}: {error['msg']}")
+            for index, messages in sorted(failures.items()):
+                self.errors.append({"row": parsed[index][0], "errors": messages})
+            remaining = [entry for index, entry in enumerate(parsed) if index not in failures]
+            models = _rows_adapter.validate_python([raw for _, raw in remaining])
+            candidates = list(zip([row_number for row_number, _ in remaining], models))
+
+        # Numbers of earlier chunks are in the table once they commit; a rolled-back
+        # chunk leaves nothing behind, so its rows can be sent again
+        explicit_numbers = [row.invoice_number for _, row in candidates if row.invoice_number is not None]
+        existing_numbers = set()
+        if explicit_numbers:
+            existing_numbers = {
+                number for (number,) in self.db.query(Invoice.invoice_number).filter(
+                    Invoice.invoice_number.in_(explicit_numbers)
+                ).execution_options(**{SKIP_TENANT_SCOPE: True}).all()
+            }
+
+        valid = []
+        chunk_numbers = set()
+        for row_number, row in candidates:
+            messages = []
+            if row.client_id not in self.client_ids:
+                messages.append("client_id: Client not found")
+            if not row.items:
+                messages.append("items: At least one item is required")
+            if row.invoice_number in existing_numbers or row.invoice_number in chunk_numbers:
+                messages.append(f"invoice_number: {row.invoice_number} already exists")
+            if messages:
+                self.errors.append({"row": row_number, "errors": messages})
+            else:
+                valid.append((row_number, row))
+                if row.invoice_number is not None:
+                    chunk_numbers.add(row.invoice_number)
+        return valid
+
+    def _invoice_values(self, row: InvoiceImportRow, now: datetime) -> dict:
+        subtotal = sum(item.quantity * item.rate for item in row.items)
+        tax_amount = (subtotal * row.tax_rate) / 100
+        total_amount = subtotal + tax_amount - row.discount
+
+        exchange_rate = 1.0
+        if row.currency != self.base_currency:
+            exchange_rate = row.exchange_rate or self.rate_manager.get_exchange_rate(
+                row.currency, self.base_currency, row.issue_date
+            )
+
+        return {
+            "invoice_number": row.invoice_number,
+            "client_id": row.client_id,
+            "issue_date": row.issue_date,
+            "due_date": row.due_date,
+            "subtotal": subtotal,
+            "tax_rate": row.tax_rate,
+            "tax_amount": tax_amount,
+            "discount": row.discount,
+            "total_amount": total_amount,
+            "currency": row.currency,
+            "base_currency_amount": total_amount * exchange_rate,
+            "exchange_rate": exchange_rate,
+            "status": row.status,
+            "payment_status": "unpaid",
+            "paid_amount": 0.0,
+            "notes": row.notes,
+            "terms": row.terms,
+            "design_template_id": row.design_template_id,
+            "generated_by_template": False,
+            "created_by": self.user.id,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+def chunked(rows: Iterator[SourceRow], size: int) -> Iterator[List[SourceRow]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_jsonl_rows(stream: IO[bytes]) -> Iterator[SourceRow]:
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), start=1):
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, f"Invalid JSON: {exc.msg}"
+            continue
+        yield line_number, raw if isinstance(raw, dict) else "Each line must be a JSON object"
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[SourceRow]:
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    grouped = "invoice_ref" in (reader.fieldnames or [])
+    current_ref: Optional[str] = None
+    current: Optional[SourceRow] = None
+
+    # Header is line 1
+    for line_number, record in enumerate(reader, start=2):
+        values = {key: value for key, value in record.items() if key and value not in (None, "")}
+        ref = values.pop("invoice_ref", None)
+        item = {ITEM_COLUMNS[key]: values.pop(key) for key in list(values) if key in ITEM_COLUMNS}
+
+        if grouped and ref is not None and ref == current_ref and current is not None:
+            current[1]["items"].append(item)
+            continue
+
+        if current is not None:
+            yield current
+        values["items"] = [item] if item else []
+        current, current_ref = (line_number, values), ref
+
+    if current is not None:
+        yield current
@@ -0,0 +1,84 @@
+"""
+Invoice number allocation.
+
+Numbers (INV-00001 style) come from a counter row in invoice_number_counters.
+It is advanced with one UPDATE ... RETURNING per allocation, so concurrent
+allocations always get disjoint ranges. On databases with row locks the
+UPDATE runs and commits on its own connection, and the row lock is held
+only for the allocation rather than for the caller's whole transaction.
+Numbers left unused by a rolled-back transaction are skipped, as with a
+sequence. SQLite serializes writers, so there the counter advances in the
+session's own transaction.
+
+Invoice numbers are unique across all users, so every lookup ignores the
+session's tenant scope. Imported invoices may carry explicit numbers ahead
+of the counter, so each candidate is checked against the table as well.
+"""
+from typing import Iterable, List
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.invoice import Invoice
+from app.models.invoice_number_counter import InvoiceNumberCounter
+from app.utils.tenancy import SKIP_TENANT_SCOPE
+
+INVOICE_NUMBER_COUNTER = "invoice_number"
+
+_counters = InvoiceNumberCounter.__table__
+
+
+def format_invoice_number(value: int) -> str:
+    return f"INV-{value:05d}"
+
+
+def _advance(connection, count: int) -> int:
+    """Advance the counter by ``count``; returns its new value, creating the row on first use."""
+    advance = update(_counters).where(
+        _counters.c.name == INVOICE_NUMBER_COUNTER
+    ).values(last_value=_counters.c.last_value + count).returning(_counters.c.last_value)
+
+    last_value = connection.execute(advance).scalar()
+    if last_value is None:
+        # Databases built with create_all() have no counter row yet; start after the highest id
+        seed = connection.execute(select(func.max(Invoice.id))).scalar() or 0
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(_counters).values(name=INVOICE_NUMBER_COUNTER, last_value=seed))
+        except IntegrityError:
+            pass  # Another allocation created it first
+        last_value = connection.execute(advance).scalar()
+    return last_value
+
+
+def _reserve(db: Session, count: int) -> range:
+    """The next ``count`` counter values."""
+    bind = db.get_bind()
+    if bind.dialect.name == "sqlite":
+        last_value = _advance(db.connection(), count)
+    else:
+        with bind.engine.begin() as connection:
+            last_value = _advance(connection, count)
+    return range(last_value - count + 1, last_value + 1)
+
+
+def next_invoice_numbers(db: Session, count: int = 1, taken: Iterable[str] = ()) -> List[str]:
+    """
+    Allocate ``count`` unused invoice numbers.
+
+    Numbers already present in the table or in ``taken`` are skipped and more
+    are drawn from the counter in their place.
+    """
+    taken = set(taken)
+    numbers: List[str] = []
+
+    while len(numbers) < count:
+        candidates = [format_invoice_number(value) for value in _reserve(db, count - len(numbers))]
+        existing = db.query(Invoice.invoice_number).filter(
+            Invoice.invoice_number.in_(candidates)
+        ).execution_options(**{SKIP_TENANT_SCOPE: True}).all()
+        taken.update(number for (number,) in existing)
+        numbers.extend(number for number in candidates if number not in taken)
+
+    return numbers
@@ -0,0 +1,253 @@
+"""
+Server-side invoice PDFs, cached on disk.
+
+invoice_document() takes a snapshot of everything the PDF shows: the invoice,
+its client and items, and the config and type styles that TemplateRenderer
+gives for its design template. The cache key is a sha256 of that snapshot
+plus the template's id and updated_at and RENDERER_VERSION. Any edit to the
+invoice, an item, the client or the template therefore changes the key, and
+a stale PDF is never served. Files live at PDF_CACHE_DIR/<key[:2]>/<key>.pdf
+and are written through a temporary file and a rename, so concurrent
+renders of one key are harmless.
+
+Every edit leaves the old key's file behind, so the cache is capped at
+PDF_CACHE_MAX_MB. A cache hit touches its file's mtime, which makes mtime the
+time of last use. Once a tenth of the cap has been written since the last
+sweep, sweep_pdf_cache() deletes the least recently used files until the
+cache is under 90% of the cap. It also removes temporary files left behind
+by crashed writes. An export larger than the cap re-renders the PDFs swept
+before its download streams them.
+
+Cache misses are drawn by pdf_renderer.render_invoice_pdf in a pool of
+PDF_RENDER_WORKERS spawned processes. ReportLab's CPU work runs outside the
+event loop and the GIL. Concurrent requests for one key share a single
+render through a single-flight group. reportlab is optional; without it
+invoice_pdf() raises PDFRenderingUnavailable.
+"""
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+
+from app.config import settings
+from app.models.invoice import Invoice
+from app.utils import pdf_renderer
+from app.utils.single_flight import get_single_flight
+from app.utils.template_renderer import get_template_renderer
+
+logger = logging.getLogger(__name__)
+
+pdf_flight = get_single_flight("invoices.pdf")
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_sweep_lock = threading.Lock()
+_written_lock = threading.Lock()
+_written_since_sweep = 0
+
+# Temporary files older than this are left over from a crashed write
+STALE_TEMPORARY_SECONDS = 3600
+
+
+class PDFRenderingUnavailable(RuntimeError):
+    """reportlab is not installed."""
+
+
+def pdf_filename(invoice: Invoice) -> str:
+    return f"Invoice-{invoice.invoice_number}.pdf"
+
+
+def invoice_document(db: Session, invoice: Invoice) -> Tuple[dict, str]:
+    """The render input for ``invoice`` and its cache key."""
+    renderer = get_template_renderer(db, invoice)
+    client = invoice.client
+    document = {
+        "invoice": {
+            "invoice_number": invoice.invoice_number,
+            "issue_date": invoice.issue_date.isoformat() if invoice.issue_date else None,
+            "due_date": invoice.due_date.isoformat() if invoice.due_date else None,
+            "status": invoice.status,
+            "currency": invoice.currency,
+            "subtotal": invoice.subtotal,
+            "tax_rate": invoice.tax_rate,
+            "tax_amount": invoice.tax_amount,
+            "discount": invoice.discount,
+            "total_amount": invoice.total_amount,
+            "paid_amount": invoice.paid_amount,
+            "notes": invoice.notes,
+            "terms": invoice.terms,
+        },
+        "client": {
+            "name": client.name,
+            "company": client.company,
+            "email": client.email,
+            "phone": client.phone,
+        } if client else None,
+        "items": [[item.description, item.quantity, item.rate, item.amount] for item in invoice.items],
+        "config": renderer.get_template_config(),
+        "styles": renderer.get_template_type_styles(),
+    }
+    template = renderer.template
+    version = [
+        pdf_renderer.RENDERER_VERSION,
+        template.id if template else None,
+        template.updated_at.isoformat() if template and template.updated_at else None,
+    ]
+    payload = json.dumps([version, document], sort_keys=True, separators=(",", ":"), default=str)
+    return document, hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    return Path(settings.PDF_CACHE_DIR) / key[:2] / f"{key}.pdf"
+
+
+def cached_pdf(key: str) -> Optional[bytes]:
+    path = _cache_path(key)
+    try:
+        pdf = path.read_bytes()
+        os.utime(path)  # Recently used; the sweep removes the least recently used first
+    except FileNotFoundError:
+        return None
+    return pdf
+
+
+def store_pdf(key: str, pdf: bytes) -> None:
+    global _written_since_sweep
+    path = _cache_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(pdf)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+    limit = settings.PDF_CACHE_MAX_MB * 2 ** 20
+    with _written_lock:
+        _written_since_sweep += len(pdf)
+        due = limit and _written_since_sweep >= limit // 10
+    if due:
+        sweep_pdf_cache()
+
+
+def sweep_pdf_cache() -> int:
+    """Delete least recently used PDFs until the cache is under 90% of PDF_CACHE_MAX_MB; returns the files deleted."""
+    global _written_since_sweep
+    limit = settings.PDF_CACHE_MAX_MB * 2 ** 20
+    if not limit or not _sweep_lock.acquire(blocking=False):
+        return 0  # Unlimited, or another thread is sweeping
+    try:
+        with _written_lock:
+            _written_since_sweep = 0
+        now = time.time()
+        files = []
+        total = 0
+        for entry in Path(settings.PDF_CACHE_DIR).glob("*/*"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.suffix == ".tmp":
+                if now - stat.st_mtime > STALE_TEMPORARY_SECONDS:
+                    entry.unlink(missing_ok=True)
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+
+        deleted = 0
+        if total > limit:
+            files.sort(key=lambda file: file[0])
+            for _, size, entry in files:
+                if total <= limit * 0.9:
+                    break
+                try:
+                    entry.unlink()
+                except OSError as e:
+                    logger.warning(f"Could not remove cached PDF {entry.name}: {e}")
+                    continue
+                total -= size
+                deleted += 1
+            logger.info(f"Swept {deleted} least recently used PDFs from the cache")
+        return deleted
+    finally:
+        _sweep_lock.release()
+
+
+def render_pool() -> ProcessPoolExecutor:
+    """The process-wide render pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                settings.PDF_RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def render_and_store(document: dict, key: str) -> bytes:
+    """Render ``document`` in the pool and cache it under ``key``; blocks until done."""
+    pdf = cached_pdf(key)
+    if pdf is None:
+        pdf = render_pool().submit(pdf_renderer.render_invoice_pdf, document).result()
+        store_pdf(key, pdf)
+    return pdf
+
+
+def render_documents(documents: List[Tuple[dict, str]]) -> Tuple[List[Optional[bytes]], int]:
+    """
+    PDFs of many (document, key) pairs, in order: cached ones from disk, the
+    rest rendered side by side in the pool and cached. Returns the PDFs, None
+    where rendering failed, and the number rendered.
+    """
+    pdfs = [cached_pdf(key) for _, key in documents]
+    pool = render_pool()
+    pending = [
+        (index, pool.submit(pdf_renderer.render_invoice_pdf, documents[index][0]))
+        for index, pdf in enumerate(pdfs) if pdf is None
+    ]
+    rendered = 0
+    for index, future in pending:
+        try:
+            pdfs[index] = future.result()
+        except Exception as e:
+            logger.warning(f"Could not render PDF of invoice {documents[index][0]['invoice']['invoice_number']}: {e}")
+            continue
+        store_pdf(documents[index][1], pdfs[index])
+        rendered += 1
+    return pdfs, rendered
+
+
+async def invoice_pdf(db: Session, invoice: Invoice) -> Tuple[str, bytes]:
+    """Cache key and PDF bytes of ``invoice``, rendering it on a cache miss."""
+    if pdf_renderer.canvas is None:
+        raise PDFRenderingUnavailable("reportlab is not installed")
+    document, key = invoice_document(db, invoice)
+    pdf = cached_pdf(key)
+    if pdf is None:
+        pdf = await pdf_flight.run(key, render_and_store, document, key)
+    return key, pdf
+
+
+async def invoice_pdf_attachment(db: Session, invoice: Invoice) -> Optional[UploadFile]:
+    """``invoice`` as a PDF email attachment, or None when it cannot be rendered."""
+    try:
+        _, pdf = await invoice_pdf(db, invoice)
+    except Exception as e:
+        logger.warning(f"Sending invoice {invoice.invoice_number} without a PDF: {e}")
+        return None
+    return UploadFile(
+        io.BytesIO(pdf), filename=pdf_filename(invoice), headers=Headers({"content-type": "application/pdf"})
+    )
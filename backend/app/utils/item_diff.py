@@ -0,0 +1,99 @@
+"""
+Apply an edited item list to the stored line items of an invoice or a
+recurring template with as few writes as possible.
+
+Incoming items are matched to stored rows in three passes:
+
+  1. by ``id``; the id must belong to the parent record,
+  2. items without an id, to unclaimed rows with the same description,
+     quantity and rate (these need no write at all),
+  3. the remaining items without an id, to the remaining rows in order.
+
+Matched rows are updated only in the columns that changed, unmatched items are
+inserted and unmatched rows deleted. Everything goes through the ORM, so the
+change log, event and cache hooks see the writes as usual.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+CONTENT_FIELDS = ("description", "quantity", "rate")
+
+
+@dataclass
+class ItemDiff:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    # Change in the sum of item amounts, for updating a stored subtotal
+    amount_delta: float = 0.0
+
+
+def _content(item) -> tuple:
+    return tuple(getattr(item, field) for field in CONTENT_FIELDS)
+
+
+def apply_item_diff(
+    db: Session,
+    existing: Sequence,
+    incoming: Sequence,
+    create: Callable[..., object],
+    ordered: bool = False,
+) -> ItemDiff:
+    """
+    Make ``existing`` (the loaded item rows) match ``incoming`` (the request's
+    items). ``create(**values)`` builds a new row for the parent. With
+    ``ordered`` the list position is kept in ``sort_order``.
+    Raises ValueError for an id that is not one of ``existing``.
+    """
+    by_id = {item.id: item for item in existing}
+    unknown = sorted({item.id for item in incoming if item.id is not None} - set(by_id))
+    if unknown:
+        raise ValueError(f"Unknown item ids: {', '.join(map(str, unknown))}")
+
+    targets: List[Optional[object]] = [by_id.pop(item.id) if item.id is not None else None for item in incoming]
+
+    # Content matches first, so a resent unchanged list costs nothing
+    unclaimed: Dict[tuple, List[object]] = {}
+    for row in sorted(by_id.values(), key=lambda row: row.id):
+        unclaimed.setdefault(_content(row), []).append(row)
+    for index, item in enumerate(incoming):
+        if targets[index] is None and unclaimed.get(_content(item)):
+            targets[index] = unclaimed[_content(item)].pop(0)
+
+    leftovers = [row for rows in unclaimed.values() for row in rows]
+    leftovers.sort(key=lambda row: row.id)
+    leftovers.reverse()
+
+    diff = ItemDiff()
+    for index, (item, row) in enumerate(zip(incoming, targets)):
+        values = {field: getattr(item, field) for field in CONTENT_FIELDS}
+        values["amount"] = item.quantity * item.rate
+        if ordered:
+            values["sort_order"] = index
+
+        if row is None and leftovers:
+            row = leftovers.pop()
+        if row is None:
+            db.add(create(**values))
+            diff.inserted += 1
+            diff.amount_delta += values["amount"]
+            continue
+
+        changed = {field: value for field, value in values.items() if getattr(row, field) != value}
+        if changed:
+            diff.amount_delta += values["amount"] - (row.amount or 0.0)
+            for field, value in changed.items():
+                setattr(row, field, value)
+            diff.updated += 1
+        else:
+            diff.unchanged += 1
+
+    for row in leftovers:
+        diff.amount_delta -= row.amount or 0.0
+        db.delete(row)
+        diff.deleted += 1
+
+    return diff
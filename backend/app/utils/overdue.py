@@ -0,0 +1,105 @@
+"""
+Move sent invoices that are past their due date to status "overdue".
+
+The dashboard, late-paying-clients and profit queries read "overdue" from the
+status column, so this has to run daily: from cron through
+POST /api/invoices/mark-overdue, or from the backend/ directory with
+
+    python -m app.utils.overdue
+
+Sent invoices are the unpaid and partially paid ones; a full payment moves an
+invoice to "paid". Candidates are read from the partial index
+ix_invoices_sent_due_date, which holds only sent invoices, so a run costs the
+number of invoices due rather than the size of the table. Each batch of
+OVERDUE_BATCH_SIZE ids is a single UPDATE, committed together with its
+change_log rows (the /api/sync cursor). The UPDATE bypasses the ORM, so each
+batch also invalidates the affected tenants' cached responses and publishes
+invoice.updated to their live streams.
+"""
+import argparse
+import time
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import literal_column, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.invoice import Invoice
+from app.utils.change_log import record_bulk_changes
+from app.utils.events import client_channel, event_bus, user_channel
+from app.utils.response_cache import mark_tenant_dirty
+
+# Inlined rather than bound, so SQLite can match the partial index's WHERE clause
+SENT = literal_column("'sent'")
+
+
+def mark_overdue_invoices(db: Session, today: Optional[date] = None, batch_size: Optional[int] = None) -> dict:
+    """Flip every sent invoice due before ``today`` to overdue; returns what the run did."""
+    today = today or date.today()
+    batch_size = batch_size or settings.OVERDUE_BATCH_SIZE
+    table = Invoice.__table__
+    started = time.perf_counter()
+    transitioned = batches = 0
+    tenants = set()
+
+    while True:
+        connection = db.connection()
+        due = connection.execute(
+            select(table.c.id, table.c.invoice_number, table.c.created_by, table.c.client_id).where(
+                table.c.status == SENT, table.c.due_date < today
+            ).order_by(table.c.due_date, table.c.id).limit(batch_size)
+        ).all()
+        if not due:
+            break
+
+        ids = [row.id for row in due]
+        result = connection.execute(
+            update(table).where(table.c.id.in_(ids), table.c.status == SENT).values(
+                status="overdue", updated_at=datetime.utcnow()
+            )
+        )
+        record_bulk_changes(connection, Invoice, ids)
+        for owner in {row.created_by for row in due}:
+            mark_tenant_dirty(db, owner)
+        db.commit()
+
+        for row in due:
+            data = {"invoice_id": row.id, "invoice_number": row.invoice_number, "status": "overdue"}
+            event_bus.publish(user_channel(row.created_by), "invoice.updated", data)
+            event_bus.publish(client_channel(row.client_id), "invoice.updated", data)
+
+        transitioned += result.rowcount
+        batches += 1
+        tenants.update(row.created_by for row in due)
+
+    return {
+        "as_of": today,
+        "transitioned": transitioned,
+        "batches": batches,
+        "tenants": len(tenants),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Mark sent invoices past their due date as overdue")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    import app.models  # noqa: F401 - register every mapper before querying
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = mark_overdue_invoices(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(
+        f"{result['transitioned']} invoices marked overdue in {result['batches']} batches "
+        f"across {result['tenants']} users ({result['duration_ms']} ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
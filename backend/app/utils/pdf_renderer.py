@@ -0,0 +1,240 @@
+"""
+ReportLab drawing of one invoice PDF.
+
+render_invoice_pdf() takes a plain document dict built by
+app.utils.invoice_pdf.invoice_document() and returns the PDF bytes. The
+layout matches the browser's jsPDF invoice (frontend/src/utils/pdfGenerator.js)
+on an A4 page in millimetres. Colors, fonts, sizes, the totals column and
+field visibility come from the template config. The company logo is left
+out because workers do not fetch remote URLs.
+
+This module imports nothing from the app, so process-pool workers start
+without touching settings or the database.
+"""
+from datetime import date
+from io import BytesIO
+from typing import Optional, Tuple
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfgen import canvas
+except ImportError:  # pragma: no cover - optional dependency
+    canvas = None
+
+# Bump when the layout changes so cached PDFs are rendered again
+RENDERER_VERSION = 1
+
+FONTS = {
+    "helvetica": ("Helvetica", "Helvetica-Bold"),
+    "times": ("Times-Roman", "Times-Bold"),
+    "courier": ("Courier", "Courier-Bold"),
+}
+PAGE_BOTTOM = 265
+GRAY = (128, 128, 128)
+
+
+def _rgb(hex_color: Optional[str], default: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    if not hex_color or not hex_color.startswith("#") or len(hex_color) != 7:
+        return default
+    try:
+        return int(hex_color[1:3], 16), int(hex_color[3:5], 16), int(hex_color[5:7], 16)
+    except ValueError:
+        return default
+
+
+def _amount(value: Optional[float]) -> str:
+    return f"{value or 0:,.2f}"
+
+
+def _date(value: Optional[str]) -> str:
+    return date.fromisoformat(value).strftime("%d %b %Y") if value else ""
+
+
+class _Page:
+    """jsPDF-style drawing: millimetres from the top-left corner."""
+
+    def __init__(self, pdf, config: dict):
+        self.pdf = pdf
+        self.regular, self.bold = FONTS.get((config.get("font_family") or "").lower(), FONTS["helvetica"])
+        self.size = config.get("font_size_base") or 10
+        self.color = _rgb(config.get("text_color"), (17, 24, 39))
+        self.font(size=self.size)
+
+    def font(self, bold: bool = False, size: Optional[float] = None, color: Optional[Tuple[int, int, int]] = None):
+        self.current = (self.bold if bold else self.regular, size or self.size, color or self.color)
+        self.pdf.setFont(*self.current[:2])
+        self.pdf.setFillColorRGB(*[channel / 255 for channel in self.current[2]])
+
+    def text(self, value, x: float, y: float, align: str = "left"):
+        value = "" if value is None else str(value)
+        draw = {"left": self.pdf.drawString, "right": self.pdf.drawRightString, "center": self.pdf.drawCentredString}
+        draw[align](x * mm, A4[1] - y * mm, value)
+
+    def lines(self, value: str, x: float, y: float, width: float) -> float:
+        """Wrapped ``value`` from ``y``; returns the y below the last line."""
+        font, size, _ = self.current
+        for line in simpleSplit(value, font, size, width * mm):
+            if y > PAGE_BOTTOM:
+                y = self.new_page()
+            self.text(line, x, y)
+            y += size * 0.45
+        return y
+
+    def new_page(self) -> float:
+        """Start a page in the current font; returns its first y."""
+        font, size, color = self.current
+        self.pdf.showPage()
+        self.pdf.setFont(font, size)
+        self.pdf.setFillColorRGB(*[channel / 255 for channel in color])
+        return 20
+
+    def clip(self, value: Optional[str], width: float) -> str:
+        """First line of ``value`` wrapped to ``width`` mm."""
+        lines = simpleSplit(value or "", self.regular, self.size, width * mm)
+        return lines[0] if lines else ""
+
+    def rule(self, x1: float, y: float, x2: float, color: Tuple[int, int, int]):
+        self.pdf.setStrokeColorRGB(*[channel / 255 for channel in color])
+        self.pdf.line(x1 * mm, A4[1] - y * mm, x2 * mm, A4[1] - y * mm)
+
+    def box(self, x: float, y: float, width: float, height: float, color: Tuple[int, int, int], radius: float = 0):
+        self.pdf.setFillColorRGB(*[channel / 255 for channel in color])
+        self.pdf.roundRect(x * mm, A4[1] - (y + height) * mm, width * mm, height * mm, radius * mm, stroke=0, fill=1)
+
+
+def _items_header(page: _Page, y: float, styles: dict, color, border) -> float:
+    page.box(18, y - 6, 164, 9, _rgb(styles.get("table_header_bg"), (248, 250, 252)))
+    page.font(bold=True, color=color)
+    for label, x in (("Description", 20), ("Qty", 120), ("Rate", 140), ("Amount", 170)):
+        page.text(label, x, y)
+    page.rule(20, y + 5, 180, border)
+    page.font()
+    return y + 10
+
+
+def render_invoice_pdf(document: dict) -> bytes:
+    """PDF bytes of an invoice document from app.utils.invoice_pdf.invoice_document()."""
+    if canvas is None:
+        raise RuntimeError("reportlab is not installed")
+
+    invoice, client, config, styles = document["invoice"], document["client"], document["config"], document["styles"]
+
+    def show(field: str) -> bool:
+        return config.get(field, True)
+
+    primary = _rgb(config.get("primary_color"), (37, 99, 235))
+    header_color = _rgb(styles.get("header_color"), primary)
+    border = _rgb(styles.get("table_border_color"), (226, 232, 240))
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
+    pdf.setTitle(f"Invoice {invoice['invoice_number']}")
+    page = _Page(pdf, config)
+
+    # Header
+    page.font(bold=True, size=config.get("font_size_title") or 24, color=primary)
+    page.text("INVOICE", 20, 20)
+    badge_y = 35
+    if show("show_company_details"):
+        page.font(bold=True, size=12)
+        page.text(config.get("company_name"), 150, 20)
+        page.font()
+        y = 26
+        for detail in (config.get("company_address"), config.get("company_phone"), config.get("company_email")):
+            if detail:
+                page.text(detail, 150, y)
+                y += 5
+        badge_y = max(badge_y, y)
+
+    # Invoice details
+    page.font()
+    y = 40
+    for field, label, value in (
+        ("show_invoice_number", "Invoice #:", invoice["invoice_number"]),
+        ("show_issue_date", "Issue Date:", _date(invoice["issue_date"])),
+        ("show_due_date", "Due Date:", _date(invoice["due_date"])),
+    ):
+        if show(field):
+            page.text(f"{label} {value}", 20, y)
+            y += 6
+    if invoice.get("status"):
+        page.box(150, badge_y, 40, 8, primary, radius=2)
+        page.font(color=(255, 255, 255))
+        page.text(invoice["status"].upper(), 155, badge_y + 5)
+
+    # Bill to
+    if show("show_client_details") and client:
+        page.font(bold=True, size=12, color=header_color)
+        page.text("BILL TO:", 20, 70)
+        page.font()
+        y = 78
+        for detail in (client.get("name"), client.get("company"), client.get("email"), client.get("phone")):
+            if detail:
+                page.text(detail, 20, y)
+                y += 6
+
+    # Items
+    y = 110
+    if show("show_line_items"):
+        y = _items_header(page, y, styles, header_color, border)
+        for description, quantity, rate, amount in document["items"]:
+            if y > PAGE_BOTTOM:
+                y = _items_header(page, page.new_page(), styles, header_color, border)
+            page.text(page.clip(description, 95), 20, y)
+            page.text(quantity, 122, y, align="center")
+            page.text(_amount(rate), 155, y, align="right")
+            page.text(_amount(amount), 180, y, align="right")
+            y += 8
+        y += 10
+
+    # Totals
+    if y > PAGE_BOTTOM - 30:
+        y = page.new_page()
+    label_x, value_x = (20, 80) if config.get("totals_layout") == "left" else (140, 180)
+    rows = []
+    if show("show_subtotal"):
+        rows.append(("Subtotal:", _amount(invoice["subtotal"])))
+    if show("show_tax"):
+        rows.append((f"Tax ({invoice['tax_rate'] or 0:g}%):", _amount(invoice["tax_amount"])))
+    if show("show_discount") and (invoice["discount"] or 0) > 0:
+        rows.append(("Discount:", f"-{_amount(invoice['discount'])}"))
+    for label, value in rows:
+        page.text(label, label_x, y)
+        page.text(value, value_x, y, align="right")
+        y += 6
+    if show("show_total"):
+        y += 6
+        page.font(bold=True, size=12)
+        page.text(f"TOTAL ({invoice['currency']}):", label_x, y)
+        page.text(_amount(invoice["total_amount"]), value_x, y, align="right")
+        page.font()
+    if (invoice["paid_amount"] or 0) > 0:
+        if show("show_paid_amount"):
+            y += 6
+            page.text("Paid:", label_x, y)
+            page.text(_amount(invoice["paid_amount"]), value_x, y, align="right")
+        if show("show_balance_due"):
+            y += 6
+            page.font(bold=True)
+            page.text("Balance Due:", label_x, y)
+            page.text(_amount(invoice["total_amount"] - invoice["paid_amount"]), value_x, y, align="right")
+            page.font()
+
+    # Notes and terms
+    y += 19
+    for field, label, value in (("show_notes", "Notes:", invoice["notes"]), ("show_terms", "Terms & Conditions:", invoice["terms"])):
+        if not show(field) or not value:
+            continue
+        if y > PAGE_BOTTOM:
+            y = page.new_page()
+        page.font(bold=True)
+        page.text(label, 20, y)
+        page.font()
+        y = page.lines(value, 20, y + 6, 170) + 4
+
+    page.font(size=8, color=GRAY)
+    page.text("Thank you for your business!", 105, 280, align="center")
+    pdf.save()
+    return buffer.getvalue()
@@ -0,0 +1,259 @@
+"""
+On-demand request profiling.
+
+Profiling is off by default. A request is profiled when either:
+  * PROFILING_ENABLED is set and the request carries ``X-Profile: 1``, or
+  * an admin has armed the profiler for a path prefix via /api/admin/profiling/arm,
+    in which case the next N matching requests are profiled.
+
+Reports are written to PROFILING_DIR. pyinstrument is used when installed and
+produces an HTML flame graph; otherwise cProfile is used and a ``.prof`` file
+(loadable with snakeviz / pstats) plus a plain-text summary are written.
+
+Both profilers only see the event-loop thread. Sync endpoints, sync
+dependencies and work handed to run_in_threadpool run in the threadpool, so
+the threadpool's busy threads are sampled alongside. Their stacks go to a
+``.threads.txt`` report in collapsed-stack format (one ``frame;frame;... count``
+line per stack, readable by flamegraph.pl and speedscope). Profilers and
+sampler are process-wide, so one request is profiled at a time. A request that
+asks for a profile while another is being profiled runs unprofiled, and an
+armed prefix keeps its budget for the next one. Threadpool work of other
+requests running at the same time is sampled too. Reports are written from
+the threadpool, off the event loop.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.config import settings
+
+try:
+    from pyinstrument import Profiler as _SamplingProfiler
+except ImportError:  # pragma: no cover - optional dependency
+    _SamplingProfiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+REPORT_EXTENSIONS = (".html", ".prof", ".txt")
+# Seconds between samples of the threadpool's threads
+THREAD_SAMPLE_INTERVAL = 0.005
+THREADPOOL_THREAD_NAME = "AnyIO worker thread"
+
+PROFILING_DIR = Path(settings.PROFILING_DIR)
+if not PROFILING_DIR.is_absolute():
+    PROFILING_DIR = Path(__file__).parent.parent.parent / PROFILING_DIR
+
+
+class ProfilerArming:
+    """Thread-safe registry of path prefixes armed for the next N requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._armed: Dict[str, int] = {}
+
+    def arm(self, path_prefix: str, count: int) -> None:
+        with self._lock:
+            if count <= 0:
+                self._armed.pop(path_prefix, None)
+            else:
+                self._armed[path_prefix] = count
+
+    def disarm(self, path_prefix: Optional[str] = None) -> None:
+        with self._lock:
+            if path_prefix is None:
+                self._armed.clear()
+            else:
+                self._armed.pop(path_prefix, None)
+
+    def consume(self, path: str) -> bool:
+        """Return True (and decrement the budget) if ``path`` is armed."""
+        with self._lock:
+            for prefix, remaining in self._armed.items():
+                if path.startswith(prefix):
+                    if remaining <= 1:
+                        del self._armed[prefix]
+                    else:
+                        self._armed[prefix] = remaining - 1
+                    return True
+        return False
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._armed)
+
+
+profiler_arming = ProfilerArming()
+
+
+class ThreadpoolSampler:
+    """Samples the stacks of busy threadpool threads from a thread of its own."""
+
+    def __init__(self, interval: float = THREAD_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            workers = {
+                thread.ident for thread in threading.enumerate() if thread.name == THREADPOOL_THREAD_NAME
+            }
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in workers:
+                    stack = self._stack(frame)
+                    if stack:
+                        self.stacks[stack] += 1
+
+    @staticmethod
+    def _stack(frame) -> Optional[str]:
+        """The frames below the worker loop, outermost first; None for an idle worker."""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            if code.co_name == "get" and code.co_filename.endswith("queue.py"):
+                return None  # Waiting for work
+            if code.co_filename.endswith("threading.py") or "anyio" in code.co_filename:
+                break
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(frames)) or None
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _slugify_path(path: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")
+    return slug[:80] or "root"
+
+
+def _prune_reports() -> None:
+    """Keep at most PROFILING_MAX_REPORTS report files, deleting the oldest first."""
+    reports = sorted(
+        (p for p in PROFILING_DIR.iterdir() if p.suffix in REPORT_EXTENSIONS),
+        key=lambda p: p.stat().st_mtime,
+    )
+    excess = len(reports) - settings.PROFILING_MAX_REPORTS
+    for report in reports[:max(excess, 0)]:
+        try:
+            report.unlink()
+        except OSError as e:
+            logger.warning(f"Failed to prune profile report {report.name}: {e}")
+
+
+def list_reports() -> List[dict]:
+    """List stored profile reports, newest first."""
+    if not PROFILING_DIR.exists():
+        return []
+
+    reports = []
+    for path in PROFILING_DIR.iterdir():
+        if path.suffix not in REPORT_EXTENSIONS:
+            continue
+        stat = path.stat()
+        reports.append({
+            "name": path.name,
+            "size": stat.st_size,
+            "created_at": datetime.fromtimestamp(stat.st_mtime),
+        })
+    reports.sort(key=lambda r: r["created_at"], reverse=True)
+    return reports
+
+
+def get_report_path(name: str) -> Optional[Path]:
+    """Resolve a report name to a path inside PROFILING_DIR, rejecting traversal."""
+    if os.path.basename(name) != name or not name.endswith(REPORT_EXTENSIONS):
+        return None
+    path = PROFILING_DIR / name
+    return path if path.is_file() else None
+
+
+def _write_reports(base_name: str, profiler, sampler: ThreadpoolSampler) -> str:
+    """Write the reports of one profiled request; returns the name of the main one."""
+    PROFILING_DIR.mkdir(parents=True, exist_ok=True)
+    if isinstance(profiler, cProfile.Profile):
+        profiler.dump_stats(str(PROFILING_DIR / f"{base_name}.prof"))
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(50)
+        (PROFILING_DIR / f"{base_name}.txt").write_text(summary.getvalue(), encoding="utf-8")
+        report_name = f"{base_name}.prof"
+    else:
+        (PROFILING_DIR / f"{base_name}.html").write_text(profiler.output_html(), encoding="utf-8")
+        report_name = f"{base_name}.html"
+
+    if sampler.stacks:
+        (PROFILING_DIR / f"{base_name}.threads.txt").write_text(sampler.collapsed(), encoding="utf-8")
+    _prune_reports()
+    return report_name
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """Profile opted-in requests, one at a time, and store reports per request."""
+
+    _profiling = threading.Lock()
+
+    async def dispatch(self, request: Request, call_next):
+        # Checked and taken without an await in between, so on the event loop this never blocks
+        if self._profiling.locked() or not self._should_profile(request):
+            return await call_next(request)
+
+        with self._profiling:
+            started = time.perf_counter()
+            sampler = ThreadpoolSampler()
+            sampler.start()
+            if _SamplingProfiler is not None:
+                profiler = _SamplingProfiler(async_mode="enabled")
+                profiler.start()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                if _SamplingProfiler is not None:
+                    profiler.stop()
+                else:
+                    profiler.disable()
+                sampler.stop()
+            duration_ms = (time.perf_counter() - started) * 1000
+
+            base_name = self._report_base_name(request, duration_ms)
+            report_name = await run_in_threadpool(_write_reports, base_name, profiler, sampler)
+
+        logger.info(f"Profiled {request.method} {request.url.path} in {duration_ms:.1f}ms -> {report_name}")
+        response.headers["X-Profile-Report"] = report_name
+        return response
+
+    @staticmethod
+    def _should_profile(request: Request) -> bool:
+        if settings.PROFILING_ENABLED and request.headers.get(PROFILE_HEADER) == "1":
+            return True
+        return profiler_arming.consume(request.url.path)
+
+    @staticmethod
+    def _report_base_name(request: Request, duration_ms: float) -> str:
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        return f"{timestamp}_{request.method}_{_slugify_path(request.url.path)}_{int(duration_ms)}ms"
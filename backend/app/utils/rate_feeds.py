@@ -0,0 +1,160 @@
+"""
+Exchange-rate feeds for the exchange_rates table.
+
+A feed reads a local file and yields (currency, date, rate) records quoted
+per unit of EXCHANGE_RATE_REFERENCE_CURRENCY. Two formats ship:
+
+  * CSV  - ``date,currency,rate`` columns, one rate per row.
+  * JSON - ``{"base": "EUR", "rates": {"2026-01-30": {"USD": 1.08, ...}}}``.
+           ``base`` defaults to the reference currency. Other bases are
+           rebased through the reference currency's rate on each day.
+
+Other formats can be added to FEEDS, keyed by file extension. Import a file
+from the backend/ directory with:
+
+    python -m app.utils.rate_feeds rates.csv
+"""
+import argparse
+import csv
+import json
+from abc import ABC, abstractmethod
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.exchange_rate import ExchangeRate
+from app.utils.bulk_insert import bulk_insert
+from app.utils.exchange_rates import invalidate_rate_table
+
+RateRecord = Tuple[str, date, float]
+
+
+class RateFeed(ABC):
+    """Reads rate records from ``path``; subclasses implement read()."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    @abstractmethod
+    def read(self) -> Iterator[RateRecord]:
+        """Yield the file's (currency, date, rate) records."""
+
+
+class CsvRateFeed(RateFeed):
+    def read(self) -> Iterator[RateRecord]:
+        with self.path.open(encoding="utf-8-sig", newline="") as stream:
+            # Header is line 1
+            for line_number, record in enumerate(csv.DictReader(stream), start=2):
+                try:
+                    yield _record(record["currency"], record["date"], record["rate"])
+                except (KeyError, TypeError, ValueError) as exc:
+                    raise ValueError(f"{self.path.name} line {line_number}: {exc}") from exc
+
+
+class JsonRateFeed(RateFeed):
+    def read(self) -> Iterator[RateRecord]:
+        document = json.loads(self.path.read_text(encoding="utf-8"))
+        reference = settings.EXCHANGE_RATE_REFERENCE_CURRENCY.upper()
+        base = (document.get("base") or reference).upper()
+
+        for day, rates in document.get("rates", {}).items():
+            rates = {currency.upper(): rate for currency, rate in rates.items()}
+            rates[base] = 1.0
+            if reference not in rates:
+                raise ValueError(f"{self.path.name} {day}: no {reference} rate to rebase {base} quotes")
+            divisor = float(rates[reference])
+            for currency, rate in rates.items():
+                yield _record(currency, day, float(rate) / divisor)
+
+
+FEEDS: Dict[str, Type[RateFeed]] = {
+    ".csv": CsvRateFeed,
+    ".json": JsonRateFeed,
+}
+
+
+def _record(currency: str, day: str, rate) -> RateRecord:
+    currency = (currency or "").strip().upper()
+    if not currency:
+        raise ValueError("currency is required")
+    rate = float(rate)
+    if rate <= 0:
+        raise ValueError(f"rate for {currency} must be positive")
+    return currency, date.fromisoformat(day.strip()), rate
+
+
+def feed_for_path(path: str) -> RateFeed:
+    feed_class = FEEDS.get(Path(path).suffix.lower())
+    if feed_class is None:
+        raise ValueError(f"No rate feed for {Path(path).suffix or path}; expected one of {', '.join(FEEDS)}")
+    return feed_class(path)
+
+
+def import_rates(db: Session, feed: RateFeed) -> dict:
+    """Upsert the feed's rates by (currency, date) and reload the in-memory rate table."""
+    reference = settings.EXCHANGE_RATE_REFERENCE_CURRENCY.upper()
+    # Later records for the same day win
+    incoming: Dict[Tuple[str, date], float] = {
+        (currency, day): rate for currency, day, rate in feed.read() if currency != reference
+    }
+    if not incoming:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    days = [day for _, day in incoming]
+    existing = {
+        (currency, day): (rate_id, rate)
+        for rate_id, currency, day, rate in db.query(
+            ExchangeRate.id, ExchangeRate.currency, ExchangeRate.date, ExchangeRate.rate
+        ).filter(ExchangeRate.date.between(min(days), max(days)))
+    }
+
+    inserts: List[dict] = []
+    updates: List[dict] = []
+    for (currency, day), rate in incoming.items():
+        stored: Optional[Tuple[int, float]] = existing.get((currency, day))
+        if stored is None:
+            inserts.append({"currency": currency, "date": day, "rate": rate})
+        elif stored[1] != rate:
+            updates.append({"rate_id": stored[0], "new_rate": rate})
+
+    connection = db.connection()
+    if inserts:
+        bulk_insert(connection, ExchangeRate.__table__, inserts)
+    if updates:
+        table = ExchangeRate.__table__
+        connection.execute(
+            update(table).where(table.c.id == bindparam("rate_id")).values(rate=bindparam("new_rate")),
+            updates,
+        )
+    db.commit()
+    invalidate_rate_table()
+
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "unchanged": len(incoming) - len(inserts) - len(updates),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import exchange rates from a local file feed")
+    parser.add_argument("path", help=f"Rate file ({', '.join(FEEDS)})")
+    args = parser.parse_args(argv)
+
+    import app.models  # noqa: F401 - register every mapper before querying
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = import_rates(db, feed_for_path(args.path))
+    finally:
+        db.close()
+    print(f"{result['inserted']} inserted, {result['updated']} updated, {result['unchanged']} unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Slim read path for list and detail endpoints.
+
+Instead of materializing ORM instances, lazy-loading relationships and
+validating them through the response models, these helpers select only the
+columns a response needs, build plain dict rows (described by the TypedDicts
+below) and leave serialization to FastJSONResponse.
+
+Each resource is described by a ReadModel: its selectable columns, computed
+fields and embeddable relations. A Fieldset parsed from the ``fields=`` and
+``include=`` query parameters decides which columns go into the SELECT and
+which relations are loaded, e.g.
+
+    /api/invoices?fields=id,invoice_number,total_amount,client.name&include=client
+
+Relations are loaded with one extra query each (keyed IN lookups), never per
+row. Without parameters the rows have exactly the shape of the endpoint's
+response model.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypedDict
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Query, Session
+
+from app.models.client import Client
+from app.models.expense import Expense
+from app.models.expense_category import ExpenseCategory
+from app.models.invoice import Invoice, InvoiceItem
+from app.models.invoice_template import InvoiceTemplate
+from app.models.recurring_invoice import RecurringInvoice, RecurringInvoiceTemplateItem
+from app.schemas.invoice_template import InvoiceTemplateResponse
+from app.utils.template_renderer import DEFAULT_TEMPLATE_CONFIG, resolve_template_configs
+
+# Stay well below SQLite's bound-parameter limit when loading relations for many rows.
+IN_CLAUSE_CHUNK = 1000
+
+
+class ClientRow(TypedDict):
+    id: int
+    name: str
+    company: Optional[str]
+    email: str
+    phone: Optional[str]
+    address: Optional[str]
+    city: Optional[str]
+    state: Optional[str]
+    pincode: Optional[str]
+    gstin: Optional[str]
+    base_currency: Optional[str]
+    document_type: Optional[str]
+    document_path: Optional[str]
+    has_deposit: Optional[bool]
+    deposit_amount: Optional[float]
+    deposit_date: Optional[date]
+    deposit_type: Optional[str]
+    is_portal_enabled: Optional[bool]
+    created_at: datetime
+    updated_at: datetime
+
+
+class InvoiceItemRow(TypedDict):
+    id: int
+    description: str
+    quantity: int
+    rate: float
+    amount: float
+
+
+class InvoiceRow(TypedDict):
+    id: int
+    invoice_number: str
+    client_id: int
+    issue_date: date
+    due_date: date
+    tax_rate: float
+    discount: float
+    notes: Optional[str]
+    terms: Optional[str]
+    status: str
+    currency: str
+    design_template_id: Optional[int]
+    subtotal: float
+    tax_amount: float
+    total_amount: float
+    payment_status: str
+    paid_amount: float
+    balance: float
+    created_at: datetime
+    updated_at: datetime
+    client: Optional[ClientRow]
+    items: List[InvoiceItemRow]
+    template_config: Optional[dict]
+
+
+class Relation:
+    """An embeddable relation, joined on ``parent_key == child_key`` with a separate IN query."""
+
+    def __init__(self, columns: Sequence, parent_key, child_key, many: bool = False, order_by: Sequence = ()):
+        self.columns = {column.key: column for column in columns}
+        self.parent_key = parent_key
+        self.child_key = child_key
+        self.many = many
+        self.order_by = order_by
+
+
+class Fieldset:
+    """The columns and relations requested for one response."""
+
+    def __init__(self, fields: List[str], includes: List[str], relation_fields: Dict[str, List[str]]):
+        self.fields = fields
+        self.includes = includes
+        self.relation_fields = relation_fields
+
+    def includes_relation(self, name: str) -> bool:
+        return name in self.includes
+
+
+class ReadModel:
+    """Selectable columns, computed fields and relations of one resource."""
+
+    def __init__(
+        self,
+        columns: Sequence,
+        relations: Optional[Dict[str, Relation]] = None,
+        default_include: Iterable[str] = (),
+        computed: Optional[Dict[str, Tuple[Tuple[str, ...], Callable[[dict], object]]]] = None,
+    ):
+        self.columns = {column.key: column for column in columns}
+        self.relations = relations or {}
+        self.default_include = list(default_include)
+        self.computed = computed or {}
+
+    def fieldset(
+        self,
+        fields: Optional[str] = None,
+        include: Optional[str] = None,
+        extra_includes: Iterable[str] = (),
+        default_fields: Optional[Iterable[str]] = None,
+    ) -> Fieldset:
+        """
+        Parse ``fields``/``include`` query values. ``extra_includes`` names endpoint-specific
+        embeds (handled by the caller); unknown names are rejected with 400.
+        """
+        extra_includes = set(extra_includes)
+        includes = list(self.default_include) if include is None else _split(include)
+        for name in includes:
+            if name not in self.relations and name not in extra_includes:
+                raise _unknown("include", name)
+
+        relation_fields: Dict[str, List[str]] = {}
+        if fields is None:
+            selected = list(default_fields) if default_fields is not None else [*self.columns, *self.computed]
+        else:
+            selected = ["id"]
+            for name in _split(fields):
+                relation_name, _, sub_field = name.partition(".")
+                if sub_field:
+                    relation = self.relations.get(relation_name)
+                    if relation is None or sub_field not in relation.columns:
+                        raise _unknown("fields", name)
+                    relation_fields.setdefault(relation_name, ["id"])
+                    if sub_field not in relation_fields[relation_name]:
+                        relation_fields[relation_name].append(sub_field)
+                    if relation_name not in includes:
+                        includes.append(relation_name)
+                elif name in self.columns or name in self.computed:
+                    if name not in selected:
+                        selected.append(name)
+                else:
+                    raise _unknown("fields", name)
+
+        return Fieldset(selected, includes, relation_fields)
+
+    def fetch(self, db: Session, query: Query, fieldset: Fieldset) -> List[dict]:
+        """Run ``query`` (filtered and ordered) as a column-only SELECT shaped by ``fieldset``."""
+        requested = [name for name in fieldset.fields if name in self.columns]
+        hidden = []
+        for name in fieldset.fields:
+            for dependency in self.computed.get(name, ((), None))[0]:
+                if dependency not in requested and dependency not in hidden:
+                    hidden.append(dependency)
+        for name in fieldset.includes:
+            relation = self.relations.get(name)
+            if relation is not None and relation.parent_key.key not in requested + hidden:
+                hidden.append(relation.parent_key.key)
+
+        keys = requested + hidden
+        rows = [dict(zip(keys, record)) for record in query.with_entities(*(self.columns[k] for k in keys))]
+
+        for name in fieldset.fields:
+            if name in self.computed:
+                compute = self.computed[name][1]
+                for row in rows:
+                    row[name] = compute(row)
+
+        for name in fieldset.includes:
+            if name in self.relations:
+                self._embed(db, rows, name, self.relations[name], fieldset.relation_fields.get(name))
+
+        for row in rows:
+            for key in hidden:
+                del row[key]
+        return rows
+
+    @staticmethod
+    def _embed(db: Session, rows: List[dict], name: str, relation: Relation, fields: Optional[List[str]]) -> None:
+        parent_key = relation.parent_key.key
+        keys = list({row[parent_key] for row in rows if row[parent_key] is not None})
+        field_names = fields or list(relation.columns)
+        columns = [relation.columns[field] for field in field_names]
+
+        related: Dict[object, list] = defaultdict(list)
+        for start in range(0, len(keys), IN_CLAUSE_CHUNK):
+            chunk = keys[start:start + IN_CLAUSE_CHUNK]
+            records = db.query(relation.child_key, *columns).filter(
+                relation.child_key.in_(chunk)
+            ).order_by(*relation.order_by)
+            for record in records:
+                related[record[0]].append(dict(zip(field_names, record[1:])))
+
+        for row in rows:
+            matches = related.get(row[parent_key], [])
+            if relation.many:
+                row[name] = matches
+            else:
+                row[name] = matches[0] if matches else None
+
+
+def _split(value: str) -> List[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _unknown(parameter: str, name: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Unknown {parameter} value: {name}"
+    )
+
+
+CLIENT_COLUMNS = (
+    Client.id, Client.name, Client.company, Client.email, Client.phone, Client.address,
+    Client.city, Client.state, Client.pincode, Client.gstin, Client.base_currency,
+    Client.document_type, Client.document_path, Client.has_deposit, Client.deposit_amount,
+    Client.deposit_date, Client.deposit_type, Client.is_portal_enabled,
+    Client.created_at, Client.updated_at,
+)
+INVOICE_COLUMNS = (
+    Invoice.id, Invoice.invoice_number, Invoice.client_id, Invoice.issue_date, Invoice.due_date,
+    Invoice.tax_rate, Invoice.discount, Invoice.notes, Invoice.terms, Invoice.status,
+    Invoice.currency, Invoice.design_template_id, Invoice.subtotal, Invoice.tax_amount,
+    Invoice.total_amount, Invoice.payment_status, Invoice.paid_amount,
+    Invoice.created_at, Invoice.updated_at,
+)
+ITEM_COLUMNS = (
+    InvoiceItem.id, InvoiceItem.description, InvoiceItem.quantity, InvoiceItem.rate, InvoiceItem.amount,
+)
+CATEGORY_COLUMNS = (
+    ExpenseCategory.id, ExpenseCategory.name, ExpenseCategory.description, ExpenseCategory.color,
+    ExpenseCategory.icon, ExpenseCategory.is_active, ExpenseCategory.created_by,
+    ExpenseCategory.created_at, ExpenseCategory.updated_at,
+)
+EXPENSE_COLUMNS = (
+    Expense.id, Expense.amount, Expense.category_id, Expense.date, Expense.description,
+    Expense.vendor, Expense.payment_method, Expense.currency, Expense.exchange_rate,
+    Expense.client_id, Expense.invoice_id, Expense.receipt_file, Expense.base_currency_amount,
+    Expense.created_at, Expense.updated_at,
+)
+RECURRING_COLUMNS = (
+    RecurringInvoice.id, RecurringInvoice.template_name, RecurringInvoice.client_id,
+    RecurringInvoice.frequency, RecurringInvoice.interval_value, RecurringInvoice.day_of_week,
+    RecurringInvoice.day_of_month, RecurringInvoice.start_date, RecurringInvoice.end_date,
+    RecurringInvoice.occurrences_limit, RecurringInvoice.current_occurrence,
+    RecurringInvoice.is_active, RecurringInvoice.auto_send, RecurringInvoice.tax_enabled,
+    RecurringInvoice.tax_rate, RecurringInvoice.email_subject, RecurringInvoice.email_message,
+    RecurringInvoice.created_by, RecurringInvoice.created_at, RecurringInvoice.updated_at,
+    RecurringInvoice.last_generated_at, RecurringInvoice.next_due_date,
+    RecurringInvoice.generation_count, RecurringInvoice.failed_generations,
+)
+RECURRING_ITEM_COLUMNS = (
+    RecurringInvoiceTemplateItem.id, RecurringInvoiceTemplateItem.description,
+    RecurringInvoiceTemplateItem.quantity, RecurringInvoiceTemplateItem.rate,
+    RecurringInvoiceTemplateItem.amount, RecurringInvoiceTemplateItem.sort_order,
+)
+
+TEMPLATE_COLUMNS = tuple(
+    getattr(InvoiceTemplate, name)
+    for name in InvoiceTemplateResponse.model_fields
+    if name in InvoiceTemplate.__table__.columns
+)
+
+
+def _invoice_balance(row: dict) -> float:
+    return (row["total_amount"] or 0.0) - (row["paid_amount"] or 0.0)
+
+
+CLIENT_READ = ReadModel(CLIENT_COLUMNS)
+
+INVOICE_READ = ReadModel(
+    INVOICE_COLUMNS,
+    relations={
+        "client": Relation(CLIENT_COLUMNS, Invoice.client_id, Client.id),
+        "items": Relation(ITEM_COLUMNS, Invoice.id, InvoiceItem.invoice_id, many=True, order_by=(InvoiceItem.id,)),
+    },
+    default_include=("client", "items"),
+    computed={"balance": (("total_amount", "paid_amount"), _invoice_balance)},
+)
+
+EXPENSE_READ = ReadModel(
+    EXPENSE_COLUMNS,
+    relations={
+        "category": Relation(CATEGORY_COLUMNS, Expense.category_id, ExpenseCategory.id),
+        "client": Relation(CLIENT_COLUMNS, Expense.client_id, Client.id),
+    },
+    default_include=("category", "client"),
+)
+
+RECURRING_READ = ReadModel(
+    RECURRING_COLUMNS,
+    relations={
+        "client": Relation(CLIENT_COLUMNS, RecurringInvoice.client_id, Client.id),
+        "template_items": Relation(
+            RECURRING_ITEM_COLUMNS, RecurringInvoice.id, RecurringInvoiceTemplateItem.recurring_invoice_id,
+            many=True, order_by=(RecurringInvoiceTemplateItem.sort_order, RecurringInvoiceTemplateItem.id),
+        ),
+    },
+    default_include=("client", "template_items"),
+)
+
+TEMPLATE_READ = ReadModel(TEMPLATE_COLUMNS)
+
+# Columns of RecurringInvoiceListResponse, used when the list endpoint gets no fields=
+RECURRING_LIST_FIELDS = (
+    "id", "template_name", "frequency", "interval_value", "day_of_week", "day_of_month",
+    "start_date", "end_date", "is_active", "auto_send", "generation_count",
+    "failed_generations", "next_due_date", "created_at",
+)
+
+
+def fetch_invoice_rows(
+    db: Session, query: Query, fields: Optional[str] = None, include: Optional[str] = None
+) -> List[InvoiceRow]:
+    """
+    Run an invoice query (filtered and ordered) as column-only SELECTs. Without
+    ``fields``/``include`` the rows are InvoiceResponse-shaped, with client and items.
+    ``include=template_config`` resolves each distinct design template once.
+    """
+    fieldset = INVOICE_READ.fieldset(fields, include, extra_includes=("template_config",))
+    with_config = fieldset.includes_relation("template_config")
+    hide_template_id = with_config and "design_template_id" not in fieldset.fields
+    if hide_template_id:
+        fieldset.fields.append("design_template_id")
+
+    rows = INVOICE_READ.fetch(db, query, fieldset)
+    if with_config:
+        configs = resolve_template_configs(db, {row["design_template_id"] for row in rows})
+        for row in rows:
+            row["template_config"] = configs.get(row["design_template_id"], DEFAULT_TEMPLATE_CONFIG)
+            if hide_template_id:
+                del row["design_template_id"]
+    elif fields is None and include is None:
+        for row in rows:
+            row["template_config"] = None
+    return rows
+
+
+def fetch_client_rows(db: Session, query: Query, fields: Optional[str] = None) -> List[ClientRow]:
+    """Run a client query as a column-only SELECT; ClientResponse-shaped without ``fields``."""
+    return CLIENT_READ.fetch(db, query, CLIENT_READ.fieldset(fields))
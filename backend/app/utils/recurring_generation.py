@@ -0,0 +1,510 @@
+"""
+Invoice generation from due recurring templates.
+
+A template is due while it is active and its next_due_date is on or before
+today. Due templates are read from the partial index
+ix_recurring_invoices_active_next_due_date, which holds only active
+templates, so a run costs the number of templates due rather than the size
+of the table. Every batch of RECURRING_GENERATION_BATCH_SIZE templates
+commits its invoices together with the templates' new next_due_date. A
+failed or interrupted batch therefore never leaves an invoice without its
+schedule advanced. Auto-send emails go out after the commit, with the
+server-rendered invoice PDF (app.utils.invoice_pdf) attached.
+
+System-wide runs split templates into RECURRING_GENERATION_SHARDS shards by
+id (id % shards). Several workers, in one process group or on several
+hosts, can run at once:
+
+    python -m app.utils.recurring_generation --workers 4
+
+Each worker starts at a different shard and walks all of them. On
+PostgreSQL every batch selects its templates FOR UPDATE SKIP LOCKED, so the
+templates another worker is generating are skipped until its commit moves
+them past today. SQLite has no row locks. There, a worker first leases the
+whole shard in recurring_generation_leases with a conditional UPDATE and
+skips shards leased by others. A lease runs for
+RECURRING_GENERATION_LEASE_SECONDS from the last batch, so a crashed
+worker's shard is picked up again by the next run.
+
+POST /recurring-invoices/generate-all starts one such worker as a background
+run (RecurringGenerationRun). It runs in the threadpool on an event loop of
+its own, so the generation's blocking DB work and auto-send emails never
+hold up the server's event loop. The run's summary is polled from
+GET /recurring-invoices/generate-all/{run_id}.
+
+Each batch draws its invoice numbers from the counter in
+app.utils.invoice_numbers, which hands concurrent workers disjoint ranges,
+so batches never compete for a number. On PostgreSQL the counter row is
+locked only while a range is handed out, not for the batch. On SQLite a
+batch that runs into the busy timeout while other workers commit is rolled
+back and retried.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+import zlib
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError, SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import settings
+from app.models.email_history import EmailHistory, EmailStatus
+from app.models.invoice import Invoice, InvoiceItem
+from app.models.recurring_generation_lease import RecurringGenerationLease
+from app.models.recurring_generation_run import RecurringGenerationRun
+from app.models.recurring_invoice import RecurringInvoice
+from app.models.user import User
+from app.utils.invoice_numbers import next_invoice_numbers
+from app.utils.invoice_pdf import invoice_pdf_attachment
+from app.utils.mail import send_email
+from app.utils.recurring_invoice_utils import (
+    GENERATED_INVOICE_TAX_RATE, GENERATED_INVOICE_TERMS_DAYS, next_occurrence_after
+)
+from app.utils.tenancy import SKIP_TENANT_SCOPE
+
+logger = logging.getLogger(__name__)
+
+# Attempts at a batch or shard lease that ran into a lock timeout
+BATCH_ATTEMPTS = 3
+
+
+def create_invoice_from_template(
+    template: RecurringInvoice, generation_date: date, db: Session, invoice_number: Optional[str] = None
+) -> Invoice:
+    """
+    Create a new invoice from a recurring invoice template.
+    
+    Args:
+        template: The recurring invoice template
+        generation_date: The date for the new invoice
+        db: Database session
+        invoice_number: Number allocated by the caller, if any
+    
+    Returns:
+        Created invoice instance
+    """
+    # Generate invoice number
+    invoice_number = invoice_number or next_invoice_numbers(db)[0]
+    
+    # Calculate totals from template items
+    subtotal = sum(item.amount for item in template.template_items)
+    tax_rate = GENERATED_INVOICE_TAX_RATE
+    tax_amount = (subtotal * tax_rate) / 100
+    total_amount = subtotal + tax_amount  # No discount for recurring invoices by default
+    
+    # Create invoice
+    invoice = Invoice(
+        invoice_number=invoice_number,
+        client_id=template.client_id,
+        issue_date=generation_date,
+        due_date=generation_date + timedelta(days=GENERATED_INVOICE_TERMS_DAYS),
+        subtotal=subtotal,
+        tax_rate=tax_rate,
+        tax_amount=tax_amount,
+        discount=0.0,  # No discount by default
+        total_amount=total_amount,
+        status="draft",
+        notes=f"Generated from recurring template: {template.template_name}",
+        terms="Payment due within 30 days.",
+        created_by=template.created_by,
+        recurring_template_id=template.id,
+        generated_by_template=True,
+        # Items are inserted with the invoice on the next flush
+        items=[
+            InvoiceItem(
+                description=template_item.description,
+                quantity=template_item.quantity,
+                rate=template_item.rate,
+                amount=template_item.amount
+            )
+            for template_item in template.template_items
+        ]
+    )
+    
+    db.add(invoice)
+    
+    # Update template statistics
+    template.current_occurrence += 1
+    template.generation_count += 1
+    template.last_generated_at = datetime.utcnow()
+    
+    # Next occurrence of the schedule, skipping any periods missed before generation_date
+    template.next_due_date = next_occurrence_after(
+        template.start_date,
+        template.frequency,
+        template.interval_value,
+        template.day_of_week,
+        template.day_of_month,
+        max(generation_date, template.next_due_date)
+    )
+    
+    # Check if we should deactivate the template
+    if template.occurrences_limit and template.current_occurrence >= template.occurrences_limit:
+        template.is_active = False
+    
+    if template.end_date and template.next_due_date > template.end_date:
+        template.is_active = False
+    
+    return invoice
+
+
+async def send_recurring_invoice_email(invoice: Invoice, template: RecurringInvoice, db: Session):
+    """
+    Send email for a generated recurring invoice if auto-send is enabled.
+    
+    Args:
+        invoice: The generated invoice
+        template: The template that generated it
+        db: Database session
+    """
+    if not template.auto_send or not template.email_subject:
+        return
+    
+    try:
+        # Get client email
+        client_email = invoice.client.email if invoice.client else None
+        if not client_email:
+            logger.warning(f"No email found for client {invoice.client_id}")
+            return
+        
+        # Prepare invoice data for email
+        invoice_data = {
+            'company_name': 'Webby Wonder',
+            'company_location': 'Mumbai, India',
+            'client_name': invoice.client.name if invoice.client else 'Client',
+            'invoice_number': invoice.invoice_number,
+            'total_amount': f"{invoice.total_amount:,.2f}",
+            'due_date': invoice.due_date.strftime('%d/%m/%Y') if invoice.due_date else 'N/A'
+        }
+        
+        # Generate tracking ID
+        tracking_id = str(uuid.uuid4())
+        
+        # Send email with the server-rendered PDF
+        attachment = await invoice_pdf_attachment(db, invoice)
+        await send_email(
+            subject=template.email_subject,
+            recipients=[client_email],
+            invoice_data=invoice_data,
+            attachment=attachment,
+            tracking_id=tracking_id
+        )
+        
+        # Create email history record
+        email_history = EmailHistory(
+            invoice_id=invoice.id,
+            sent_to=client_email,
+            recipient=client_email,
+            subject=template.email_subject,
+            cc=None,
+            bcc=None,
+            body_preview=template.email_message[:500] if template.email_message else None,
+            attachment_filename=attachment.filename if attachment else None,
+            status=EmailStatus.SENT,
+            tracking_id=tracking_id,
+            sent_at=datetime.utcnow()
+        )
+        db.add(email_history)
+        
+        logger.info(f"Auto-sent recurring invoice {invoice.invoice_number} to {client_email}")
+        
+    except Exception as e:
+        logger.error(f"Failed to auto-send recurring invoice {invoice.invoice_number}: {str(e)}")
+        # Increment failed generations counter
+        template.failed_generations += 1
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def uses_row_locks(db: Session) -> bool:
+    """Whether the database supports SELECT ... FOR UPDATE SKIP LOCKED."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _claim_shard(db: Session, shard: int, worker: str) -> bool:
+    """Lease ``shard`` to ``worker`` unless another worker holds an unexpired lease."""
+    for attempt in range(BATCH_ATTEMPTS):
+        try:
+            return _try_claim_shard(db, shard, worker)
+        except OperationalError:
+            # SQLite's busy timeout ran out while other workers were committing
+            db.rollback()
+            if attempt == BATCH_ATTEMPTS - 1:
+                raise
+
+
+def _try_claim_shard(db: Session, shard: int, worker: str) -> bool:
+    table = RecurringGenerationLease.__table__
+    if db.connection().execute(select(table.c.shard).where(table.c.shard == shard)).first() is None:
+        try:
+            db.connection().execute(insert(table).values(shard=shard))
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # another worker added the row first
+
+    now = datetime.utcnow()
+    claimed = db.connection().execute(
+        update(table).where(
+            table.c.shard == shard, or_(table.c.leased_until.is_(None), table.c.leased_until < now)
+        ).values(worker=worker, leased_until=now + timedelta(seconds=settings.RECURRING_GENERATION_LEASE_SECONDS))
+    ).rowcount
+    db.commit()
+    return claimed == 1
+
+
+def _renew_shard(db: Session, shard: int, worker: str) -> bool:
+    table = RecurringGenerationLease.__table__
+    return db.connection().execute(
+        update(table).where(table.c.shard == shard, table.c.worker == worker).values(
+            leased_until=datetime.utcnow() + timedelta(seconds=settings.RECURRING_GENERATION_LEASE_SECONDS)
+        )
+    ).rowcount == 1
+
+
+def _release_shard(db: Session, shard: int, worker: str) -> None:
+    table = RecurringGenerationLease.__table__
+    try:
+        db.connection().execute(
+            update(table).where(table.c.shard == shard, table.c.worker == worker).values(leased_until=None)
+        )
+        db.commit()
+    except OperationalError as e:
+        db.rollback()
+        logger.warning(f"Could not release recurring generation shard {shard}, its lease will expire: {e}")
+
+
+def _generate_batch(db: Session, templates: List[RecurringInvoice], today: date, result: dict) -> list:
+    """Generate one invoice per template; returns the (invoice, template) pairs to auto-send."""
+    to_send = []
+    generating = []
+    for template in templates:
+        # Templates past their end date or occurrence limit are retired without drawing a number
+        if template.end_date and today > template.end_date:
+            template.is_active = False
+        elif template.occurrences_limit and template.current_occurrence >= template.occurrences_limit:
+            template.is_active = False
+        else:
+            generating.append(template)
+
+    numbers = iter(next_invoice_numbers(db, len(generating)))
+    for template in generating:
+        try:
+            invoice = create_invoice_from_template(template, today, db, next(numbers))
+            result["generated"] += 1
+            if template.auto_send:
+                to_send.append((invoice, template))
+            logger.info(f"Generated recurring invoice {invoice.invoice_number} from template {template.template_name}")
+
+        except SQLAlchemyError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to generate invoice from template {template.template_name}: {str(e)}")
+            template.failed_generations += 1
+            result["failed"].append({
+                'template_id': template.id,
+                'template_name': template.template_name,
+                'error': str(e)
+            })
+    return to_send
+
+
+async def _generate_shard(db: Session, criteria: list, shard: Optional[int], worker: str,
+                          today: date, batch_size: int, leased: bool, result: dict) -> None:
+    failed_ids = set()
+    attempts = 0
+    while True:
+        query = db.query(RecurringInvoice).options(selectinload(RecurringInvoice.template_items)).filter(
+            *criteria
+        ).execution_options(**{SKIP_TENANT_SCOPE: True})
+        if failed_ids:
+            query = query.filter(RecurringInvoice.id.notin_(failed_ids))
+        query = query.order_by(RecurringInvoice.next_due_date, RecurringInvoice.id).limit(batch_size)
+        if not leased:
+            query = query.with_for_update(skip_locked=True, of=RecurringInvoice)
+        templates = query.all()
+        if not templates:
+            db.commit()  # end the transaction holding no locks
+            return
+
+        failures = len(result["failed"])
+        generated = result["generated"]
+        try:
+            if leased and not _renew_shard(db, shard, worker):
+                db.rollback()
+                logger.warning(f"Lost the lease on recurring generation shard {shard}")
+                return
+            to_send = _generate_batch(db, templates, today, result)
+            db.commit()
+        except OperationalError as e:
+            db.rollback()
+            del result["failed"][failures:]
+            result["generated"] = generated
+            attempts += 1
+            if attempts >= BATCH_ATTEMPTS:
+                raise
+            logger.warning(f"Retrying recurring generation batch after: {e}")
+            continue
+
+        attempts = 0
+        result["batches"] += 1
+        failed_ids.update(failure["template_id"] for failure in result["failed"][failures:])
+        for invoice, template in to_send:
+            await send_recurring_invoice_email(invoice, template, db)
+        if to_send:
+            db.commit()
+
+
+async def generate_due_invoices(
+    db: Session,
+    today: Optional[date] = None,
+    user_id: Optional[int] = None,
+    shard: Optional[int] = None,
+    shards: Optional[int] = None,
+    worker: Optional[str] = None,
+    batch_size: Optional[int] = None,
+) -> dict:
+    """
+    Generate invoices for due templates: ``user_id``'s, or every user's shard
+    by shard. Pass ``shard`` to work on that shard only.
+    """
+    today = today or date.today()
+    shards = shards or settings.RECURRING_GENERATION_SHARDS
+    worker = worker or default_worker_name()
+    batch_size = batch_size or settings.RECURRING_GENERATION_BATCH_SIZE
+    leased = user_id is None and not uses_row_locks(db)
+    started = time.perf_counter()
+    result = {"generated": 0, "failed": [], "batches": 0, "shards": 0, "shards_skipped": 0}
+
+    due = [RecurringInvoice.is_active == True, RecurringInvoice.next_due_date <= today]
+    if user_id is not None:
+        await _generate_shard(db, due + [RecurringInvoice.created_by == user_id], None, worker,
+                              today, batch_size, False, result)
+    else:
+        if shard is not None:
+            order = [shard % shards]
+        else:
+            # Workers start on different shards and meet as they walk the rest
+            offset = zlib.crc32(worker.encode()) % shards
+            order = [(offset + step) % shards for step in range(shards)]
+        for current in order:
+            if leased and not _claim_shard(db, current, worker):
+                result["shards_skipped"] += 1
+                continue
+            try:
+                await _generate_shard(db, due + [RecurringInvoice.id % shards == current], current, worker,
+                                      today, batch_size, leased, result)
+            finally:
+                if leased:
+                    db.rollback()
+                    _release_shard(db, current, worker)
+            result["shards"] += 1
+
+    return {
+        "as_of": today,
+        "worker": worker,
+        "generated": result["generated"],
+        "failed": len(result["failed"]),
+        "batches": result["batches"],
+        "shards": result["shards"],
+        "shards_skipped": result["shards_skipped"],
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "details": result["failed"],
+    }
+
+
+def _run_worker(worker: str, shard: Optional[int], shards: Optional[int], batch_size: Optional[int]) -> dict:
+    import app.models  # noqa: F401 - register every mapper before querying
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return asyncio.run(generate_due_invoices(db, shard=shard, shards=shards, worker=worker, batch_size=batch_size))
+    finally:
+        db.close()
+
+
+def create_generation_run(
+    db: Session, user: User, shard: Optional[int], shards: Optional[int]
+) -> RecurringGenerationRun:
+    run = RecurringGenerationRun(requested_by=user.id, shard=shard, shards=shards, status="pending")
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def run_generation(run_id: int) -> None:
+    """Background task body: generate due invoices as one worker and store the summary on ``run_id``."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        run = db.query(RecurringGenerationRun).filter(RecurringGenerationRun.id == run_id).first()
+        run.status = "running"
+        run.started_at = datetime.utcnow()
+        db.commit()
+
+        try:
+            summary = _run_worker(f"{default_worker_name()}/run-{run_id}", run.shard, run.shards, None)
+            run.as_of = summary["as_of"]
+            run.worker = summary["worker"]
+            run.generated = summary["generated"]
+            run.failed = summary["failed"]
+            run.batches = summary["batches"]
+            run.shards_done = summary["shards"]
+            run.shards_skipped = summary["shards_skipped"]
+            run.duration_ms = summary["duration_ms"]
+            run.details = json.dumps(summary["details"])
+            run.status = "completed"
+        except Exception as exc:
+            db.rollback()
+            logger.error(f"Recurring generation run {run_id} failed: {exc}")
+            run.status = "failed"
+            run.error_message = str(exc)[:1000]
+
+        run.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate invoices from every user's due recurring templates")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to run side by side")
+    parser.add_argument("--shard", type=int, default=None, help="work on this shard only")
+    parser.add_argument("--shards", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    names = [f"{default_worker_name()}/{index}" for index in range(args.workers)]
+    if args.workers == 1:
+        results = [_run_worker(names[0], args.shard, args.shards, args.batch_size)]
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(
+                _run_worker, names, [args.shard] * args.workers,
+                [args.shards] * args.workers, [args.batch_size] * args.workers,
+            ))
+
+    for result in results:
+        print(
+            f"{result['worker']}: {result['generated']} invoices generated, {result['failed']} failed, "
+            f"{result['shards']} shards ({result['shards_skipped']} leased elsewhere) in {result['duration_ms']} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
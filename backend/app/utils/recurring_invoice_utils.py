@@ -1,7 +1,46 @@
+"""
+Recurrence rules for recurring invoice templates.
+
+A template's schedule is anchored on its start_date, which is not itself an
+occurrence. Occurrence k (counting from 1) is computed from the anchor in
+closed form rather than by stepping from the previous date:
+
+  * daily: start_date + k * interval days
+  * weekly: the first day_of_week after start_date, then every interval weeks
+  * monthly, quarterly, yearly: k * interval months (3 or 12 months) after
+    start_date's month, on day_of_month (monthly) or start_date's day,
+    clamped to the length of the month
+
+Computing from the anchor keeps month-end schedules on their day: a schedule
+anchored on the 31st falls on Feb 28 and then on Mar 31, where stepping from
+Feb 28 would stay on the 28th. expand_schedule() turns one schedule into a
+list of dates in one call, and expand_schedules() expands many templates at
+once with numpy datetime64 arithmetic when numpy is installed.
+"""
 from datetime import datetime, date, timedelta
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 import calendar
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Invoices generated from templates: tax rate and days until due
+GENERATED_INVOICE_TAX_RATE = 18.0
+GENERATED_INVOICE_TERMS_DAYS = 30
+
+# date.toordinal() of 1970-01-01, the epoch of numpy datetime64 values
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Months per interval unit of the month-based frequencies
+MONTH_STEPS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+def _add_months(current_date: date, months: int, day: int) -> date:
+    """``day`` of the month ``months`` after current_date's, clamped to that month's last day."""
+    year, month = divmod(current_date.year * 12 + current_date.month - 1 + months, 12)
+    return date(year, month + 1, min(day, calendar.monthrange(year, month + 1)[1]))
+
 def calculate_next_date(
     current_date: date,
     frequency: str,
@@ -11,6 +50,10 @@ def calculate_next_date(
 ) -> date:
     """
     Calculate the next due date based on recurrence rules.
+
+    This is a single step from ``current_date``. A day clamped to a short
+    month stays clamped on the following steps, so dates of a template's
+    schedule come from occurrence_date() and expand_schedule() instead.
     
     Args:
         current_date: The current/starting date
@@ -42,67 +85,13 @@ def calculate_next_date(
         return next_date + timedelta(weeks=interval_value - 1)
     
     elif frequency == "monthly":
-        if day_of_month is None:
-            # Default to same day as current_date
-            day_of_month = current_date.day
-        
-        # Handle month overflow (e.g., Jan 31 -> Feb 28/29)
-        try:
-            # Get target month and year
-            if current_date.month == 12:
-                target_month = 1
-                target_year = current_date.year + 1
-            else:
-                target_month = current_date.month + 1
-                target_year = current_date.year
-            
-            # Use min to handle day overflow (Jan 31 -> Feb 28)
-            days_in_target_month = calendar.monthrange(target_year, target_month)[1]
-            target_day = min(day_of_month, days_in_target_month)
-            
-            next_date = date(target_year, target_month, target_day)
-            return next_date + timedelta(days=interval_value * 30)  # Approximate month addition
-        
-        except ValueError:
-            # Fallback for invalid dates (e.g., Feb 30)
-            # Use the last day of the month
-            if current_date.month == 12:
-                target_month = 1
-                target_year = current_date.year + 1
-            else:
-                target_month = current_date.month + 1
-                target_year = current_date.year
-            
-            days_in_target_month = calendar.monthrange(target_year, target_month)[1]
-            next_date = date(target_year, target_month, days_in_target_month)
-            return next_date + timedelta(days=interval_value * 30)
+        # Jan 31 -> Feb 28/29
+        day = day_of_month if day_of_month is not None else current_date.day
+        return _add_months(current_date, interval_value, day)
     
-    elif frequency == "quarterly":
-        # Every 3 months
-        month_increment = 3 * interval_value
-        new_month = current_date.month + month_increment
-        new_year = current_date.year
-        
-        while new_month > 12:
-            new_month -= 12
-            new_year += 1
-        
-        # Handle day overflow
-        days_in_target_month = calendar.monthrange(new_year, new_month)[1]
-        target_day = min(current_date.day, days_in_target_month)
-        
-        return date(new_year, new_month, target_day)
-    
-    elif frequency == "yearly":
-        # Same date next year, handling leap years
-        target_year = current_date.year + interval_value
-        
-        # Handle Feb 29 -> Feb 28 in non-leap years
-        if current_date.month == 2 and current_date.day == 29:
-            if not is_leap_year(target_year):
-                return date(target_year, 2, 28)
-        
-        return date(target_year, current_date.month, current_date.day)
+    elif frequency in MONTH_STEPS:
+        # Feb 29 -> Feb 28 in non-leap years
+        return _add_months(current_date, MONTH_STEPS[frequency] * interval_value, current_date.day)
     
     else:
         raise ValueError(f"Unsupported frequency: {frequency}")
@@ -111,6 +100,166 @@ def is_leap_year(year: int) -> bool:
     """Check if a year is a leap year."""
     return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
 
+def _first_weekly(start_date: date, day_of_week: Optional[int]) -> date:
+    """The first day_of_week after start_date (a week later when start_date is one)."""
+    target = start_date.weekday() if day_of_week is None else day_of_week
+    return start_date + timedelta(days=(target - start_date.weekday() - 1) % 7 + 1)
+
+def occurrence_date(
+    start_date: date,
+    frequency: str,
+    interval_value: int,
+    day_of_week: Optional[int],
+    day_of_month: Optional[int],
+    occurrence: int
+) -> date:
+    """Date of occurrence number ``occurrence`` (from 1) of the schedule anchored on start_date."""
+    interval_value = max(interval_value or 1, 1)
+
+    if frequency == "daily":
+        return start_date + timedelta(days=occurrence * interval_value)
+
+    if frequency == "weekly":
+        return _first_weekly(start_date, day_of_week) + timedelta(weeks=occurrence * interval_value - 1)
+
+    if frequency in MONTH_STEPS:
+        day = day_of_month if frequency == "monthly" and day_of_month is not None else start_date.day
+        return _add_months(start_date, occurrence * interval_value * MONTH_STEPS[frequency], day)
+
+    raise ValueError(f"Unsupported frequency: {frequency}")
+
+def occurrence_index(
+    start_date: date,
+    frequency: str,
+    interval_value: int,
+    day_of_week: Optional[int],
+    day_of_month: Optional[int],
+    on_or_after: date
+) -> int:
+    """Number of the first occurrence falling on or after ``on_or_after``."""
+    interval_value = max(interval_value or 1, 1)
+
+    # Estimate from the distance to the anchor; it is at most one occurrence short
+    if frequency == "daily":
+        estimate = (on_or_after - start_date).days // interval_value
+    elif frequency == "weekly":
+        estimate = ((on_or_after - _first_weekly(start_date, day_of_week)).days + 7) // (7 * interval_value)
+    elif frequency in MONTH_STEPS:
+        months = (on_or_after.year - start_date.year) * 12 + on_or_after.month - start_date.month
+        estimate = months // (interval_value * MONTH_STEPS[frequency])
+    else:
+        raise ValueError(f"Unsupported frequency: {frequency}")
+
+    index = max(estimate, 1)
+    if occurrence_date(start_date, frequency, interval_value, day_of_week, day_of_month, index) < on_or_after:
+        index += 1
+    return index
+
+def next_occurrence_after(
+    start_date: date,
+    frequency: str,
+    interval_value: int,
+    day_of_week: Optional[int],
+    day_of_month: Optional[int],
+    after: date
+) -> date:
+    """The schedule's first occurrence strictly after ``after``."""
+    index = occurrence_index(
+        start_date, frequency, interval_value, day_of_week, day_of_month, after + timedelta(days=1)
+    )
+    return occurrence_date(start_date, frequency, interval_value, day_of_week, day_of_month, index)
+
+def _clamp_to_month(months, days):
+    """Dates on ``days`` of ``months`` (datetime64[M]), clamped to each month's last day."""
+    first = months.astype("datetime64[D]")
+    days_in_month = ((months + 1).astype("datetime64[D]") - first).astype(np.int64)
+    return first + (np.minimum(days, days_in_month) - 1)
+
+def _first_weekly_array(starts, day_of_week):
+    weekday = (starts.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    target = np.where(day_of_week >= 0, day_of_week, weekday)
+    return starts + ((target - weekday - 1) % 7 + 1)
+
+def _occurrence_array(starts, frequency: str, interval_value, day_of_week, day_of_month, occurrence):
+    """occurrence_date over arrays: datetime64[D] anchors, -1 for a missing day of week/month."""
+    if frequency == "daily":
+        return starts + occurrence * interval_value
+
+    if frequency == "weekly":
+        return _first_weekly_array(starts, day_of_week) + 7 * (occurrence * interval_value - 1)
+
+    if frequency not in MONTH_STEPS:
+        raise ValueError(f"Unsupported frequency: {frequency}")
+    months = starts.astype("datetime64[M]")
+    day = (starts - months.astype("datetime64[D]")).astype(np.int64) + 1
+    if frequency == "monthly":
+        day = np.where(day_of_month >= 0, day_of_month, day)
+    return _clamp_to_month(months + occurrence * interval_value * MONTH_STEPS[frequency], day)
+
+def _occurrence_index_array(starts, frequency: str, interval_value, day_of_week, day_of_month, on_or_after):
+    """occurrence_index over arrays."""
+    if frequency == "daily":
+        estimate = (on_or_after - starts).astype(np.int64) // interval_value
+    elif frequency == "weekly":
+        estimate = ((on_or_after - _first_weekly_array(starts, day_of_week)).astype(np.int64) + 7) // (7 * interval_value)
+    elif frequency in MONTH_STEPS:
+        months = (on_or_after.astype("datetime64[M]") - starts.astype("datetime64[M]")).astype(np.int64)
+        estimate = months // (interval_value * MONTH_STEPS[frequency])
+    else:
+        raise ValueError(f"Unsupported frequency: {frequency}")
+
+    index = np.maximum(estimate, 1)
+    return index + (_occurrence_array(starts, frequency, interval_value, day_of_week, day_of_month, index) < on_or_after)
+
+def _date_array(dates: Sequence[date]):
+    # Much faster than letting numpy convert date objects
+    ordinals = np.fromiter(map(date.toordinal, dates), dtype=np.int64, count=len(dates))
+    return (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+
+def _int_array(values: Sequence[Optional[int]], missing: int):
+    values = np.array(values, dtype=float)  # None becomes NaN
+    return np.where(np.isnan(values), missing, values).astype(np.int64)
+
+def expand_schedule(
+    start_date: date,
+    frequency: str,
+    interval_value: int = 1,
+    day_of_week: Optional[int] = None,
+    day_of_month: Optional[int] = None,
+    count: int = 5,
+    end_date: Optional[date] = None,
+    max_occurrences: Optional[int] = None,
+    from_date: Optional[date] = None
+) -> List[date]:
+    """
+    Up to ``count`` occurrences of a schedule, starting with the first on or
+    after ``from_date`` (the first occurrence by default). Dates after
+    ``end_date`` and occurrences past number ``max_occurrences`` are left out.
+    """
+    interval_value = max(interval_value or 1, 1)
+    first = 1
+    if from_date is not None:
+        first = occurrence_index(start_date, frequency, interval_value, day_of_week, day_of_month, from_date)
+    last = first + count - 1
+    if max_occurrences:
+        last = min(last, max_occurrences)
+    if last < first:
+        return []
+
+    if np is None:
+        dates = [
+            occurrence_date(start_date, frequency, interval_value, day_of_week, day_of_month, occurrence)
+            for occurrence in range(first, last + 1)
+        ]
+    else:
+        days = _occurrence_array(
+            _date_array([start_date]), frequency, interval_value,
+            -1 if day_of_week is None else day_of_week, -1 if day_of_month is None else day_of_month,
+            np.arange(first, last + 1),
+        )
+        dates = list(map(date.fromordinal, (days.astype(np.int64) + EPOCH_ORDINAL).tolist()))
+    return [due for due in dates if end_date is None or due <= end_date]
+
 def calculate_next_dates(
     start_date: date,
     frequency: str,
@@ -137,25 +286,91 @@ def calculate_next_dates(
     Returns:
         List of calculated dates
     """
-    dates = []
-    current_date = start_date
-    
-    for i in range(count):
-        next_date = calculate_next_date(
-            current_date, frequency, interval_value, day_of_week, day_of_month
-        )
-        
-        # Check constraints
-        if end_date and next_date > end_date:
-            break
-        
-        if max_occurrences and i + 1 >= max_occurrences:
-            break
-        
-        dates.append(next_date)
-        current_date = next_date
-    
-    return dates
+    return expand_schedule(
+        start_date, frequency, interval_value, day_of_week, day_of_month, count, end_date, max_occurrences
+    )
+
+def expand_schedules(
+    start_dates: Sequence[date],
+    frequencies: Sequence[str],
+    interval_values: Sequence[int],
+    days_of_week: Sequence[Optional[int]],
+    days_of_month: Sequence[Optional[int]],
+    until: date,
+    from_dates: Optional[Sequence[Optional[date]]] = None,
+    end_dates: Optional[Sequence[Optional[date]]] = None,
+    remaining: Optional[Sequence[Optional[int]]] = None
+) -> Tuple[Sequence[int], Sequence[int]]:
+    """
+    Every occurrence of many schedules up to ``until``, as parallel sequences of
+    schedule index and date ordinal (date.toordinal()).
+
+    Schedule ``i`` is anchored on ``start_dates[i]``. Its occurrences run from
+    the first on or after ``from_dates[i]`` (a template's next_due_date) to
+    ``end_dates[i]``, and stop after ``remaining[i]`` of them. With numpy the
+    first and last occurrence number of every schedule are found in closed
+    form, and all dates of one frequency are computed in a single array pass.
+    """
+    size = len(start_dates)
+    from_dates = from_dates if from_dates is not None else [None] * size
+    end_dates = end_dates if end_dates is not None else [None] * size
+    remaining = remaining if remaining is not None else [None] * size
+    limits = [min(until, end) if end else until for end in end_dates]
+
+    if np is None:
+        indexes: List[int] = []
+        ordinals: List[int] = []
+        for index in range(size):
+            rule = (start_dates[index], frequencies[index], interval_values[index],
+                    days_of_week[index], days_of_month[index])
+            first = occurrence_index(*rule, from_dates[index]) if from_dates[index] else 1
+            last = occurrence_index(*rule, limits[index] + timedelta(days=1)) - 1
+            if remaining[index] is not None:
+                last = min(last, first + remaining[index] - 1)
+            for occurrence in range(first, last + 1):
+                indexes.append(index)
+                ordinals.append(occurrence_date(*rule, occurrence).toordinal())
+        return indexes, ordinals
+
+    starts = _date_array(start_dates)
+    frequency_array = np.array(frequencies, dtype=object)
+    columns = {
+        "index": np.arange(size),
+        "start": starts,
+        "from": np.where(
+            np.array([value is None for value in from_dates], dtype=bool),
+            starts + 1, _date_array([value or until for value in from_dates]),
+        ),
+        "limit": _date_array(limits),
+        "left": _int_array(remaining, 10**9),
+        "interval": np.maximum(_int_array(interval_values, 1), 1),
+        "dow": _int_array(days_of_week, -1),
+        "dom": _int_array(days_of_month, -1),
+    }
+
+    index_chunks, date_chunks = [], []
+    for frequency in set(frequencies):
+        group = {name: values[frequency_array == frequency] for name, values in columns.items()}
+        rule = (group["start"], frequency, group["interval"], group["dow"], group["dom"])
+        first = _occurrence_index_array(*rule, group["from"])
+        last = np.minimum(_occurrence_index_array(*rule, group["limit"] + 1) - 1, first + group["left"] - 1)
+        counts = np.maximum(last - first + 1, 0)
+        total = int(counts.sum())
+        if not total:
+            continue
+
+        # Occurrence numbers first[i]..last[i] of every schedule, laid end to end
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        occurrences = np.repeat(first, counts) + (np.arange(total) - offsets)
+        index_chunks.append(np.repeat(group["index"], counts))
+        date_chunks.append(_occurrence_array(
+            np.repeat(group["start"], counts), frequency, np.repeat(group["interval"], counts),
+            np.repeat(group["dow"], counts), np.repeat(group["dom"], counts), occurrences,
+        ))
+
+    if not index_chunks:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(index_chunks), np.concatenate(date_chunks).astype(np.int64) + EPOCH_ORDINAL
 
 def validate_recurrence_config(
     frequency: str,
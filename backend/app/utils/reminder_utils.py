@@ -6,23 +6,27 @@ from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.utils.mail import send_email
+from app.utils.invoice_pdf import invoice_pdf_attachment
 from app.models.invoice import Invoice
 from app.models.reminder import ReminderSetting, ReminderHistory
+from app.utils.tenancy import scope_session_to_user
 
-def get_invoices_due_or_overdue(db: Session) -> List[Invoice]:
-    """Fetches invoices that are due today or overdue, and unpaid."""
+def get_invoices_due_or_overdue(db: Session, user_id: int) -> List[Invoice]:
+    """Fetches a user's invoices that are due today or overdue, and unpaid."""
     today = date.today()
     invoices = db.query(Invoice).filter(
+        Invoice.created_by == user_id,
         Invoice.due_date <= today,
         Invoice.payment_status != "paid"
     ).all()
     return invoices
 
-def get_invoices_due_soon(db: Session, days_before: int) -> List[Invoice]:
-    """Fetches invoices due within a specified number of days, and unpaid."""
+def get_invoices_due_soon(db: Session, days_before: int, user_id: int) -> List[Invoice]:
+    """Fetches a user's invoices due within a specified number of days, and unpaid."""
     today = date.today()
     due_date_threshold = today + timedelta(days=days_before)
     invoices = db.query(Invoice).filter(
+        Invoice.created_by == user_id,
         Invoice.due_date > today,
         Invoice.due_date <= due_date_threshold,
         Invoice.payment_status != "paid"
@@ -64,7 +68,8 @@ async def send_reminder_email(db: Session, invoice: Invoice, reminder_type: str,
     await send_email(
         subject=subject,
         recipients=[recipient_email],
-        invoice_data=invoice_data
+        invoice_data=invoice_data,
+        attachment=await invoice_pdf_attachment(db, invoice)
     )
     create_reminder_history_entry(db, invoice, reminder_type, subject, template_body)
 
@@ -82,13 +87,17 @@ async def check_and_send_reminders(db: Session):
         if not settings:
             continue
 
+        # The session arrives scoped to the admin who triggered the run; each user's
+        # settings apply to that user's invoices, clients and templates only
+        scope_session_to_user(db, user.id)
+
         # Convert JSON strings to Python lists
         remind_before_due_days = json.loads(settings.remind_before_due) if settings.remind_before_due else []
         remind_after_due_days = json.loads(settings.remind_after_due) if settings.remind_after_due else []
 
         # Reminders before due date
         for days_before in remind_before_due_days:
-            invoices = get_invoices_due_soon(db, days_before)
+            invoices = get_invoices_due_soon(db, days_before, user.id)
             for invoice in invoices:
                 # Check if a reminder of this type was already sent for this invoice today
                 # This needs a more robust check in a real app, e.g., by checking reminder_history
@@ -106,7 +115,7 @@ async def check_and_send_reminders(db: Session):
 
         # Reminder on due date
         if settings.remind_on_due:
-            invoices = get_invoices_due_or_overdue(db) # This will get invoices due today
+            invoices = get_invoices_due_or_overdue(db, user.id) # This will get invoices due today
             for invoice in invoices:
                 if invoice.due_date == date.today():
                     today = date.today()
@@ -125,6 +134,7 @@ async def check_and_send_reminders(db: Session):
             today = date.today()
             overdue_date_threshold = today - timedelta(days=days_overdue)
             invoices = db.query(Invoice).filter(
+                Invoice.created_by == user.id,
                 Invoice.due_date < today,
                 Invoice.due_date == overdue_date_threshold, # Only send for invoices that became overdue by 'days_overdue' today
                 Invoice.payment_status != "paid"
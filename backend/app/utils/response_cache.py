@@ -0,0 +1,224 @@
+"""
+Per-tenant response caching for read-mostly GET endpoints.
+
+Each user (tenant) has a data version that is bumped whenever a transaction
+that touched their invoices, payments, expenses, clients or templates
+commits. Routers opt in with ``APIRouter(route_class=CachedRoute)``; for an
+authenticated GET the route then
+
+  * derives a strong ETag from (path, query string, user, data version, date)
+    and answers ``If-None-Match`` with 304 without running the endpoint, and
+  * serves the serialized body from an in-process LRU keyed the same way.
+
+The user comes from the bearer token's signature. Before a 304 or a cached
+body is served, a primary-key lookup checks that the user still exists.
+Otherwise the endpoint runs, and its auth dependency rejects the request.
+
+Versions live in process memory, which matches the single uvicorn worker in
+the Procfile. Writes that bypass the ORM session (raw SQL, other processes)
+are not seen; disable with RESPONSE_CACHE_ENABLED=false in that case.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import event, inspect
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.client import Client
+from app.models.expense import Expense
+from app.models.expense_category import ExpenseCategory
+from app.models.invoice import Invoice, InvoiceItem
+from app.models.invoice_template import InvoiceTemplate, UserTemplateDefault
+from app.models.payment import Payment
+from app.models.recurring_invoice import RecurringInvoice
+from app.models.user import User
+from app.utils.auth import verify_token
+from app.utils.tenancy import get_session_tenant
+
+WATCHED_MODELS = (
+    Invoice, InvoiceItem, Payment, Expense, ExpenseCategory, Client,
+    InvoiceTemplate, UserTemplateDefault, RecurringInvoice, User,
+)
+
+_PENDING_KEY = "response_cache_dirty_tenants"
+_ALL_TENANTS = object()
+
+
+class DataVersions:
+    """Thread-safe per-tenant write counters plus a global epoch."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._versions: Dict[int, int] = {}
+
+    def get(self, tenant_id: int) -> Tuple[int, int]:
+        with self._lock:
+            return self._epoch, self._versions.get(tenant_id, 0)
+
+    def bump(self, tenant_id: int) -> None:
+        with self._lock:
+            self._versions[tenant_id] = self._versions.get(tenant_id, 0) + 1
+
+    def bump_all(self) -> None:
+        with self._lock:
+            self._epoch += 1
+
+
+class ResponseCache:
+    """Bounded LRU of serialized responses."""
+
+    def __init__(self, max_entries: int):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[str]]]" = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, body: bytes, media_type: Optional[str]) -> None:
+        with self._lock:
+            self._entries[key] = (body, media_type)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+data_versions = DataVersions()
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def _loaded(obj, attr: str):
+    """Return an already-loaded attribute value without triggering SQL."""
+    return inspect(obj).dict.get(attr)
+
+
+def _tenant_of(obj):
+    if isinstance(obj, User):
+        return _loaded(obj, "id")
+    if isinstance(obj, (InvoiceItem, Payment)):
+        invoice = _loaded(obj, "invoice")
+        return _loaded(invoice, "created_by") if invoice is not None else None
+    if isinstance(obj, (InvoiceTemplate, UserTemplateDefault)):
+        return _loaded(obj, "user_id")
+    return _loaded(obj, "created_by")
+
+
+def mark_tenant_dirty(session, tenant_id) -> None:
+    """Bump ``tenant_id``'s data version when ``session`` commits; also for writes made outside the ORM."""
+    session.info.setdefault(_PENDING_KEY, set()).add(
+        tenant_id if tenant_id is not None else _ALL_TENANTS
+    )
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_dirty_tenants(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, WATCHED_MODELS):
+            mark_tenant_dirty(session, _tenant_of(obj) or get_session_tenant(session))
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _collect_bulk_writes(execute_state):
+    if execute_state.is_update or execute_state.is_delete or execute_state.is_insert:
+        mark_tenant_dirty(execute_state.session, get_session_tenant(execute_state.session))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_versions(session):
+    for tenant_id in session.info.pop(_PENDING_KEY, ()):
+        if tenant_id is _ALL_TENANTS:
+            data_versions.bump_all()
+        else:
+            data_versions.bump(tenant_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _request_user_id(request: Request) -> Optional[int]:
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = verify_token(token)
+    return payload.get("user_id") if payload else None
+
+
+def _user_exists(user_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(User.id).filter(User.id == user_id).first() is not None
+    finally:
+        db.close()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+class CachedRoute(APIRoute):
+    """APIRoute that adds ETag revalidation and LRU caching to authenticated GETs."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET" or not settings.RESPONSE_CACHE_ENABLED:
+                return await handler(request)
+
+            user_id = _request_user_id(request)
+            if user_id is None:
+                return await handler(request)
+
+            # Read the version before running the endpoint so that a write racing with it
+            # leaves this result under the old (never again requested) version.
+            epoch, version = data_versions.get(user_id)
+            key = f"{request.url.path}?{request.url.query}|{user_id}|{epoch}.{version}|{date.today()}"
+            etag = '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+            not_modified = _etag_matches(request.headers.get("if-none-match"), etag)
+            cached = None if not_modified else response_cache.get(key)
+            # A valid signature is not a live account; a deleted user falls through to the endpoint's 401
+            if (not_modified or cached is not None) and await run_in_threadpool(_user_exists, user_id):
+                if not_modified:
+                    return Response(status_code=304, headers=headers)
+                body, media_type = cached
+                return Response(content=body, media_type=media_type, headers=headers)
+
+            response = await handler(request)
+            if response.status_code == 200 and hasattr(response, "body"):
+                response_cache.set(key, response.body, response.media_type)
+                response.headers.update(headers)
+            return response
+
+        return cached_handler
@@ -0,0 +1,191 @@
+"""
+Recompute exchange_rate and base_currency_amount for all of a user's
+invoices and expenses, after the base currency changes or rates in
+exchange_rates are corrected.
+
+Rows are processed in id ranges of REVALUATION_BATCH_SIZE. Each range gets
+set-based UPDATEs whose rate is a correlated lookup into exchange_rates: the
+latest rate on or before the row's date (issue date for invoices), else the
+currency's first rate. These are the same rules as app.utils.exchange_rates.
+Only rows whose values change are written, and their updated_at moves. Each
+batch commits together with the job's checkpoint (phase and last id), so a
+failed or interrupted job resumes where it stopped.
+
+The UPDATEs bypass the ORM, so the job also rebuilds what the session hooks
+would have maintained. Each batch writes change-log entries for its changed
+rows. The final phase invalidates the tenant's cached dashboards and reports
+and tells the user's live streams to resync.
+"""
+import threading
+from datetime import datetime
+from typing import Optional, Set
+
+from sqlalchemy import and_, case, func, literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.exchange_rate import ExchangeRate
+from app.models.expense import Expense
+from app.models.invoice import Invoice
+from app.models.revaluation_job import RevaluationJob
+from app.models.user import User
+from app.utils.change_log import record_bulk_changes
+from app.utils.events import event_bus, user_channel
+from app.utils.response_cache import mark_tenant_dirty
+
+# phase -> (model, date column, amount column); phases run in this order, then "aggregates"
+TARGETS = {
+    "invoices": (Invoice, "issue_date", "total_amount"),
+    "expenses": (Expense, "date", "amount"),
+}
+PHASES = list(TARGETS) + ["aggregates", "done"]
+
+_active_jobs: Set[int] = set()
+_active_lock = threading.Lock()
+
+
+def _quote(currency, day):
+    """Units of ``currency`` per reference-currency unit on ``day``; NULL when unknown."""
+    rates = ExchangeRate.__table__
+    on_or_before = select(rates.c.rate).where(
+        rates.c.currency == currency, rates.c.date <= day
+    ).order_by(rates.c.date.desc()).limit(1).scalar_subquery()
+    first = select(rates.c.rate).where(rates.c.currency == currency).order_by(rates.c.date).limit(1).scalar_subquery()
+    return case(
+        (currency == settings.EXCHANGE_RATE_REFERENCE_CURRENCY.upper(), literal(1.0)),
+        else_=func.coalesce(on_or_before, first),
+    )
+
+
+def rate_expression(currency_column, date_column, base_currency: str):
+    """SQL expression for the rate converting ``currency_column`` into ``base_currency`` on ``date_column``."""
+    currency = func.upper(currency_column)
+    base = literal(base_currency.upper())
+    return case(
+        (or_(currency_column.is_(None), currency == base), literal(1.0)),
+        else_=func.coalesce(
+            _quote(base, date_column) / _quote(currency, date_column),
+            literal(settings.EXCHANGE_RATE_FALLBACK),
+        ),
+    )
+
+
+def _revalue_batch(connection, job: RevaluationJob) -> Optional[tuple]:
+    """Revalue the next id range of the current phase; (last id, rows, changed rows) or None when done."""
+    model, date_name, amount_name = TARGETS[job.phase]
+    table = model.__table__
+    tenant = table.c.created_by == job.user_id
+
+    batch = select(table.c.id).where(
+        tenant, table.c.id > job.checkpoint_id
+    ).order_by(table.c.id).limit(settings.REVALUATION_BATCH_SIZE).subquery()
+    last_id, rows = connection.execute(select(func.max(batch.c.id), func.count()).select_from(batch)).one()
+    if last_id is None:
+        return None
+
+    in_range = and_(tenant, table.c.id > job.checkpoint_id, table.c.id <= last_id)
+    now = datetime.utcnow()
+
+    rate = rate_expression(table.c.currency, table.c[date_name], job.base_currency)
+    connection.execute(
+        update(table).where(
+            in_range, or_(table.c.exchange_rate.is_(None), table.c.exchange_rate != rate)
+        ).values(exchange_rate=rate, updated_at=now)
+    )
+    converted = table.c[amount_name] * table.c.exchange_rate
+    connection.execute(
+        update(table).where(
+            in_range, or_(table.c.base_currency_amount.is_(None), table.c.base_currency_amount != converted)
+        ).values(base_currency_amount=converted, updated_at=now)
+    )
+
+    changed = [row_id for (row_id,) in connection.execute(
+        select(table.c.id).where(in_range, table.c.updated_at == now)
+    )]
+    record_bulk_changes(connection, model, changed)
+    return last_id, rows, len(changed)
+
+
+def _rebuild_aggregates(db: Session, user_id: int) -> None:
+    mark_tenant_dirty(db, user_id)
+    db.commit()
+    event_bus.publish(user_channel(user_id), "resync", {})
+
+
+def create_revaluation_job(db: Session, user: User, base_currency: Optional[str] = None) -> RevaluationJob:
+    """Switch ``user`` to ``base_currency`` (if given) and queue a revaluation to the user's base currency."""
+    if base_currency:
+        user.base_currency = base_currency.upper()
+
+    job = RevaluationJob(
+        user_id=user.id,
+        base_currency=user.base_currency or "INR",
+        status="pending",
+        phase=PHASES[0],
+        checkpoint_id=0,
+        invoices_total=db.query(func.count(Invoice.id)).filter(Invoice.created_by == user.id).scalar(),
+        expenses_total=db.query(func.count(Expense.id)).filter(Expense.created_by == user.id).scalar(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    claim_job(job.id)
+    return job
+
+
+def claim_job(job_id: int) -> bool:
+    """Mark ``job_id`` as running in this process; False if it already is."""
+    with _active_lock:
+        if job_id in _active_jobs:
+            return False
+        _active_jobs.add(job_id)
+        return True
+
+
+def is_active(job_id: int) -> bool:
+    with _active_lock:
+        return job_id in _active_jobs
+
+
+def run_revaluation(job_id: int) -> None:
+    """Background task body: run (or resume) ``job_id`` from its checkpoint to completion."""
+    db = SessionLocal()
+    try:
+        job = db.query(RevaluationJob).filter(RevaluationJob.id == job_id).first()
+        job.status = "running"
+        job.started_at = job.started_at or datetime.utcnow()
+        job.finished_at = None
+        job.error_message = None
+        db.commit()
+
+        try:
+            connection = db.connection()
+            while job.phase in TARGETS:
+                result = _revalue_batch(connection, job)
+                if result is None:
+                    job.phase = PHASES[PHASES.index(job.phase) + 1]
+                    job.checkpoint_id = 0
+                else:
+                    last_id, rows, changed = result
+                    job.checkpoint_id = last_id
+                    setattr(job, f"{job.phase}_processed", (getattr(job, f"{job.phase}_processed") or 0) + rows)
+                    setattr(job, f"{job.phase}_changed", (getattr(job, f"{job.phase}_changed") or 0) + changed)
+                db.commit()
+                connection = db.connection()
+
+            if job.phase == "aggregates":
+                _rebuild_aggregates(db, job.user_id)
+                job.phase = "done"
+            job.status = "completed"
+        except Exception as exc:
+            db.rollback()
+            job.status = "failed"
+            job.error_message = str(exc)[:1000]
+
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+        with _active_lock:
+            _active_jobs.discard(job_id)
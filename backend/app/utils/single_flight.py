@@ -0,0 +1,128 @@
+"""
+Single-flight coalescing for expensive read computations.
+
+When several requests for the same key (typically tenant + parameters) arrive
+while one computation is already running, they await that computation's
+result instead of starting their own. The computation itself is a blocking
+function run in the threadpool, so concurrent requests really do overlap and
+the event loop stays responsive. Results should be plain JSON-able data since
+they are handed to every waiting request.
+
+The computation runs as a task of its own and stays in flight until it
+finishes. Each caller, including the one that started it, waits on it with
+its own timeout. A caller that times out answers 504 and one that is
+cancelled (say, by a client disconnect) just stops waiting. Neither affects
+the other callers, and requests for the key keep joining the running
+computation rather than starting a second one.
+
+A computation that queries the database uses run_in_session(), which gives it
+a session of its own, because it may outlive the request that started it.
+The computation closes its own session when it finishes.
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.utils.tenancy import scope_session_to_user
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key onto one in-flight computation."""
+
+    def __init__(self, name: str, timeout: Optional[float] = None):
+        self.name = name
+        self.timeout = timeout
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    async def run(self, key: Hashable, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """Return ``func(*args)``, sharing the result with concurrent callers using ``key``."""
+        timeout = timeout if timeout is not None else self.timeout
+        self.calls += 1
+
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            task = None  # Started by a background run on an event loop of its own; can't be awaited here
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(run_in_threadpool(func, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # Shielded, so a caller that is cancelled or times out leaves the computation to the others
+        return await self._wait(asyncio.shield(task), timeout)
+
+    def _finished(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        # Retrieving the exception also keeps asyncio from warning when nobody is left waiting
+        error = task.exception()
+        if error is not None and not isinstance(error, HTTPException):
+            self.errors += 1
+
+    async def run_in_session(
+        self, key: Hashable, user_id: int, func: Callable[..., Any], *args, timeout: Optional[float] = None
+    ) -> Any:
+        """Like run(), with ``func(db, *args)`` given its own session scoped to ``user_id``."""
+        return await self.run(key, _call_in_session, user_id, func, *args, timeout=timeout)
+
+    async def _wait(self, awaitable, timeout: Optional[float]):
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"Single-flight group '{self.name}' timed out after {timeout}s")
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Report computation timed out"
+            )
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesce_ratio": self.coalesced / self.calls if self.calls else 0.0,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+        }
+
+
+def _call_in_session(user_id: int, func: Callable[..., Any], *args) -> Any:
+    db = SessionLocal()
+    scope_session_to_user(db, user_id)
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str, timeout: Optional[float] = None) -> SingleFlight:
+    """Return the process-wide group called ``name``, creating it on first use."""
+    group = _groups.get(name)
+    if group is None:
+        group = _groups.setdefault(name, SingleFlight(name, timeout or settings.SINGLE_FLIGHT_TIMEOUT_SECONDS))
+    return group
+
+
+def single_flight_stats() -> list:
+    return [group.stats() for group in _groups.values()]
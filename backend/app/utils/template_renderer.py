@@ -1,113 +1,216 @@
+"""
+Invoice design templates as render configuration.
+
+A template's config (colors, branding, typography, layout, field visibility)
+is built once per template version and memoized in a bounded LRU keyed by
+(template id, updated_at). Template edits move updated_at, so a stale config
+is never served, and invoices without a template share DEFAULT_TEMPLATE_CONFIG.
+Cached configs are shared between callers and must not be mutated;
+TemplateRenderer.get_template_config() hands out a copy.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
 from sqlalchemy.orm import Session
-from typing import Optional
+
+from app.config import settings
+from app.models.invoice import Invoice
 from app.models.invoice_template import InvoiceTemplate
 
+DEFAULT_TEMPLATE_CONFIG = {
+    # Colors - Modern blue theme
+    'primary_color': "#2563eb",
+    'secondary_color': "#6b7280", 
+    'accent_color': "#10b981",
+    'text_color': "#111827",
+    'background_color': "#ffffff",
+    
+    # Company branding
+    'company_name': "Webby Wonder",
+    'company_address': "Mumbai, India",
+    'company_phone': None,
+    'company_email': None,
+    'company_logo_url': None,
+    
+    # Typography
+    'font_family': "helvetica",
+    'font_size_base': 10,
+    'font_size_header': 16,
+    'font_size_title': 24,
+    
+    # Layout
+    'header_style': "modern",
+    'item_table_style': "modern",
+    'totals_layout': "right",
+    'layout_columns': "single",
+    
+    # Field visibility - show all by default
+    'show_invoice_number': True,
+    'show_issue_date': True,
+    'show_due_date': True,
+    'show_notes': True,
+    'show_terms': True,
+    'show_company_logo': True,
+    'show_company_details': True,
+    'show_client_details': True,
+    'show_line_items': True,
+    'show_subtotal': True,
+    'show_tax': True,
+    'show_discount': True,
+    'show_total': True,
+    'show_paid_amount': True,
+    'show_balance_due': True,
+    
+    # No custom CSS by default
+    'custom_css': None
+}
+
+
+class TemplateConfigCache:
+    """Bounded LRU of built template configs, keyed by (template id, updated_at)."""
+
+    def __init__(self, max_entries: int):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[int, Optional[datetime]], dict]" = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[int, Optional[datetime]]) -> Optional[dict]:
+        with self._lock:
+            config = self._entries.get(key)
+            if config is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return config
+
+    def set(self, key: Tuple[int, Optional[datetime]], config: dict) -> None:
+        with self._lock:
+            self._entries[key] = config
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+template_configs = TemplateConfigCache(settings.TEMPLATE_CONFIG_CACHE_SIZE)
+
+
+def _build_config(template: InvoiceTemplate) -> dict:
+    return {
+        # Colors
+        'primary_color': template.color_primary or "#2563eb",
+        'secondary_color': template.color_secondary or "#6b7280", 
+        'accent_color': template.color_accent or "#10b981",
+        'text_color': template.color_text or "#111827",
+        'background_color': template.color_background or "#ffffff",
+        
+        # Company branding
+        'company_name': template.company_name or "Webby Wonder",
+        'company_address': template.company_address or "Mumbai, India",
+        'company_phone': template.company_phone,
+        'company_email': template.company_email,
+        'company_logo_url': template.company_logo_url,
+        
+        # Typography
+        'font_family': template.font_family or "helvetica",
+        'font_size_base': template.font_size_base or 10,
+        'font_size_header': template.font_size_header or 16,
+        'font_size_title': template.font_size_title or 24,
+        
+        # Layout
+        'header_style': template.header_style or "modern",
+        'item_table_style': template.item_table_style or "modern",
+        'totals_layout': template.totals_layout or "right",
+        'layout_columns': template.layout_columns or "single",
+        
+        # Field visibility
+        'show_invoice_number': template.show_invoice_number if template.show_invoice_number is not None else True,
+        'show_issue_date': template.show_issue_date if template.show_issue_date is not None else True,
+        'show_due_date': template.show_due_date if template.show_due_date is not None else True,
+        'show_notes': template.show_notes if template.show_notes is not None else True,
+        'show_terms': template.show_terms if template.show_terms is not None else True,
+        'show_company_logo': template.show_company_logo if template.show_company_logo is not None else True,
+        'show_company_details': template.show_company_details if template.show_company_details is not None else True,
+        'show_client_details': template.show_client_details if template.show_client_details is not None else True,
+        'show_line_items': template.show_line_items if template.show_line_items is not None else True,
+        'show_subtotal': template.show_subtotal if template.show_subtotal is not None else True,
+        'show_tax': template.show_tax if template.show_tax is not None else True,
+        'show_discount': template.show_discount if template.show_discount is not None else True,
+        'show_total': template.show_total if template.show_total is not None else True,
+        'show_paid_amount': template.show_paid_amount if template.show_paid_amount is not None else True,
+        'show_balance_due': template.show_balance_due if template.show_balance_due is not None else True,
+        
+        # Custom CSS (for advanced styling)
+        'custom_css': template.custom_css
+    }
+
+
+def config_for_template(template: Optional[InvoiceTemplate]) -> dict:
+    """Memoized config of ``template``; DEFAULT_TEMPLATE_CONFIG without one. Do not mutate."""
+    if template is None:
+        return DEFAULT_TEMPLATE_CONFIG
+    key = (template.id, template.updated_at)
+    config = template_configs.get(key)
+    if config is None:
+        config = _build_config(template)
+        template_configs.set(key, config)
+    return config
+
+
+def resolve_template_configs(db: Session, template_ids: Iterable[Optional[int]]) -> Dict[int, dict]:
+    """
+    Configs of the distinct templates in ``template_ids``: one query for their
+    versions, and one loading only the templates whose version is not cached.
+    Ids without a template are left out; callers fall back to DEFAULT_TEMPLATE_CONFIG.
+    """
+    ids = {template_id for template_id in template_ids if template_id is not None}
+    if not ids:
+        return {}
+
+    configs: Dict[int, dict] = {}
+    missing = []
+    for template_id, updated_at in db.query(InvoiceTemplate.id, InvoiceTemplate.updated_at).filter(
+        InvoiceTemplate.id.in_(ids)
+    ):
+        config = template_configs.get((template_id, updated_at))
+        if config is None:
+            missing.append(template_id)
+        else:
+            configs[template_id] = config
+    if missing:
+        for template in db.query(InvoiceTemplate).filter(InvoiceTemplate.id.in_(missing)):
+            configs[template.id] = config_for_template(template)
+    return configs
+
+
 class TemplateRenderer:
     def __init__(self, template: Optional[InvoiceTemplate]):
         self.template = template
+        self._config: Optional[dict] = None
+    
+    def _shared_config(self) -> dict:
+        if self._config is None:
+            self._config = config_for_template(self.template)
+        return self._config
     
     def get_template_config(self) -> dict:
         """Get template configuration with defaults if no template is provided"""
-        if not self.template:
-            return self.get_default_config()
-        
-        return {
-            # Colors
-            'primary_color': self.template.color_primary or "#2563eb",
-            'secondary_color': self.template.color_secondary or "#6b7280", 
-            'accent_color': self.template.color_accent or "#10b981",
-            'text_color': self.template.color_text or "#111827",
-            'background_color': self.template.color_background or "#ffffff",
-            
-            # Company branding
-            'company_name': self.template.company_name or "Webby Wonder",
-            'company_address': self.template.company_address or "Mumbai, India",
-            'company_phone': self.template.company_phone,
-            'company_email': self.template.company_email,
-            'company_logo_url': self.template.company_logo_url,
-            
-            # Typography
-            'font_family': self.template.font_family or "helvetica",
-            'font_size_base': self.template.font_size_base or 10,
-            'font_size_header': self.template.font_size_header or 16,
-            'font_size_title': self.template.font_size_title or 24,
-            
-            # Layout
-            'header_style': self.template.header_style or "modern",
-            'item_table_style': self.template.item_table_style or "modern",
-            'totals_layout': self.template.totals_layout or "right",
-            'layout_columns': self.template.layout_columns or "single",
-            
-            # Field visibility
-            'show_invoice_number': self.template.show_invoice_number if self.template.show_invoice_number is not None else True,
-            'show_issue_date': self.template.show_issue_date if self.template.show_issue_date is not None else True,
-            'show_due_date': self.template.show_due_date if self.template.show_due_date is not None else True,
-            'show_notes': self.template.show_notes if self.template.show_notes is not None else True,
-            'show_terms': self.template.show_terms if self.template.show_terms is not None else True,
-            'show_company_logo': self.template.show_company_logo if self.template.show_company_logo is not None else True,
-            'show_company_details': self.template.show_company_details if self.template.show_company_details is not None else True,
-            'show_client_details': self.template.show_client_details if self.template.show_client_details is not None else True,
-            'show_line_items': self.template.show_line_items if self.template.show_line_items is not None else True,
-            'show_subtotal': self.template.show_subtotal if self.template.show_subtotal is not None else True,
-            'show_tax': self.template.show_tax if self.template.show_tax is not None else True,
-            'show_discount': self.template.show_discount if self.template.show_discount is not None else True,
-            'show_total': self.template.show_total if self.template.show_total is not None else True,
-            'show_paid_amount': self.template.show_paid_amount if self.template.show_paid_amount is not None else True,
-            'show_balance_due': self.template.show_balance_due if self.template.show_balance_due is not None else True,
-            
-            # Custom CSS (for advanced styling)
-            'custom_css': self.template.custom_css
-        }
+        return dict(self._shared_config())
     
     def get_default_config(self) -> dict:
         """Return default template configuration"""
-        return {
-            # Colors - Modern blue theme
-            'primary_color': "#2563eb",
-            'secondary_color': "#6b7280", 
-            'accent_color': "#10b981",
-            'text_color': "#111827",
-            'background_color': "#ffffff",
-            
-            # Company branding
-            'company_name': "Webby Wonder",
-            'company_address': "Mumbai, India",
-            'company_phone': None,
-            'company_email': None,
-            'company_logo_url': None,
-            
-            # Typography
-            'font_family': "helvetica",
-            'font_size_base': 10,
-            'font_size_header': 16,
-            'font_size_title': 24,
-            
-            # Layout
-            'header_style': "modern",
-            'item_table_style': "modern",
-            'totals_layout': "right",
-            'layout_columns': "single",
-            
-            # Field visibility - show all by default
-            'show_invoice_number': True,
-            'show_issue_date': True,
-            'show_due_date': True,
-            'show_notes': True,
-            'show_terms': True,
-            'show_company_logo': True,
-            'show_company_details': True,
-            'show_client_details': True,
-            'show_line_items': True,
-            'show_subtotal': True,
-            'show_tax': True,
-            'show_discount': True,
-            'show_total': True,
-            'show_paid_amount': True,
-            'show_balance_due': True,
-            
-            # No custom CSS by default
-            'custom_css': None
-        }
+        return dict(DEFAULT_TEMPLATE_CONFIG)
     
     def get_template_type_styles(self) -> dict:
         """Get specific styling based on template type"""
@@ -182,8 +285,7 @@ class TemplateRenderer:
     
     def should_show_field(self, field_name: str) -> bool:
         """Check if a field should be displayed based on template settings"""
-        config = self.get_template_config()
-        return config.get(field_name, True)
+        return self._shared_config().get(field_name, True)
     
     def get_layout_position(self, layout_type: str) -> dict:
         """Get position coordinates based on layout settings"""
@@ -200,16 +302,13 @@ class TemplateRenderer:
         
         return positions.get(layout_type, positions['header_right'])
 
-def get_template_renderer(db: Session, invoice_id: int) -> TemplateRenderer:
-    """Helper function to get template renderer for an invoice"""
-    from app.models.invoice import Invoice
-    
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
-    if not invoice or not invoice.design_template_id:
+def get_template_renderer(db: Session, invoice: Invoice) -> TemplateRenderer:
+    """Helper function to get template renderer for an already-loaded invoice"""
+    if not invoice.design_template_id:
         return TemplateRenderer(None)
     
-    template = db.query(InvoiceTemplate).filter(InvoiceTemplate.id == invoice.design_template_id).first()
-    return TemplateRenderer(template)
+    # Session.get answers from the identity map when the template is already loaded
+    return TemplateRenderer(db.get(InvoiceTemplate, invoice.design_template_id))
 
 def get_default_template_renderer(db: Session, user_id: int) -> TemplateRenderer:
     """Helper function to get default template renderer for a user"""
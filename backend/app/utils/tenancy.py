@@ -0,0 +1,57 @@
+"""
+Tenant scoping for ORM queries.
+
+Once a session is bound to a user with ``scope_session_to_user`` (done by the
+``get_current_user`` dependency), every ORM SELECT issued through it gets a
+``created_by = <user id>`` criterion for each model in TENANT_MODELS, including
+aggregate queries, joins and relationship lazy loads. Queries that genuinely
+need to see every tenant's rows can opt out with
+``.execution_options(skip_tenant_scope=True)``.
+
+The hook is a safety net rather than the filter of record: routers that list
+or aggregate a user's rows still filter on ``created_by`` themselves. Code
+that reads across tenants from a scoped session opts out explicitly; today
+that is invoice number allocation and the imported-number check (numbers are
+unique across users), recurring generation's template batches and the AR
+aging snapshot queries. Core statements executed on ``db.connection()`` never
+pass through the hook.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app.database import SessionLocal
+from app.models.client import Client
+from app.models.expense import Expense
+from app.models.expense_category import ExpenseCategory
+from app.models.invoice import Invoice
+from app.models.recurring_invoice import RecurringInvoice
+
+TENANT_SCOPE_KEY = "tenant_user_id"
+SKIP_TENANT_SCOPE = "skip_tenant_scope"
+
+TENANT_MODELS = (Invoice, Expense, Client, RecurringInvoice, ExpenseCategory)
+
+
+def scope_session_to_user(db: Session, user_id: int) -> None:
+    """Restrict all subsequent ORM SELECTs on ``db`` to rows owned by ``user_id``."""
+    db.info[TENANT_SCOPE_KEY] = user_id
+
+
+def get_session_tenant(db: Session):
+    return db.info.get(TENANT_SCOPE_KEY)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _apply_tenant_scope(execute_state):
+    user_id = execute_state.session.info.get(TENANT_SCOPE_KEY)
+    if user_id is None or not execute_state.is_select or execute_state.is_column_load:
+        return
+    if execute_state.execution_options.get(SKIP_TENANT_SCOPE, False):
+        return
+
+    execute_state.statement = execute_state.statement.options(
+        *[
+            with_loader_criteria(model, lambda cls: cls.created_by == user_id, include_aliases=True)
+            for model in TENANT_MODELS
+        ]
+    )
@@ -0,0 +1,17 @@
+"""
+Benchmark tooling for the Invoice Management API.
+
+    python -m benchmarks.datagen --scale medium      # seed a synthetic dataset
+    python -m benchmarks.loadtest --output run.json  # drive the API and record latencies
+    python -m benchmarks.compare base.json run.json  # diff two load-test runs
+    python -m benchmarks.serialization               # ORM vs slim invoice list serialization
+    python -m benchmarks.bulk_import                 # bulk invoice import throughput
+    python -m benchmarks.item_diff                   # write amplification of invoice item updates
+    python -m benchmarks.ar_aging                    # receivables aging over 1M open invoices
+    python -m benchmarks.cash_forecast               # 12-month cash forecast over 50k recurring templates
+    python -m benchmarks.recurrence                  # batch recurrence expansion throughput over 100k schedules
+    python -m benchmarks.invoice_pdf                 # server-side invoice PDF rendering in the process pool and disk cache
+    python -m benchmarks.invoice_export              # bulk PDF/ZIP export of 10k invoices
+
+Run from the backend/ directory so that the ``app`` package is importable.
+"""
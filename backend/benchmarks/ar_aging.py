@@ -0,0 +1,143 @@
+"""
+Receivables aging at scale (app.utils.ar_aging).
+
+Seeds a throwaway SQLite database with one user whose clients hold N open
+invoices (1M by default) and a year of daily aging snapshots. Then it times:
+
+  * the grouped aging pass, against loading every open invoice and bucketing
+    it in Python,
+  * a drill-down page of the oldest bucket,
+  * taking the daily snapshot for every tenant,
+  * reading a year of aging history: the stored snapshots, then today's
+    totals from one aging pass.
+
+    python -m benchmarks.ar_aging --invoices 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+CHUNK = 50000
+
+
+def _timed(label: str, fn, repeat: int = 3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40}{best * 1000:>10.1f} ms")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time receivables aging over many open invoices")
+    parser.add_argument("--invoices", type=int, default=1000000)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--history-days", type=int, default=365)
+    args = parser.parse_args(argv)
+
+    from app.database import Base
+    from app.models.ar_aging_snapshot import ARAgingSnapshot
+    from app.models.client import Client
+    from app.models.invoice import Invoice
+    from app.models.user import User
+    from app.utils import ar_aging
+    from app.utils.bulk_insert import bulk_insert
+    from benchmarks.datagen import Scale, generate
+
+    rng = random.Random(11)
+    today = date.today()
+    now = datetime.utcnow()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'ar_aging.db'}")
+        Base.metadata.create_all(engine)
+        generate(engine, Scale(1, args.clients, 0, 0, 0, 0.0, 0.0, 0.0), seed=11)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        user = db.query(User).first()
+        client_ids = [client_id for (client_id,) in db.query(Client.id)]
+
+        started = time.perf_counter()
+        with engine.begin() as connection:
+            for offset in range(0, args.invoices, CHUNK):
+                rows = []
+                for number in range(offset, min(offset + CHUNK, args.invoices)):
+                    issue_date = today - timedelta(days=rng.randrange(0, 400))
+                    total = round(rng.uniform(100, 50000), 2)
+                    rate = rng.choice((1.0, 1.0, 83.0, 90.0))
+                    rows.append({
+                        "invoice_number": f"AGING-{number:08d}",
+                        "client_id": rng.choice(client_ids),
+                        "issue_date": issue_date,
+                        "due_date": issue_date + timedelta(days=30),
+                        "subtotal": total,
+                        "tax_rate": 0.0,
+                        "tax_amount": 0.0,
+                        "discount": 0.0,
+                        "total_amount": total,
+                        "paid_amount": round(total * rng.choice((0.0, 0.0, 0.5)), 2),
+                        "currency": "INR" if rate == 1.0 else "USD",
+                        "exchange_rate": rate,
+                        "base_currency_amount": total * rate,
+                        "status": "sent",
+                        "payment_status": "unpaid",
+                        "generated_by_template": False,
+                        "created_by": user.id,
+                        "created_at": now,
+                        "updated_at": now,
+                    })
+                bulk_insert(connection, Invoice.__table__, rows)
+            bulk_insert(connection, ARAgingSnapshot.__table__, [
+                {"user_id": user.id, "snapshot_date": today - timedelta(days=day), "currency": "INR",
+                 "current": 0.0, "days_1_30": 0.0, "days_31_60": 0.0, "days_61_90": 0.0, "days_over_90": 0.0,
+                 "total_outstanding": 0.0, "open_invoices": 0, "trailing_sales": 0.0, "dso": None, "created_at": now}
+                for day in range(1, args.history_days)
+            ])
+        with engine.connect() as connection:
+            connection.exec_driver_sql("ANALYZE")
+        print(f"Seeded {args.invoices} open invoices for {args.clients} clients "
+              f"in {time.perf_counter() - started:.1f} s")
+
+        def python_buckets():
+            buckets = {}
+            for client_id, due_date, total, paid, rate in db.query(
+                Invoice.client_id, Invoice.due_date, Invoice.total_amount, Invoice.paid_amount, Invoice.exchange_rate
+            ).filter(Invoice.created_by == user.id, Invoice.status.notin_(ar_aging.CLOSED_STATUSES)):
+                balance = total - (paid or 0.0)
+                if balance <= ar_aging.MIN_BALANCE:
+                    continue
+                overdue = (today - due_date).days
+                index = next((i for i, limit in enumerate(ar_aging.BUCKET_LIMITS) if overdue <= limit),
+                             len(ar_aging.BUCKET_LIMITS))
+                row = buckets.setdefault(client_id, [0.0] * len(ar_aging.BUCKETS))
+                row[index] += balance * (rate or 1.0)
+            return buckets
+
+        print(f"{'operation':<40}{'best of 3':>13}")
+        _timed("load + bucket in Python", python_buckets, repeat=1)
+        report = _timed("grouped aging pass (aging_report)", lambda: ar_aging.aging_report(db, user))
+        _timed("drill-down: 100 oldest over-90",
+               lambda: ar_aging.aging_invoices(db, user.id, "days_over_90", limit=100))
+        _timed("snapshot every tenant (take_snapshots)", lambda: ar_aging.take_snapshots(db, today))
+        history = _timed(f"history, {args.history_days} days (snapshots + today)",
+                         lambda: ar_aging.aging_history(db, user.id, args.history_days))
+        print(f"{report['totals']['open_invoices']} open invoices in {len(report['clients'])} clients, "
+              f"DSO {report['dso']}; {len(history)} history rows")
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
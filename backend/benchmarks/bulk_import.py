@@ -0,0 +1,70 @@
+"""
+Throughput of the bulk invoice import pipeline (app.utils.invoice_import).
+
+Seeds a throwaway SQLite database with one user and a few clients, then
+imports N generated invoices (two items each) in chunks and reports
+invoices per second.
+
+    python -m benchmarks.bulk_import --invoices 50000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure bulk invoice import throughput")
+    parser.add_argument("--invoices", type=int, default=50000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    from app.database import Base
+    from app.models.user import User
+    from app.utils.invoice_import import InvoiceImporter, chunked
+    from app.utils.tenancy import scope_session_to_user
+    from benchmarks.datagen import Scale, generate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bulk_import.db'}")
+        Base.metadata.create_all(engine)
+        generate(engine, Scale(1, 10, 0, 0, 0, 0.0, 0.0, 0.0), seed=7)
+        db = sessionmaker(bind=engine)()
+
+        user = db.query(User).first()
+        scope_session_to_user(db, user.id)
+        importer = InvoiceImporter(db, user)
+        client_ids = sorted(importer.client_ids)
+        rows = [
+            {
+                "client_id": client_ids[index % len(client_ids)],
+                "issue_date": "2026-01-01",
+                "due_date": "2026-01-31",
+                "currency": "INR",
+                "items": [
+                    {"description": "Consulting", "quantity": 2, "rate": 150.0},
+                    {"description": "Hosting", "quantity": 1, "rate": 20.0},
+                ],
+            }
+            for index in range(args.invoices)
+        ]
+
+        started = time.perf_counter()
+        for chunk in chunked(enumerate(rows, start=1), args.chunk_size):
+            importer.import_chunk(chunk)
+        elapsed = time.perf_counter() - started
+
+        result = importer.result()
+        db.close()
+        engine.dispose()
+
+    print(f"{result['created']} invoices imported, {result['failed']} failed, chunk size {args.chunk_size}")
+    print(f"{elapsed:.2f}s  {result['created'] / elapsed:,.0f} invoices/sec")
+
+
+if __name__ == "__main__":
+    main()
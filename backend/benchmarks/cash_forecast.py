@@ -0,0 +1,92 @@
+"""
+Cash-flow forecast at scale (app.utils.cash_forecast).
+
+Seeds a throwaway SQLite database with one user whose clients hold N
+recurring templates (50k by default), open invoices and payments. Then it
+times the 12-month forecast end to end and the schedule expansion on its
+own, each with numpy and with the pure-Python fallback.
+
+    python -m benchmarks.cash_forecast --templates 50000
+"""
+import argparse
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+CLIENTS = 5000
+
+
+def _timed(label: str, fn, repeat: int = 3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<44}{best * 1000:>10.1f} ms")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time the cash-flow forecast over many recurring templates")
+    parser.add_argument("--templates", type=int, default=50000)
+    parser.add_argument("--months", type=int, default=12)
+    args = parser.parse_args(argv)
+
+    from app.database import Base
+    from app.models.recurring_invoice import RecurringInvoice
+    from app.models.user import User
+    from app.utils import cash_forecast, recurring_invoice_utils
+    from benchmarks.datagen import Scale, generate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'cash_forecast.db'}")
+        Base.metadata.create_all(engine)
+        # Every template is active; datagen leaves ~20% inactive
+        generate(engine, Scale(1, CLIENTS, 2, 3, 0, args.templates / CLIENTS / 0.8, 0.0, 0.0), seed=5)
+        db = sessionmaker(bind=engine)()
+        user = db.query(User).first()
+        active = db.query(RecurringInvoice.id).filter(RecurringInvoice.is_active == True).count()
+
+        templates = db.query(
+            RecurringInvoice.start_date, RecurringInvoice.frequency, RecurringInvoice.interval_value,
+            RecurringInvoice.day_of_week, RecurringInvoice.day_of_month, RecurringInvoice.next_due_date,
+            RecurringInvoice.end_date,
+        ).filter(RecurringInvoice.is_active == True).all()
+        until = cash_forecast.period_starts(date.today(), "month", args.months)[-1]
+
+        def expand():
+            return recurring_invoice_utils.expand_schedules(
+                [row[0] for row in templates], [row[1] for row in templates], [row[2] for row in templates],
+                [row[3] for row in templates], [row[4] for row in templates], until,
+                [row[5] for row in templates], [row[6] for row in templates],
+            )
+
+        print(f"{active} active templates, {args.months}-month horizon")
+        print(f"{'operation':<44}{'best of 3':>13}")
+        numpy = recurring_invoice_utils.np
+        indexes, _ = _timed("expand schedules (numpy)", expand)
+        forecast = _timed("cash_forecast, monthly (numpy)", lambda: cash_forecast.cash_forecast(db, user, "month", args.months))
+        _timed("cash_forecast, weekly (numpy)", lambda: cash_forecast.cash_forecast(db, user, "week", args.months))
+
+        recurring_invoice_utils.np = cash_forecast.np = None
+        try:
+            _timed("expand schedules (pure Python)", expand, repeat=1)
+            _timed("cash_forecast, monthly (pure Python)",
+                   lambda: cash_forecast.cash_forecast(db, user, "month", args.months), repeat=1)
+        finally:
+            recurring_invoice_utils.np = cash_forecast.np = numpy
+
+        print(f"{len(indexes)} occurrences; forecast total {forecast['totals']['total']:,.2f} {forecast['currency']}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare two load-test result files produced by benchmarks.loadtest.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+Exits non-zero when any endpoint's p95 regressed by more than the threshold
+percentage, so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def _delta_pct(before: float, after: float) -> float:
+    return ((after - before) / before * 100) if before else 0.0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Diff two load-test runs")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p95 regression in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    print(f"baseline {baseline['meta'].get('commit')}  vs  candidate {candidate['meta'].get('commit')}")
+    print(f"{'endpoint':<40} {'p50 Δ%':>8} {'p95 Δ%':>8} {'p99 Δ%':>8} {'rps Δ%':>8}")
+
+    regressions = []
+    for endpoint, after in candidate["endpoints"].items():
+        before = baseline["endpoints"].get(endpoint)
+        if not before:
+            continue
+        p95_delta = _delta_pct(before["p95_ms"], after["p95_ms"])
+        print(
+            f"{endpoint:<40} {_delta_pct(before['p50_ms'], after['p50_ms']):>8.1f} {p95_delta:>8.1f} "
+            f"{_delta_pct(before['p99_ms'], after['p99_ms']):>8.1f} {_delta_pct(before['rps'], after['rps']):>8.1f}"
+        )
+        if p95_delta > args.threshold:
+            regressions.append(endpoint)
+
+    if regressions:
+        print(f"p95 regressed by more than {args.threshold}% on: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,431 @@
+"""
+Bulk synthetic data generator.
+
+Seeds users, clients, invoices with items, payments, expenses, recurring
+templates and email/reminder history using Core ``insert()`` executemany in
+fixed-size batches, so tens of millions of rows can be generated without
+building ORM objects. Primary keys are assigned up front, which keeps every
+batch a plain executemany and lets child rows reference parents directly.
+
+Every generated user can log in with password ``benchmark`` and the email
+``bench-user-<n>@example.com``.
+
+    python -m benchmarks.datagen --scale large
+    python -m benchmarks.datagen --users 5 --clients-per-user 20 --database-url sqlite:///./bench.db
+"""
+import argparse
+import random
+import string
+import time
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+from app.models.user import User
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceItem
+from app.models.payment import Payment
+from app.models.email_history import EmailHistory, EmailStatus
+from app.models.recurring_invoice import RecurringInvoice, RecurringInvoiceTemplateItem
+from app.models.reminder import ReminderHistory
+from app.models.expense import Expense
+from app.models.expense_category import ExpenseCategory
+import app.models  # noqa: F401 - register every model with Base.metadata
+
+BENCH_PASSWORD = "benchmark"
+
+CURRENCIES = ["INR", "INR", "INR", "USD", "EUR", "GBP"]
+INVOICE_STATUSES = ["draft", "sent", "sent", "paid", "paid", "paid", "overdue"]
+PAYMENT_METHODS = ["Cash", "Bank Transfer", "UPI", "Credit Card", "Cheque"]
+FREQUENCIES = ["weekly", "monthly", "monthly", "quarterly", "yearly"]
+CATEGORY_NAMES = [
+    "Office Supplies", "Software & Subscriptions", "Hardware & Equipment",
+    "Travel & Transportation", "Professional Services", "Marketing & Advertising",
+    "Rent & Utilities", "Bank Charges", "Insurance", "Miscellaneous",
+]
+VENDORS = ["Amazon", "Flipkart", "AWS", "Google", "Airtel", "Uber", "Zomato", "Staples", None]
+EMAIL_STATUSES = [EmailStatus.SENT, EmailStatus.DELIVERED, EmailStatus.OPENED, EmailStatus.BOUNCED]
+REMINDER_TYPES = ["friendly_3_days_before", "due_date", "first_overdue", "second_overdue"]
+
+# Insertion order respects foreign keys: parents are always flushed before children.
+TABLE_ORDER = [
+    User.__table__,
+    Client.__table__,
+    ExpenseCategory.__table__,
+    RecurringInvoice.__table__,
+    RecurringInvoiceTemplateItem.__table__,
+    Invoice.__table__,
+    InvoiceItem.__table__,
+    Payment.__table__,
+    EmailHistory.__table__,
+    ReminderHistory.__table__,
+    Expense.__table__,
+]
+
+
+@dataclass
+class Scale:
+    users: int
+    clients_per_user: int
+    invoices_per_client: int
+    items_per_invoice: int
+    expenses_per_user: int
+    recurring_per_client: float
+    emails_per_invoice: float
+    reminders_per_invoice: float
+
+
+SCALES: Dict[str, Scale] = {
+    # ~3k rows
+    "small": Scale(2, 10, 20, 3, 100, 0.2, 0.5, 0.2),
+    # ~130k rows
+    "medium": Scale(10, 50, 40, 3, 1000, 0.2, 1.0, 0.3),
+    # ~1.6M rows
+    "large": Scale(50, 100, 50, 3, 5000, 0.2, 1.0, 0.3),
+    # ~10M rows
+    "xl": Scale(100, 200, 80, 3, 10000, 0.2, 1.0, 0.3),
+}
+
+
+class BulkWriter:
+    """Buffer rows per table and flush them as executemany batches in FK order."""
+
+    def __init__(self, engine: Engine, batch_size: int):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.buffers = {table.name: [] for table in TABLE_ORDER}
+        self.counts = {table.name: 0 for table in TABLE_ORDER}
+
+    def add(self, table, row: dict) -> None:
+        buffer = self.buffers[table.name]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.engine.begin() as conn:
+            for table in TABLE_ORDER:
+                rows = self.buffers[table.name]
+                if rows:
+                    conn.execute(table.insert(), rows)
+                    self.counts[table.name] += len(rows)
+                    self.buffers[table.name] = []
+
+
+class IdAllocator:
+    """Hand out primary keys above the current maximum of each table."""
+
+    def __init__(self, engine: Engine):
+        self.next_ids = {}
+        with engine.connect() as conn:
+            for table in TABLE_ORDER:
+                current = conn.execute(select(func.max(table.c.id))).scalar() or 0
+                self.next_ids[table.name] = current + 1
+
+    def __call__(self, table) -> int:
+        value = self.next_ids[table.name]
+        self.next_ids[table.name] = value + 1
+        return value
+
+
+def _speed_up_sqlite(engine: Engine) -> None:
+    """Trade durability for load speed; the dataset can always be regenerated."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def _random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choices(string.ascii_lowercase + " ", k=length)).strip() or "item"
+
+
+def _count_with_fraction(rng: random.Random, expected: float) -> int:
+    """Turn a fractional expectation (e.g. 0.3 per invoice) into an integer count."""
+    whole = int(expected)
+    return whole + (1 if rng.random() < expected - whole else 0)
+
+
+def generate(
+    engine: Engine,
+    scale: Scale,
+    seed: int = 42,
+    batch_size: int = 5000,
+    today: Optional[date] = None,
+) -> Dict[str, int]:
+    """Generate a synthetic dataset and return the number of rows written per table."""
+    from app.utils.auth import get_password_hash
+
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(seed)
+    today = today or date.today()
+    now = datetime.utcnow()
+    writer = BulkWriter(engine, batch_size)
+    next_id = IdAllocator(engine)
+    # Hashing is deliberately slow; every synthetic user shares one hash.
+    password_hash = get_password_hash(BENCH_PASSWORD)
+
+    for user_index in range(scale.users):
+        user_id = next_id(User.__table__)
+        writer.add(User.__table__, {
+            "id": user_id,
+            "name": f"Bench User {user_id}",
+            "email": f"bench-user-{user_id}@example.com",
+            "password_hash": password_hash,
+            "role": "admin" if user_index == 0 else "user",
+            "base_currency": "INR",
+            "created_at": now,
+        })
+
+        category_ids = []
+        for name in CATEGORY_NAMES:
+            category_id = next_id(ExpenseCategory.__table__)
+            category_ids.append(category_id)
+            writer.add(ExpenseCategory.__table__, {
+                "id": category_id,
+                # Category names are globally unique in the schema.
+                "name": f"{name} #{user_id}",
+                "description": name,
+                "color": "#3B82F6",
+                "icon": "folder",
+                "is_active": True,
+                "created_by": user_id,
+                "created_at": now,
+                "updated_at": now,
+            })
+
+        client_ids = []
+        for _ in range(scale.clients_per_user):
+            client_id = next_id(Client.__table__)
+            client_ids.append(client_id)
+            writer.add(Client.__table__, {
+                "id": client_id,
+                "name": f"Client {client_id}",
+                "company": f"Company {client_id} Pvt Ltd",
+                "email": f"client-{client_id}@example.com",
+                "phone": f"9{rng.randrange(10**9):09d}",
+                "city": "Mumbai",
+                "state": "Maharashtra",
+                "base_currency": "INR",
+                "is_portal_enabled": False,
+                "has_deposit": False,
+                "created_by": user_id,
+                "created_at": now,
+                "updated_at": now,
+            })
+
+            for _ in range(_count_with_fraction(rng, scale.recurring_per_client)):
+                recurring_id = next_id(RecurringInvoice.__table__)
+                start = today - timedelta(days=rng.randrange(0, 365))
+                writer.add(RecurringInvoice.__table__, {
+                    "id": recurring_id,
+                    "template_name": f"Retainer {recurring_id}",
+                    "client_id": client_id,
+                    "frequency": rng.choice(FREQUENCIES),
+                    "interval_value": 1,
+                    "day_of_week": rng.randrange(7),
+                    "day_of_month": rng.randrange(1, 29),
+                    "start_date": start,
+                    "next_due_date": today + timedelta(days=rng.randrange(-10, 60)),
+                    "current_occurrence": 0,
+                    "is_active": rng.random() < 0.8,
+                    "auto_send": False,
+                    "generation_count": 0,
+                    "failed_generations": 0,
+                    "tax_enabled": True,
+                    "tax_rate": 18.0,
+                    "created_by": user_id,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                for sort_order in range(scale.items_per_invoice):
+                    quantity = rng.randrange(1, 5)
+                    rate = round(rng.uniform(500, 20000), 2)
+                    writer.add(RecurringInvoiceTemplateItem.__table__, {
+                        "id": next_id(RecurringInvoiceTemplateItem.__table__),
+                        "recurring_invoice_id": recurring_id,
+                        "description": _random_text(rng, 24),
+                        "quantity": quantity,
+                        "rate": rate,
+                        "amount": quantity * rate,
+                        "sort_order": sort_order,
+                    })
+
+            for _ in range(scale.invoices_per_client):
+                _add_invoice(writer, next_id, rng, user_id, client_id, scale, today, now)
+
+        for _ in range(scale.expenses_per_user):
+            amount = round(rng.uniform(100, 50000), 2)
+            currency = rng.choice(CURRENCIES)
+            exchange_rate = 1.0 if currency == "INR" else 80.0
+            writer.add(Expense.__table__, {
+                "id": next_id(Expense.__table__),
+                "amount": amount,
+                "category_id": rng.choice(category_ids),
+                "date": today - timedelta(days=rng.randrange(0, 730)),
+                "description": _random_text(rng, 30),
+                "vendor": rng.choice(VENDORS),
+                "payment_method": rng.choice(PAYMENT_METHODS),
+                "client_id": rng.choice(client_ids) if client_ids and rng.random() < 0.3 else None,
+                "currency": currency,
+                "base_currency_amount": amount * exchange_rate,
+                "exchange_rate": exchange_rate,
+                "created_by": user_id,
+                "created_at": now,
+                "updated_at": now,
+            })
+
+    writer.flush()
+    return writer.counts
+
+
+def _add_invoice(writer, next_id, rng, user_id, client_id, scale, today, now) -> None:
+    invoice_id = next_id(Invoice.__table__)
+    issue_date = today - timedelta(days=rng.randrange(0, 730))
+    currency = rng.choice(CURRENCIES)
+    exchange_rate = 1.0 if currency == "INR" else 80.0
+    status = rng.choice(INVOICE_STATUSES)
+    tax_rate = 18.0
+
+    items = []
+    for _ in range(scale.items_per_invoice):
+        quantity = rng.randrange(1, 10)
+        rate = round(rng.uniform(100, 10000), 2)
+        items.append((quantity, rate))
+    subtotal = sum(quantity * rate for quantity, rate in items)
+    tax_amount = subtotal * tax_rate / 100
+    total_amount = subtotal + tax_amount
+
+    if status == "paid":
+        paid_amount, payment_status = total_amount, "paid"
+    elif status in ("sent", "overdue") and rng.random() < 0.3:
+        paid_amount, payment_status = round(total_amount * rng.uniform(0.1, 0.9), 2), "partial"
+    else:
+        paid_amount, payment_status = 0.0, "unpaid"
+
+    writer.add(Invoice.__table__, {
+        "id": invoice_id,
+        "invoice_number": f"BENCH-{invoice_id:08d}",
+        "client_id": client_id,
+        "issue_date": issue_date,
+        "due_date": issue_date + timedelta(days=30),
+        "subtotal": subtotal,
+        "tax_rate": tax_rate,
+        "tax_amount": tax_amount,
+        "discount": 0.0,
+        "total_amount": total_amount,
+        "currency": currency,
+        "base_currency_amount": total_amount * exchange_rate,
+        "exchange_rate": exchange_rate,
+        "status": status,
+        "payment_status": payment_status,
+        "paid_amount": paid_amount,
+        "notes": None,
+        "terms": "Payment due within 30 days.",
+        "generated_by_template": False,
+        "created_by": user_id,
+        "created_at": now,
+        "updated_at": now,
+    })
+
+    for quantity, rate in items:
+        writer.add(InvoiceItem.__table__, {
+            "id": next_id(InvoiceItem.__table__),
+            "invoice_id": invoice_id,
+            "description": _random_text(rng, 24),
+            "quantity": quantity,
+            "rate": rate,
+            "amount": quantity * rate,
+        })
+
+    if paid_amount > 0:
+        writer.add(Payment.__table__, {
+            "id": next_id(Payment.__table__),
+            "invoice_id": invoice_id,
+            "payment_date": issue_date + timedelta(days=rng.randrange(0, 45)),
+            "amount": paid_amount,
+            "payment_method": rng.choice(PAYMENT_METHODS),
+            "reference_number": f"REF{invoice_id}",
+            "created_at": now,
+        })
+
+    if status == "draft":
+        return
+
+    for _ in range(_count_with_fraction(rng, scale.emails_per_invoice)):
+        email_id = next_id(EmailHistory.__table__)
+        writer.add(EmailHistory.__table__, {
+            "id": email_id,
+            "invoice_id": invoice_id,
+            "sent_to": f"client-{client_id}@example.com",
+            "recipient": f"client-{client_id}@example.com",
+            "subject": f"Invoice BENCH-{invoice_id:08d}",
+            "body_preview": "Please find attached the invoice.",
+            "status": rng.choice(EMAIL_STATUSES),
+            "sent_at": now,
+            "tracking_id": f"bench-{email_id}",
+        })
+
+    for _ in range(_count_with_fraction(rng, scale.reminders_per_invoice)):
+        writer.add(ReminderHistory.__table__, {
+            "id": next_id(ReminderHistory.__table__),
+            "invoice_id": invoice_id,
+            "sent_at": now,
+            "reminder_type": rng.choice(REMINDER_TYPES),
+            "recipient_email": f"client-{client_id}@example.com",
+            "email_subject": f"Reminder: Invoice BENCH-{invoice_id:08d}",
+            "email_body": "Your invoice is due soon.",
+        })
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Seed a synthetic dataset for benchmarking")
+    parser.add_argument("--database-url", help="Target database (defaults to settings.DATABASE_URL)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--clients-per-user", type=int)
+    parser.add_argument("--invoices-per-client", type=int)
+    parser.add_argument("--items-per-invoice", type=int)
+    parser.add_argument("--expenses-per-user", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    scale = Scale(**asdict(SCALES[args.scale]))
+    for field in ("users", "clients_per_user", "invoices_per_client", "items_per_invoice", "expenses_per_user"):
+        value = getattr(args, field)
+        if value is not None:
+            setattr(scale, field, value)
+
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        from app.config import settings
+        database_url = settings.DATABASE_URL
+
+    engine = create_engine(database_url)
+    _speed_up_sqlite(engine)
+
+    started = time.perf_counter()
+    counts = generate(engine, scale, seed=args.seed, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"  {table:<35} {count:>12,}")
+    print(f"Inserted {total:,} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Bulk PDF/ZIP export of invoices (app.utils.invoice_export).
+
+Seeds a throwaway SQLite database with one user and N invoices (10k by
+default), 5 items each. It then times:
+
+  * the export job with an empty PDF cache, where every invoice is rendered
+    in the PDF_RENDER_WORKERS process pool,
+  * the same job again, where every PDF comes from the disk cache,
+  * streaming the ZIP archive. It reports the largest chunk handed to the
+    response and the size of the closing manifest and central directory.
+    Those bound the memory the stream holds.
+
+    python -m benchmarks.invoice_export --invoices 10000 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time bulk invoice PDF rendering and ZIP streaming")
+    parser.add_argument("--invoices", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # SessionLocal and the PDF cache are configured at import time
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'export.db'}"
+        os.environ["PDF_CACHE_DIR"] = str(Path(tmp) / "pdf_cache")
+        if args.workers:
+            os.environ["PDF_RENDER_WORKERS"] = str(args.workers)
+
+        from app.config import settings
+        from app.database import SessionLocal, engine
+        from app.models.user import User
+        from app.utils.invoice_export import create_export_job, job_invoice_ids, run_invoice_export, stream_invoice_zip
+        from benchmarks.datagen import Scale, generate
+
+        started = time.perf_counter()
+        generate(engine, Scale(1, args.clients, max(args.invoices // args.clients, 1), 5, 0, 0.0, 0.0, 0.0), seed=50)
+        print(f"Seeded {args.invoices} invoices in {time.perf_counter() - started:.1f} s; "
+              f"{settings.PDF_RENDER_WORKERS} render workers, batches of {settings.INVOICE_EXPORT_BATCH_SIZE}")
+
+        db = SessionLocal()
+        user = db.query(User).first()
+        for label in ("export job, cold cache", "export job, warm cache"):
+            job = create_export_job(db, user, {})
+            started = time.perf_counter()
+            run_invoice_export(job.id)
+            elapsed = time.perf_counter() - started
+            db.refresh(job)
+            print(f"{label:<28}{elapsed * 1000:>10.0f} ms{job.invoices_processed / elapsed:>10,.0f} invoices/s"
+                  f"  rendered={job.rendered} cached={job.cached} failed={job.failed} status={job.status}")
+
+        started = time.perf_counter()
+        sizes = [len(chunk) for chunk in stream_invoice_zip(user.id, job_invoice_ids(db, job))]
+        elapsed = time.perf_counter() - started
+        size = sum(sizes)
+        # The last chunk is the archive's manifest and central directory
+        print(f"{'stream ZIP from cache':<28}{elapsed * 1000:>10.0f} ms{size / elapsed / 2 ** 20:>10,.1f} MB/s"
+              f"  {size / 2 ** 20:.1f} MB in {len(sizes)} chunks, largest {max(sizes[:-1]) / 2 ** 10:.1f} KB,"
+              f" manifest and central directory {sizes[-1] / 2 ** 10:.1f} KB")
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
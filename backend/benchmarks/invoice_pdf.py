@@ -0,0 +1,79 @@
+"""
+Server-side invoice PDF throughput (app.utils.invoice_pdf).
+
+Builds N invoice documents (500 by default) with 5-40 items each. It then
+times rendering them one by one in this process, rendering them through
+render_and_store() in the PDF_RENDER_WORKERS process pool from concurrent
+threads, and serving them again from the disk cache. The cache is a fresh
+temporary directory.
+
+    python -m benchmarks.invoice_pdf --invoices 500 --workers 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+
+def _document(rng: random.Random, number: int) -> dict:
+    items = [
+        [f"Consulting services, phase {index}", rng.randrange(1, 10), round(rng.uniform(10, 500), 2), 0.0]
+        for index in range(rng.randrange(5, 41))
+    ]
+    for item in items:
+        item[3] = round(item[1] * item[2], 2)
+    subtotal = sum(item[3] for item in items)
+    return {
+        "invoice": {
+            "invoice_number": f"BENCH-{number:06d}", "issue_date": "2026-01-15", "due_date": "2026-02-14",
+            "status": "sent", "currency": "INR", "subtotal": subtotal, "tax_rate": 18.0,
+            "tax_amount": subtotal * 0.18, "discount": 0.0, "total_amount": subtotal * 1.18,
+            "paid_amount": 0.0, "notes": "Payment by bank transfer. " * 8, "terms": "Net 30.",
+        },
+        "client": {"name": f"Client {number}", "company": "Acme", "email": "billing@example.com", "phone": None},
+        "items": items,
+        "config": {},
+        "styles": {},
+    }
+
+
+def _timed(label: str, fn, count: int):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32}{elapsed * 1000:>10.1f} ms{count / elapsed:>12,.0f} PDFs/s")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time server-side invoice PDF rendering and caching")
+    parser.add_argument("--invoices", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    os.environ["PDF_CACHE_DIR"] = tempfile.mkdtemp(prefix="invoice-pdf-")
+    if args.workers:
+        os.environ["PDF_RENDER_WORKERS"] = str(args.workers)
+    from app.utils import invoice_pdf
+    from app.utils.pdf_renderer import render_invoice_pdf
+
+    rng = random.Random(49)
+    documents = [_document(rng, number) for number in range(args.invoices)]
+    keys = [f"{number:064x}" for number in range(args.invoices)]
+
+    print(f"{args.invoices} invoices, {invoice_pdf.settings.PDF_RENDER_WORKERS} render workers")
+    _timed("render in process", lambda: [render_invoice_pdf(document) for document in documents], args.invoices)
+    # Start the workers outside the timing
+    list(invoice_pdf.render_pool().map(render_invoice_pdf, documents[:invoice_pdf.settings.PDF_RENDER_WORKERS]))
+    # Request threads hand documents to the pool the way concurrent downloads do
+    with ThreadPoolExecutor(invoice_pdf.settings.PDF_RENDER_WORKERS * 2) as threads:
+        _timed("render in pool + store", lambda: list(threads.map(
+            invoice_pdf.render_and_store, documents, keys
+        )), args.invoices)
+    _timed("serve from disk cache", lambda: [invoice_pdf.cached_pdf(key) for key in keys], args.invoices)
+
+
+if __name__ == "__main__":
+    main()
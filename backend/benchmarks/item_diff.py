@@ -0,0 +1,129 @@
+"""
+Write amplification of invoice item updates (app.utils.item_diff).
+
+Seeds a throwaway SQLite database with one invoice of N line items, then
+applies the same edits twice: once the old way (delete every item and insert
+the full list again) and once through apply_item_diff. Reports the write
+statements sent to the database and the rows they wrote for each scenario.
+
+    python -m benchmarks.item_diff --lines 500
+"""
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+WRITE_VERBS = ("INSERT", "UPDATE", "DELETE")
+
+
+class StatementCounter:
+    """Counts write statements sent on an engine."""
+
+    def __init__(self, engine):
+        self.statements = 0
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(WRITE_VERBS):
+            self.statements += 1
+
+
+def _total_changes(db) -> int:
+    """Rows inserted, updated or deleted so far on the session's SQLite connection."""
+    return db.connection().connection.driver_connection.total_changes
+
+
+def _edits(lines: int) -> Dict[str, Callable[[List[dict]], List[dict]]]:
+    def change_one(items):
+        items[lines // 2]["quantity"] += 1
+        return items
+
+    def append_one(items):
+        return items + [{"description": "Extra line", "quantity": 1, "rate": 10.0}]
+
+    def remove_one(items):
+        return items[:-1]
+
+    def strip_ids(items):
+        return [{key: value for key, value in item.items() if key != "id"} for item in items]
+
+    return {
+        "resend unchanged": lambda items: items,
+        "change 1 line": change_one,
+        "append 1 line": append_one,
+        "remove 1 line": remove_one,
+        "change 1 line, no ids": lambda items: strip_ids(change_one(items)),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure write amplification of invoice item updates")
+    parser.add_argument("--lines", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    from app.database import Base
+    from app.models.invoice import Invoice, InvoiceItem
+    from app.schemas.invoice import InvoiceItemUpdate
+    from app.utils.item_diff import apply_item_diff
+    from benchmarks.datagen import Scale, generate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'item_diff.db'}")
+        Base.metadata.create_all(engine)
+        generate(engine, Scale(1, 1, 1, 1, 0, 0.0, 0.0, 0.0), seed=7)
+        Session = sessionmaker(bind=engine)
+        counter = StatementCounter(engine)
+
+        def reset_items(db, invoice_id):
+            db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice_id).delete()
+            db.add_all(
+                InvoiceItem(invoice_id=invoice_id, description=f"Line {n}", quantity=1 + n % 5,
+                            rate=10.0 + n, amount=(1 + n % 5) * (10.0 + n))
+                for n in range(args.lines)
+            )
+            db.commit()
+
+        def current_items(db, invoice_id):
+            return [
+                {"id": item.id, "description": item.description, "quantity": item.quantity, "rate": item.rate}
+                for item in db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice_id).order_by(InvoiceItem.id)
+            ]
+
+        def replace_all(db, invoice_id, items):
+            db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice_id).delete()
+            db.add_all(
+                InvoiceItem(invoice_id=invoice_id, description=item.description, quantity=item.quantity,
+                            rate=item.rate, amount=item.quantity * item.rate)
+                for item in items
+            )
+
+        def diff_items(db, invoice_id, items):
+            existing = db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice_id).all()
+            apply_item_diff(db, existing, items, lambda **values: InvoiceItem(invoice_id=invoice_id, **values))
+
+        print(f"{args.lines}-line invoice: write statements / rows written")
+        print(f"{'edit':<24}{'delete+reinsert':>18}{'item diff':>14}")
+        for name, edit in _edits(args.lines).items():
+            results = []
+            for strategy in (replace_all, diff_items):
+                db = Session()
+                invoice_id = db.query(Invoice.id).scalar()
+                reset_items(db, invoice_id)
+                items = [InvoiceItemUpdate(**item) for item in edit(current_items(db, invoice_id))]
+                counter.statements = 0
+                changes_before = _total_changes(db)
+                strategy(db, invoice_id, items)
+                db.flush()
+                results.append(f"{counter.statements} / {_total_changes(db) - changes_before}")
+                db.commit()
+                db.close()
+            print(f"{name:<24}{results[0]:>18}{results[1]:>14}")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Scripted load harness.
+
+Logs in as a synthetic user (see benchmarks.datagen), then drives the main
+read endpoints with a fixed number of concurrent workers and records per
+endpoint latency percentiles and throughput. Results are written as JSON,
+tagged with the current git commit, so runs can be diffed with
+``python -m benchmarks.compare``.
+
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --duration 30 --output run.json
+    python -m benchmarks.loadtest --in-process --requests 200   # no server needed
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_ENDPOINTS = [
+    "/api/dashboard/stats",
+    "/api/dashboard/profit",
+    "/api/invoices",
+    "/api/clients",
+    "/api/expenses",
+    "/api/expenses/summary/overview",
+    "/api/recurring-invoices",
+    "/api/templates",
+    "/api/expense-categories",
+    "/api/reports/top-clients",
+    "/api/reports/late-paying-clients",
+    "/api/reports/revenue",
+    "/api/reports/profit-analysis",
+    "/api/reports/expenses/by-category",
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies_ms: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies_ms)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": len(ordered) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(ordered) if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50),
+        "p95_ms": percentile(ordered, 95),
+        "p99_ms": percentile(ordered, 99),
+        "max_ms": ordered[-1] if ordered else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    endpoints: List[str],
+    concurrency: int,
+    duration: Optional[float],
+    total_requests: Optional[int],
+    warmup: int,
+) -> dict:
+    latencies: Dict[str, List[float]] = {endpoint: [] for endpoint in endpoints}
+    errors: Dict[str, int] = {endpoint: 0 for endpoint in endpoints}
+    issued = 0
+
+    for endpoint in endpoints:
+        for _ in range(warmup):
+            await client.get(endpoint)
+
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    def next_endpoint() -> Optional[str]:
+        nonlocal issued
+        if total_requests is not None and issued >= total_requests:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        endpoint = endpoints[issued % len(endpoints)]
+        issued += 1
+        return endpoint
+
+    async def worker():
+        while True:
+            endpoint = next_endpoint()
+            if endpoint is None:
+                return
+            request_started = time.perf_counter()
+            try:
+                response = await client.get(endpoint)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            elapsed_ms = (time.perf_counter() - request_started) * 1000
+            if ok:
+                latencies[endpoint].append(elapsed_ms)
+            else:
+                errors[endpoint] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed_s": elapsed,
+        "overall": summarize(all_latencies, sum(errors.values()), elapsed),
+        "endpoints": {
+            endpoint: summarize(latencies[endpoint], errors[endpoint], elapsed)
+            for endpoint in endpoints
+        },
+    }
+
+
+async def main_async(args) -> dict:
+    if args.in_process:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        base_url = "http://benchmark"
+    else:
+        transport = None
+        base_url = args.base_url
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        token = args.token or await _login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+        result = await run_load(
+            client,
+            args.endpoints or DEFAULT_ENDPOINTS,
+            args.concurrency,
+            None if args.requests else args.duration,
+            args.requests,
+            args.warmup,
+        )
+
+    result["meta"] = {
+        "commit": _git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "base_url": base_url,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+    }
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Drive the API and record latency percentiles")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="Call app.main:app through ASGI instead of HTTP")
+    parser.add_argument("--email", default="bench-user-1@example.com")
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--token", help="Use this bearer token instead of logging in")
+    parser.add_argument("--endpoint", dest="endpoints", action="append", help="Endpoint to include (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run (ignored with --requests)")
+    parser.add_argument("--requests", type=int, help="Total number of requests to issue")
+    parser.add_argument("--warmup", type=int, default=1, help="Warm-up requests per endpoint")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(main_async(args))
+
+    print(f"{'endpoint':<40} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for endpoint, stats in list(result["endpoints"].items()) + [("overall", result["overall"])]:
+        print(
+            f"{endpoint:<40} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
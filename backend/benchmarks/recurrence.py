@@ -0,0 +1,93 @@
+"""
+Recurrence engine throughput (app.utils.recurring_invoice_utils).
+
+Builds N random schedules (100k by default) across every frequency. It then
+times expanding all of them over a horizon three ways: stepping with
+calculate_next_date one date at a time, expand_schedules() in pure Python,
+and expand_schedules() with numpy. It also times single-template
+expand_schedule() calls, which the preview endpoint makes.
+
+    python -m benchmarks.recurrence --schedules 100000 --years 2
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import List, Optional
+
+FREQUENCIES = ("daily", "weekly", "weekly", "monthly", "monthly", "monthly", "quarterly", "yearly")
+
+
+def _timed(label: str, fn, occurrences: Optional[int] = None, repeat: int = 3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    occurrences = occurrences if occurrences is not None else len(result[0])
+    print(f"{label:<40}{best * 1000:>10.1f} ms{occurrences / best:>16,.0f} dates/s")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time batch expansion of recurring invoice schedules")
+    parser.add_argument("--schedules", type=int, default=100000)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--previews", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    from app.utils import recurring_invoice_utils as recurrence
+
+    rng = random.Random(46)
+    today = date.today()
+    until = today + timedelta(days=365 * args.years)
+    rules = []
+    for _ in range(args.schedules):
+        frequency = rng.choice(FREQUENCIES)
+        rules.append((
+            today - timedelta(days=rng.randrange(0, 720)),
+            frequency,
+            rng.choice((1, 1, 1, 2, 3)) if frequency != "daily" else rng.choice((7, 14, 30)),
+            rng.randrange(7) if frequency == "weekly" else None,
+            rng.randrange(1, 32) if frequency == "monthly" else None,
+        ))
+    columns = list(zip(*rules))
+    from_dates = [today] * len(rules)
+
+    def stepwise():
+        # One calculate_next_date call per date, the way templates were walked before
+        indexes, ordinals = [], []
+        for index, (start, frequency, interval, day_of_week, day_of_month) in enumerate(rules):
+            current = recurrence.calculate_next_date(start, frequency, interval, day_of_week, day_of_month)
+            while current <= until:
+                if current >= today:
+                    indexes.append(index)
+                    ordinals.append(current.toordinal())
+                current = recurrence.calculate_next_date(current, frequency, interval, day_of_week, day_of_month)
+        return indexes, ordinals
+
+    def expand():
+        return recurrence.expand_schedules(*columns, until, from_dates)
+
+    print(f"{args.schedules} schedules, {args.years}-year horizon")
+    print(f"{'operation':<40}{'best of 3':>13}{'throughput':>19}")
+    numpy = recurrence.np
+    _timed("step with calculate_next_date", stepwise, repeat=1)
+    previews = rules[:args.previews]
+    preview = lambda: [recurrence.expand_schedule(*rule, 20, from_date=today) for rule in previews]  # noqa: E731
+    recurrence.np = None
+    try:
+        _timed("expand_schedules (pure Python)", expand, repeat=1)
+        _timed(f"{len(previews)} x expand_schedule (pure Python)", preview, 20 * len(previews), repeat=1)
+    finally:
+        recurrence.np = numpy
+    if numpy is not None:
+        indexes, _ = _timed("expand_schedules (numpy)", expand)
+        _timed(f"{len(previews)} x expand_schedule (numpy)", preview, 20 * len(previews), repeat=1)
+        print(f"{len(indexes)} occurrences")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark of the invoice list read path.
+
+Seeds a throwaway SQLite database with one user owning N invoices, then
+times the two ways of producing the /api/invoices body:
+
+  * orm:  ORM instances + lazy client/items loads + InvoiceResponse
+          validation + stdlib JSON rendering (the previous path)
+  * slim: column-only SELECTs into dict rows (app.utils.read_models)
+          + orjson rendering (FastJSONResponse)
+
+and checks both produce the same JSON document.
+
+    python -m benchmarks.serialization --invoices 10000 --repeat 3
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def _time(fn, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare ORM and slim invoice list serialization")
+    parser.add_argument("--invoices", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from app.database import Base
+    from app.models.invoice import Invoice
+    from app.schemas.invoice import InvoiceResponse
+    from app.utils.fast_json import FastJSONResponse
+    from app.utils.read_models import fetch_invoice_rows
+    from benchmarks.datagen import Scale, generate
+
+    clients = max(args.invoices // 100, 1)
+    scale = Scale(1, clients, args.invoices // clients, 3, 0, 0.0, 0.0, 0.0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'serialization.db'}")
+        Base.metadata.create_all(engine)
+        generate(engine, scale, seed=7)
+        Session = sessionmaker(bind=engine)
+        adapter = TypeAdapter(List[InvoiceResponse])
+
+        def orm_path() -> bytes:
+            db = Session()
+            try:
+                invoices = db.query(Invoice).join(Invoice.client).order_by(Invoice.created_at.desc()).all()
+                for invoice in invoices:
+                    invoice.balance = invoice.total_amount - invoice.paid_amount
+                payload = adapter.dump_python(adapter.validate_python(invoices, from_attributes=True), mode="json")
+                return JSONResponse(payload).body
+            finally:
+                db.close()
+
+        def slim_path() -> bytes:
+            db = Session()
+            try:
+                query = db.query(Invoice).join(Invoice.client).order_by(Invoice.created_at.desc())
+                return FastJSONResponse(fetch_invoice_rows(db, query)).body
+            finally:
+                db.close()
+
+        if json.loads(orm_path()) != json.loads(slim_path()):
+            raise SystemExit("orm and slim paths produced different documents")
+
+        results = {"orm": _time(orm_path, args.repeat), "slim": _time(slim_path, args.repeat)}
+        engine.dispose()
+
+    print(f"{args.invoices} invoices, {args.repeat} runs")
+    for name, timings in results.items():
+        print(f"{name:<6} median {statistics.median(timings):>9.1f}ms  min {min(timings):>9.1f}ms")
+    speedup = statistics.median(results["orm"]) / statistics.median(results["slim"])
+    print(f"speedup {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
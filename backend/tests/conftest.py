@@ -0,0 +1,74 @@
+"""
+Shared setup for the unit tests.
+
+Settings are read when ``app`` is first imported, so the environment is put
+in place here. The perf suite's conftest may have set it already. App
+modules are imported inside the fixtures, after the environment is set.
+"""
+import os
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='invoice-tests-')}/unused.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALLOWED_ORIGINS", "*")
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("MAIL_USERNAME", "test@example.com")
+os.environ.setdefault("MAIL_PASSWORD", "testpassword")
+os.environ.setdefault("MAIL_FROM", "test@example.com")
+os.environ.setdefault("MAIL_PORT", "587")
+os.environ.setdefault("MAIL_SERVER", "smtp.test.com")
+os.environ.setdefault("MAIL_FROM_NAME", "Test Sender")
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+
+@pytest.fixture
+def api(tmp_path):
+    """A TestClient on an empty database, and auth headers and a client id for two users."""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+
+    from app.database import Base, SessionLocal, get_db
+    from app.main import app
+    from app.models.client import Client
+    from app.models.user import User
+    from app.utils.auth import create_access_token, get_password_hash
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'invoices.db'}")
+    Base.metadata.create_all(engine)
+
+    def get_test_db():
+        # SessionLocal keeps the tenant-scope hook; only the bind changes
+        db = SessionLocal(bind=engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    db = SessionLocal(bind=engine)
+    users = []
+    for index in (1, 2):
+        user = User(name=f"User {index}", email=f"user{index}@example.com", password_hash=get_password_hash("x"))
+        db.add(user)
+        db.flush()
+        client = Client(name=f"Client {index}", email=f"client{index}@example.com", created_by=user.id)
+        db.add(client)
+        db.flush()
+        users.append(({"Authorization": f"Bearer {create_access_token({'user_id': user.id})}"}, client.id))
+    db.commit()
+    db.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    try:
+        yield TestClient(app), users, engine
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
@@ -0,0 +1,133 @@
+"""
+Fixtures for the performance regression suite.
+
+The database is a SQLite file seeded once per session with
+benchmarks.datagen, and every test issues requests through FastAPI's
+TestClient against it. SQL statements are counted with a cursor event
+listener on the application engine.
+"""
+import os
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+_SNAPSHOT_DIR = tempfile.mkdtemp(prefix="invoice-perf-")
+
+# Settings are read at import time, so the environment must be in place before `app` is imported.
+os.environ["DATABASE_URL"] = f"sqlite:///{_SNAPSHOT_DIR}/snapshot.db"
+os.environ.setdefault("SECRET_KEY", "perf-test-secret")
+os.environ.setdefault("ALLOWED_ORIGINS", "*")
+os.environ["ENVIRONMENT"] = "test"
+os.environ["PDF_CACHE_DIR"] = f"{_SNAPSHOT_DIR}/pdf_cache"
+os.environ.setdefault("MAIL_USERNAME", "test@example.com")
+os.environ.setdefault("MAIL_PASSWORD", "testpassword")
+os.environ.setdefault("MAIL_FROM", "test@example.com")
+os.environ.setdefault("MAIL_PORT", "587")
+os.environ.setdefault("MAIL_SERVER", "smtp.test.com")
+os.environ.setdefault("MAIL_FROM_NAME", "Test Sender")
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+
+class QueryCounter:
+    """Counts SQL statements issued on an engine while active."""
+
+    def __init__(self):
+        self.count = 0
+        self.active = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.count += 1
+
+    def start(self):
+        self.count = 0
+        self.active = True
+
+    def stop(self) -> int:
+        self.active = False
+        return self.count
+
+
+@pytest.fixture(scope="session")
+def seeded_app():
+    """Build the snapshot database once and return the FastAPI app bound to it."""
+    from sqlalchemy import event
+
+    from app.database import engine, SessionLocal
+    from app.main import app
+    from app.models.client import Client
+    from app.models.reminder import ReminderSetting
+    from app.utils.auth import get_password_hash
+    from benchmarks.datagen import SCALES, generate
+
+    generate(engine, SCALES["small"], seed=1234)
+
+    db = SessionLocal()
+    try:
+        portal_client = db.query(Client).filter(Client.created_by == 1).order_by(Client.id).first()
+        portal_client.is_portal_enabled = True
+        portal_client.password_hash = get_password_hash("benchmark")
+        db.add(ReminderSetting(user_id=1))
+        db.commit()
+    finally:
+        db.close()
+
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    app.state.perf_query_counter = counter
+    yield app
+    event.remove(engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture(scope="session")
+def perf_client(seeded_app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(seeded_app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def query_counter(seeded_app) -> QueryCounter:
+    return seeded_app.state.perf_query_counter
+
+
+@pytest.fixture(scope="session")
+def seed_ids(seeded_app) -> dict:
+    """Primary keys of representative rows owned by the first synthetic user."""
+    from app.database import SessionLocal
+    from app.models.client import Client
+    from app.models.expense import Expense
+    from app.models.expense_category import ExpenseCategory
+    from app.models.invoice import Invoice
+    from app.models.recurring_invoice import RecurringInvoice
+
+    db = SessionLocal()
+    try:
+        return {
+            "client_id": db.query(Client.id).filter(Client.created_by == 1).order_by(Client.id).first()[0],
+            "invoice_id": db.query(Invoice.id).filter(Invoice.created_by == 1).order_by(Invoice.id).first()[0],
+            "recurring_id": db.query(RecurringInvoice.id).filter(RecurringInvoice.created_by == 1).order_by(RecurringInvoice.id).first()[0],
+            "expense_id": db.query(Expense.id).filter(Expense.created_by == 1).order_by(Expense.id).first()[0],
+            "category_id": db.query(ExpenseCategory.id).filter(ExpenseCategory.created_by == 1).order_by(ExpenseCategory.id).first()[0],
+        }
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def auth_headers(seed_ids) -> dict:
+    """Bearer headers for the first synthetic user and their portal-enabled client."""
+    from app.utils.auth import create_access_token
+
+    return {
+        "user": {"Authorization": f"Bearer {create_access_token({'user_id': 1})}"},
+        "client": {"Authorization": f"Bearer {create_access_token({'client_id': seed_ids['client_id']})}"},
+    }
@@ -0,0 +1,144 @@
+"""
+Query-count and latency budgets for the read endpoints.
+
+Every endpoint in ENDPOINTS is called against the seeded snapshot and must
+stay within the SQL statement count and median wall time recorded in
+baseline.json. After an intentional change, refresh the budgets with
+
+    PERF_UPDATE_BASELINE=1 python -m pytest tests/perf
+
+and commit the updated baseline.json alongside the change.
+"""
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+UPDATE_BASELINE = os.getenv("PERF_UPDATE_BASELINE") == "1"
+
+# Timed repetitions per endpoint; the median is compared against the budget.
+TIMED_RUNS = 3
+# Headroom applied when writing budgets, so that slower CI machines don't flake.
+QUERY_HEADROOM = 0
+LATENCY_FACTOR = 3.0
+LATENCY_FLOOR_MS = 50.0
+
+# (auth, path) - path placeholders are filled from the seed_ids fixture.
+ENDPOINTS = [
+    ("user", "/api/auth/profile"),
+    ("user", "/api/dashboard/stats"),
+    ("user", "/api/dashboard/profit"),
+    ("user", "/api/invoices"),
+    ("user", "/api/invoices/{invoice_id}"),
+    ("user", "/api/invoices/{invoice_id}/email-history"),
+    ("user", "/api/invoices/{invoice_id}/pdf"),
+    ("user", "/api/invoices?fields=id,invoice_number,status,total_amount,balance,client.name&include=client"),
+    ("user", "/api/invoices/{invoice_id}?fields=id,status,total_amount&include=items"),
+    ("user", "/api/invoices?include=client,items,template_config"),
+    ("user", "/api/clients"),
+    ("user", "/api/clients/{client_id}"),
+    ("user", "/api/clients/{client_id}/deposit-history"),
+    ("user", "/api/clients/deposit-history/all"),
+    ("user", "/api/expenses"),
+    ("user", "/api/expenses/{expense_id}"),
+    ("user", "/api/expenses?fields=id,date,amount,category.name&include=category"),
+    ("user", "/api/expenses/summary/overview"),
+    ("user", "/api/expenses/export/csv"),
+    ("user", "/api/expense-categories"),
+    ("user", "/api/expense-categories/{category_id}"),
+    ("user", "/api/expense-categories/{category_id}/usage-stats"),
+    ("user", "/api/recurring-invoices"),
+    ("user", "/api/recurring-invoices/stats"),
+    ("user", "/api/recurring-invoices/{recurring_id}"),
+    ("user", "/api/recurring-invoices?fields=id,template_name,next_due_date&include="),
+    ("user", "/api/recurring-invoices/{recurring_id}/preview"),
+    ("user", "/api/recurring-invoices/{recurring_id}/history"),
+    ("user", "/api/templates"),
+    ("user", "/api/templates/default/current"),
+    ("user", "/api/templates/predefined/list"),
+    ("user", "/api/reminders/settings"),
+    ("user", "/api/reminders/{invoice_id}/history"),
+    ("user", "/api/reports/late-paying-clients"),
+    ("user", "/api/reports/top-clients"),
+    ("user", "/api/reports/revenue"),
+    ("user", "/api/reports/expenses/by-category"),
+    ("user", "/api/reports/expenses/by-vendor"),
+    ("user", "/api/reports/profit-analysis"),
+    ("user", "/api/reports/tax-deductible-expenses"),
+    ("user", "/api/reports/ar-aging"),
+    ("user", "/api/reports/ar-aging/invoices?bucket=days_over_90"),
+    ("user", "/api/reports/cash-forecast"),
+    ("user", "/api/sync"),
+    ("user", "/api/sync?cursor=0"),
+    ("client", "/api/client-portal/dashboard"),
+    ("client", "/api/client-portal/invoices"),
+    ("client", "/api/client-portal/payments"),
+]
+
+
+def _load_baseline() -> dict:
+    if not BASELINE_PATH.exists():
+        return {}
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+_baseline = _load_baseline()
+_measured = {}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _write_baseline():
+    yield
+    if UPDATE_BASELINE and _measured:
+        budgets = dict(_baseline)
+        budgets.update(_measured)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(budgets.items())), f, indent=2)
+            f.write("\n")
+
+
+@pytest.mark.parametrize("auth,path", ENDPOINTS, ids=[path for _, path in ENDPOINTS])
+def test_endpoint_within_budget(auth, path, perf_client, query_counter, seed_ids, auth_headers):
+    from app.utils.response_cache import response_cache
+
+    url = path.format(**seed_ids)
+    headers = auth_headers[auth]
+
+    # Every call runs the endpoint; a response-cache hit would only time the LRU.
+    # The first call is untimed; it doubles as the query-count measurement.
+    response_cache.clear()
+    query_counter.start()
+    response = perf_client.get(url, headers=headers)
+    queries = query_counter.stop()
+    assert response.status_code == 200, f"GET {url} returned {response.status_code}: {response.text[:200]}"
+
+    timings = []
+    for _ in range(TIMED_RUNS):
+        response_cache.clear()
+        started = time.perf_counter()
+        perf_client.get(url, headers=headers)
+        timings.append((time.perf_counter() - started) * 1000)
+    median_ms = statistics.median(timings)
+
+    if UPDATE_BASELINE:
+        _measured[path] = {
+            "max_queries": queries + QUERY_HEADROOM,
+            "max_ms": round(max(median_ms * LATENCY_FACTOR, LATENCY_FLOOR_MS)),
+        }
+        return
+
+    budget = _baseline.get(path)
+    if budget is None:
+        pytest.fail(f"No budget for {path} in {BASELINE_PATH.name}; run with PERF_UPDATE_BASELINE=1")
+
+    assert queries <= budget["max_queries"], (
+        f"GET {path} issued {queries} SQL statements (budget {budget['max_queries']})"
+    )
+    assert median_ms <= budget["max_ms"], (
+        f"GET {path} took {median_ms:.1f}ms median (budget {budget['max_ms']}ms)"
+    )
@@ -0,0 +1,33 @@
+"""
+/api/batch (app.routers.batch, app.utils.batch) against an empty database
+from the ``api`` fixture.
+"""
+
+
+def run_batch(client, headers, *paths):
+    return client.post("/api/batch", headers=headers, json={
+        "requests": [{"id": str(index), "path": path} for index, path in enumerate(paths)]
+    })
+
+
+def test_binary_endpoints_are_refused(api):
+    client, [(headers, _), _], _ = api
+
+    for path in ("/api/invoices/1/pdf", "/api/invoices/export/1/download", "/api/admin/profiling/reports/x.html"):
+        response = run_batch(client, headers, "/api/clients", path)
+        assert response.status_code == 400, path
+        assert "cannot be batched" in response.json()["detail"]
+
+
+def test_non_json_sub_response_gets_406_entry(api):
+    client, [(headers, _), _], _ = api
+
+    response = run_batch(client, headers, "/api/expenses/export/csv", "/api/clients")
+    assert response.status_code == 200
+    csv_entry, clients_entry = response.json()["responses"]
+    assert csv_entry == {
+        "id": "0", "path": "/api/expenses/export/csv", "status": 406,
+        "body": {"detail": "Only JSON responses can be batched"},
+    }
+    assert clients_entry["status"] == 200
+    assert [client["name"] for client in clients_entry["body"]] == ["Client 1"]
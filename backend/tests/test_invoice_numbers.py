@@ -0,0 +1,97 @@
+"""
+Invoice number allocation (app.utils.invoice_numbers) and imported invoice
+numbers (app.utils.invoice_import).
+
+Each test gets an empty SQLite database from the ``api`` fixture (see
+conftest.py), so the counter row is created on first use.
+"""
+from datetime import date
+
+from sqlalchemy.exc import OperationalError
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.utils import invoice_import
+from app.utils.invoice_numbers import next_invoice_numbers
+from app.utils.tenancy import scope_session_to_user
+
+
+def invoice_payload(client_id: int, **fields) -> dict:
+    return {
+        "client_id": client_id,
+        "issue_date": date(2026, 1, 15).isoformat(),
+        "due_date": date(2026, 2, 14).isoformat(),
+        "items": [{"description": "Consulting", "quantity": 1, "rate": 100.0}],
+        **fields,
+    }
+
+
+def test_create_after_import_skips_imported_number(api):
+    client, [(headers, client_id), _], _ = api
+
+    # An imported number ahead of the counter, which starts after the highest id (1)...
+    response = client.post("/api/invoices/bulk", headers=headers, json={
+        "invoices": [invoice_payload(client_id, invoice_number="INV-00003")]
+    })
+    assert response.json() == {"created": 1, "failed": 0, "errors": []}
+
+    # ...is skipped when single invoices reach it
+    numbers = []
+    for _ in range(3):
+        response = client.post("/api/invoices", headers=headers, json=invoice_payload(client_id))
+        assert response.status_code == 201, response.text
+        numbers.append(response.json()["invoice_number"])
+    assert numbers == ["INV-00002", "INV-00004", "INV-00005"]
+
+
+def test_users_draw_from_one_counter(api):
+    client, users, _ = api
+
+    numbers = []
+    for headers, client_id in users + users:
+        response = client.post("/api/invoices", headers=headers, json=invoice_payload(client_id))
+        assert response.status_code == 201, response.text
+        numbers.append(response.json()["invoice_number"])
+    assert numbers == ["INV-00001", "INV-00002", "INV-00003", "INV-00004"]
+
+
+def test_allocations_are_disjoint_across_sessions(api):
+    _, _, engine = api
+    first, second = SessionLocal(bind=engine), SessionLocal(bind=engine)
+    try:
+        block = next_invoice_numbers(first, 5)
+        first.commit()
+        assert next_invoice_numbers(second, 5, taken=["INV-00007"]) == [
+            "INV-00006", "INV-00008", "INV-00009", "INV-00010", "INV-00011"
+        ]
+        assert block == [f"INV-{value:05d}" for value in range(1, 6)]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_rolled_back_chunk_can_be_imported_again(api, monkeypatch):
+    _, [(_, client_id), _], engine = api
+    db = SessionLocal(bind=engine)
+    try:
+        user = db.query(User).order_by(User.id).first()
+        scope_session_to_user(db, user.id)
+        rows = [(1, invoice_payload(client_id, invoice_number="IMP-1")), (2, invoice_payload(client_id))]
+
+        bulk_insert = invoice_import.bulk_insert
+
+        def fail_once(connection, table, values):
+            monkeypatch.setattr(invoice_import, "bulk_insert", bulk_insert)
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+        monkeypatch.setattr(invoice_import, "bulk_insert", fail_once)
+        importer = invoice_import.InvoiceImporter(db, user)
+        importer.import_chunk(rows)
+        assert importer.created == 0
+
+        # The retry sends the same explicit number and is accepted
+        importer.import_chunk(rows)
+        assert importer.created == 2
+        assert [error["row"] for error in importer.errors] == [1, 2]
+    finally:
+        db.close()
@@ -0,0 +1,74 @@
+"""
+Size cap of the invoice PDF disk cache (app.utils.invoice_pdf).
+
+The cache directory and cap are patched per test. Files get explicit mtimes
+so the sweep's least-recently-used order doesn't depend on timing.
+"""
+import os
+import time
+
+import pytest
+
+from app.config import settings
+from app.utils import invoice_pdf
+
+KB = 2 ** 10
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PDF_CACHE_MAX_MB", 1)
+    monkeypatch.setattr(invoice_pdf, "_written_since_sweep", 0)
+    return tmp_path
+
+
+def key(index: int) -> str:
+    return f"{index:02x}" * 32
+
+
+def age(index: int, seconds: float) -> None:
+    stamp = time.time() - seconds
+    os.utime(invoice_pdf._cache_path(key(index)), (stamp, stamp))
+
+
+def test_sweep_removes_least_recently_used_first(cache, monkeypatch):
+    # Keep store_pdf from sweeping on its own while the cache is filled
+    monkeypatch.setattr(settings, "PDF_CACHE_MAX_MB", 0)
+    for index in range(12):
+        invoice_pdf.store_pdf(key(index), b"%" * (100 * KB))
+        age(index, 1000 - index)
+    monkeypatch.setattr(settings, "PDF_CACHE_MAX_MB", 1)
+
+    # A cache hit makes the oldest file the most recently used
+    assert invoice_pdf.cached_pdf(key(0)) is not None
+
+    assert invoice_pdf.sweep_pdf_cache() == 3
+    remaining = sorted(path.stem for path in cache.glob("*/*.pdf"))
+    assert remaining == sorted(key(index) for index in [0, 4, 5, 6, 7, 8, 9, 10, 11])
+
+
+def test_store_sweeps_once_a_tenth_of_the_cap_is_written(cache):
+    for index in range(30):
+        invoice_pdf.store_pdf(key(index), b"%" * (50 * KB))
+        age(index, 1000 - index)
+
+    total = sum(path.stat().st_size for path in cache.glob("*/*.pdf"))
+    assert total <= 2 ** 20
+    assert invoice_pdf.cached_pdf(key(29)) is not None
+    assert invoice_pdf.cached_pdf(key(0)) is None
+
+
+def test_sweep_removes_stale_temporary_files(cache):
+    invoice_pdf.store_pdf(key(1), b"%PDF")
+    stale = cache / key(1)[:2] / "crashed.tmp"
+    fresh = cache / key(1)[:2] / "writing.tmp"
+    stale.write_bytes(b"partial")
+    fresh.write_bytes(b"partial")
+    stamp = time.time() - invoice_pdf.STALE_TEMPORARY_SECONDS - 1
+    os.utime(stale, (stamp, stamp))
+
+    invoice_pdf.sweep_pdf_cache()
+    assert not stale.exists()
+    assert fresh.exists()
+    assert invoice_pdf.cached_pdf(key(1)) == b"%PDF"
@@ -0,0 +1,161 @@
+"""
+Property tests for the recurrence engine (app.utils.recurring_invoice_utils).
+
+Random schedules from a seeded generator are checked against a reference
+implementation that walks the calendar one step at a time. Every check runs
+against the numpy path and against the pure-Python fallback.
+"""
+import calendar
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.utils import recurring_invoice_utils as recurrence  # noqa: E402
+
+CASES = 400
+FREQUENCIES = ("daily", "weekly", "monthly", "quarterly", "yearly")
+
+
+def reference_dates(start, frequency, interval, day_of_week, day_of_month, until):
+    """Occurrences up to ``until``, found by stepping through the calendar."""
+    dates = []
+    if frequency == "daily":
+        current = start + timedelta(days=interval)
+        while current <= until:
+            dates.append(current)
+            current += timedelta(days=interval)
+        return dates
+
+    if frequency == "weekly":
+        target = start.weekday() if day_of_week is None else day_of_week
+        current = start + timedelta(days=1)
+        while current.weekday() != target:
+            current += timedelta(days=1)
+        current += timedelta(weeks=interval - 1)
+        while current <= until:
+            dates.append(current)
+            current += timedelta(weeks=interval)
+        return dates
+
+    step = interval * {"monthly": 1, "quarterly": 3, "yearly": 12}[frequency]
+    day = day_of_month if frequency == "monthly" and day_of_month is not None else start.day
+    year, month, months = start.year, start.month, 0
+    while True:
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+        months += 1
+        if months % step:
+            continue
+        current = date(year, month, min(day, calendar.monthrange(year, month)[1]))
+        if current > until:
+            return dates
+        dates.append(current)
+
+
+def random_schedule(rng):
+    frequency = rng.choice(FREQUENCIES)
+    start = date(2020, 1, 1) + timedelta(days=rng.randrange(0, 3000))
+    if rng.random() < 0.3:
+        # Month ends are where calendar arithmetic goes wrong
+        start = date(start.year, start.month, calendar.monthrange(start.year, start.month)[1])
+    interval = rng.choice((1, 1, 1, 2, 3, 5))
+    day_of_week = rng.choice((None, rng.randrange(7))) if frequency == "weekly" else None
+    day_of_month = rng.choice((None, rng.randrange(1, 32))) if frequency == "monthly" else None
+    return start, frequency, interval, day_of_week, day_of_month
+
+
+def horizon(frequency, interval):
+    return {"daily": 60, "weekly": 400, "monthly": 1500, "quarterly": 4000, "yearly": 9000}[frequency] * interval
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch):
+    if request.param == "numpy":
+        if recurrence.np is None:
+            pytest.skip("numpy is not installed")
+    else:
+        monkeypatch.setattr(recurrence, "np", None)
+    return recurrence
+
+
+def test_expand_schedule_matches_reference(engine):
+    rng = random.Random(46)
+    for _ in range(CASES):
+        rule = random_schedule(rng)
+        count = rng.randrange(0, 25)
+        expected = reference_dates(*rule, rule[0] + timedelta(days=horizon(rule[1], rule[2])))[:count]
+        assert engine.expand_schedule(*rule, count) == expected, rule
+
+
+def test_expand_schedule_limits(engine):
+    rng = random.Random(47)
+    for _ in range(CASES):
+        rule = random_schedule(rng)
+        dates = reference_dates(*rule, rule[0] + timedelta(days=horizon(rule[1], rule[2])))
+        end_date = rng.choice(dates[:20])
+        max_occurrences = rng.randrange(1, 20)
+        from_date = rng.choice(dates[:10]) - timedelta(days=rng.randrange(0, 3))
+
+        assert engine.expand_schedule(*rule, 50, end_date=end_date) == [due for due in dates if due <= end_date]
+        assert engine.expand_schedule(*rule, 50, max_occurrences=max_occurrences) == dates[:max_occurrences]
+        assert engine.expand_schedule(*rule, 5, from_date=from_date) == [due for due in dates if due >= from_date][:5]
+
+
+def test_next_occurrence_after(engine):
+    rng = random.Random(48)
+    for _ in range(CASES):
+        rule = random_schedule(rng)
+        dates = reference_dates(*rule, rule[0] + timedelta(days=horizon(rule[1], rule[2])))
+        after = rule[0] + timedelta(days=rng.randrange(-40, (dates[10] - rule[0]).days))
+        assert engine.next_occurrence_after(*rule, after) == min(due for due in dates if due > after), (rule, after)
+
+
+def test_expand_schedules_matches_reference(engine):
+    rng = random.Random(49)
+    rules = [random_schedule(rng) for _ in range(CASES)]
+    until = date(2030, 6, 30)
+    from_dates = [rng.choice((None, start + timedelta(days=rng.randrange(0, 2000)))) for start, *_ in rules]
+    end_dates = [rng.choice((None, date(2026, 1, 1) + timedelta(days=rng.randrange(0, 2000)))) for _ in rules]
+    remaining = [rng.choice((None, rng.randrange(-1, 30))) for _ in rules]
+
+    indexes, ordinals = engine.expand_schedules(*zip(*rules), until, from_dates, end_dates, remaining)
+    actual = {}
+    for index, ordinal in zip(list(indexes), list(ordinals)):
+        actual.setdefault(int(index), []).append(date.fromordinal(int(ordinal)))
+
+    for index, rule in enumerate(rules):
+        dates = reference_dates(*rule, min(until, end_dates[index] or until))
+        if from_dates[index] is not None:
+            dates = [due for due in dates if due >= from_dates[index]]
+        if remaining[index] is not None:
+            dates = dates[:max(remaining[index], 0)]
+        assert sorted(actual.get(index, [])) == dates, rule
+
+
+def test_month_schedules_keep_their_day():
+    rng = random.Random(50)
+    for _ in range(CASES):
+        start, frequency, interval, _, day_of_month = random_schedule(rng)
+        if frequency not in recurrence.MONTH_STEPS:
+            continue
+        day = day_of_month if frequency == "monthly" and day_of_month is not None else start.day
+        dates = recurrence.expand_schedule(start, frequency, interval, None, day_of_month, 24)
+        for previous, current in zip(dates, dates[1:]):
+            months = (current.year - previous.year) * 12 + current.month - previous.month
+            assert months == interval * recurrence.MONTH_STEPS[frequency]
+        for due in dates:
+            assert due.day == min(day, calendar.monthrange(due.year, due.month)[1])
+
+
+def test_calculate_next_date_adds_calendar_months():
+    assert recurrence.calculate_next_date(date(2025, 1, 31), "monthly") == date(2025, 2, 28)
+    assert recurrence.calculate_next_date(date(2025, 1, 15), "monthly", 2, day_of_month=10) == date(2025, 3, 10)
+    assert recurrence.calculate_next_date(date(2025, 11, 30), "quarterly") == date(2026, 2, 28)
+    assert recurrence.calculate_next_date(date(2024, 2, 29), "yearly") == date(2025, 2, 28)
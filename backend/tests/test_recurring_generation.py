@@ -0,0 +1,174 @@
+"""
+Recurring invoice generation (app.utils.recurring_generation) on SQLite.
+
+SQLite has no row locks, so concurrent workers rely on the shard leases in
+recurring_generation_leases. The workers here are threads, each with its own
+session and event loop, sharing one database file from the ``api`` fixture.
+"""
+import asyncio
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.database import SessionLocal
+from app.models.client import Client
+from app.models.invoice import Invoice
+from app.models.recurring_generation_lease import RecurringGenerationLease
+from app.models.recurring_invoice import RecurringInvoice, RecurringInvoiceTemplateItem
+from app.utils import recurring_generation
+from app.utils.recurring_generation import generate_due_invoices
+
+TODAY = date(2026, 4, 20)
+SHARDS = 4
+
+
+def add_templates(engine, count: int, **fields) -> list:
+    db = SessionLocal(bind=engine)
+    try:
+        client = db.query(Client).order_by(Client.id).first()
+        templates = []
+        for index in range(count):
+            template = RecurringInvoice(**{
+                "template_name": f"Retainer {index}",
+                "client_id": client.id,
+                "frequency": "monthly",
+                "interval_value": 1,
+                "start_date": date(2026, 1, 15),
+                "next_due_date": date(2026, 4, 15),
+                "created_by": client.created_by,
+                "template_items": [RecurringInvoiceTemplateItem(description="Retainer", quantity=1, rate=100.0, amount=100.0)],
+                **fields,
+            })
+            db.add(template)
+            templates.append(template)
+        db.commit()
+        return [template.id for template in templates]
+    finally:
+        db.close()
+
+
+def run_worker(engine, worker: str, **options) -> dict:
+    db = SessionLocal(bind=engine)
+    try:
+        return asyncio.run(generate_due_invoices(
+            db, today=TODAY, shards=SHARDS, worker=worker, batch_size=options.pop("batch_size", 7), **options
+        ))
+    finally:
+        db.close()
+
+
+def invoices_by_template(engine) -> Counter:
+    db = SessionLocal(bind=engine)
+    try:
+        return Counter(template_id for (template_id,) in db.query(Invoice.recurring_template_id))
+    finally:
+        db.close()
+
+
+def test_concurrent_workers_generate_each_template_once(api):
+    _, _, engine = api
+    template_ids = add_templates(engine, 60)
+
+    start = threading.Barrier(2)
+    results = {}
+
+    def work(name):
+        start.wait()
+        results[name] = run_worker(engine, name)
+
+    threads = [threading.Thread(target=work, args=(name,)) for name in ("worker-a", "worker-b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert invoices_by_template(engine) == Counter({template_id: 1 for template_id in template_ids})
+    assert sum(result["generated"] for result in results.values()) == 60
+    assert all(result["failed"] == 0 for result in results.values())
+
+    db = SessionLocal(bind=engine)
+    try:
+        numbers = [number for (number,) in db.query(Invoice.invoice_number)]
+        assert len(set(numbers)) == 60
+        assert all(not lease.leased_until for lease in db.query(RecurringGenerationLease))
+    finally:
+        db.close()
+
+
+def test_leased_shard_is_skipped_until_the_lease_expires(api):
+    _, _, engine = api
+    template_ids = add_templates(engine, 8)
+    shard_zero = [template_id for template_id in template_ids if template_id % SHARDS == 0]
+
+    with engine.begin() as connection:
+        connection.execute(insert(RecurringGenerationLease.__table__).values(
+            shard=0, worker="crashed", leased_until=datetime.utcnow() + timedelta(minutes=5)
+        ))
+
+    result = run_worker(engine, "worker-a")
+    assert (result["shards"], result["shards_skipped"]) == (SHARDS - 1, 1)
+    assert set(invoices_by_template(engine)) == set(template_ids) - set(shard_zero)
+
+    # Once the crashed worker's lease runs out, the next run takes the shard over
+    with engine.begin() as connection:
+        connection.execute(RecurringGenerationLease.__table__.update().values(
+            leased_until=datetime.utcnow() - timedelta(seconds=1)
+        ))
+    result = run_worker(engine, "worker-b")
+    assert (result["generated"], result["shards_skipped"]) == (len(shard_zero), 0)
+    assert invoices_by_template(engine) == Counter({template_id: 1 for template_id in template_ids})
+
+
+def test_worker_stops_when_its_lease_is_taken_over(api, monkeypatch):
+    _, _, engine = api
+    add_templates(engine, 8)
+    renew_shard = recurring_generation._renew_shard
+
+    def lease_lost(db, shard, worker):
+        # Another worker took over after this one's lease ran out
+        db.connection().execute(RecurringGenerationLease.__table__.update().where(
+            RecurringGenerationLease.shard == shard
+        ).values(worker="other"))
+        return renew_shard(db, shard, worker)
+
+    monkeypatch.setattr(recurring_generation, "_renew_shard", lease_lost)
+    result = run_worker(engine, "worker-a", shard=1)
+    assert (result["generated"], result["batches"]) == (0, 0)
+    assert invoices_by_template(engine) == Counter()
+
+
+def test_retired_templates_draw_no_invoice_numbers(api):
+    _, _, engine = api
+    add_templates(engine, 1, end_date=date(2026, 3, 31))
+    add_templates(engine, 1, occurrences_limit=3, current_occurrence=3)
+    due = add_templates(engine, 2)
+
+    result = run_worker(engine, "worker-a", batch_size=10)
+    assert result["generated"] == 2
+
+    db = SessionLocal(bind=engine)
+    try:
+        numbers = sorted(number for (number,) in db.query(Invoice.invoice_number))
+        assert numbers == ["INV-00001", "INV-00002"]
+        assert db.query(RecurringInvoice).filter(RecurringInvoice.is_active == True).count() == len(due)
+    finally:
+        db.close()
+
+
+def test_missed_periods_are_skipped_not_generated(api):
+    _, _, engine = api
+    [template_id] = add_templates(engine, 1, next_due_date=date(2026, 1, 15))
+
+    run_worker(engine, "worker-a")
+    run_worker(engine, "worker-a")
+
+    assert invoices_by_template(engine) == Counter({template_id: 1})
+    db = SessionLocal(bind=engine)
+    try:
+        template = db.get(RecurringInvoice, template_id)
+        # Three periods behind: one invoice, then the schedule resumes after today
+        assert (template.current_occurrence, template.next_due_date) == (1, date(2026, 5, 15))
+    finally:
+        db.close()
@@ -0,0 +1,89 @@
+"""
+Coalescing in app.utils.single_flight.
+
+The computations are blocking functions gated on threading events, so a test
+decides exactly when each one finishes while callers join, time out or are
+cancelled around it.
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.single_flight import SingleFlight
+
+
+def gated(release: threading.Event, calls: list):
+    def compute(value):
+        calls.append(value)
+        release.wait(5)
+        return value * 2
+    return compute
+
+
+def test_cancelled_leader_leaves_the_computation_to_followers():
+    async def scenario():
+        release, calls = threading.Event(), []
+        flight = SingleFlight("test", timeout=5)
+        compute = gated(release, calls)
+
+        leader = asyncio.ensure_future(flight.run("key", compute, 21))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(flight.run("key", compute, 21))
+        await asyncio.sleep(0.05)
+
+        leader.cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+
+        assert await follower == 42
+        assert leader.cancelled()
+        assert calls == [21]
+
+    asyncio.run(scenario())
+
+
+def test_each_caller_times_out_on_its_own_deadline():
+    async def scenario():
+        release, calls = threading.Event(), []
+        flight = SingleFlight("test")
+        compute = gated(release, calls)
+
+        leader = asyncio.ensure_future(flight.run("key", compute, 1, timeout=0.1))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(flight.run("key", compute, 1, timeout=5))
+
+        with pytest.raises(HTTPException) as excinfo:
+            await leader
+        assert excinfo.value.status_code == 504
+
+        # Still in flight after the leader gave up: a new caller joins it instead of starting another
+        latecomer = asyncio.ensure_future(flight.run("key", compute, 1, timeout=5))
+        await asyncio.sleep(0.05)
+        release.set()
+
+        assert await follower == 2
+        assert await latecomer == 2
+        assert calls == [1]
+        assert flight.stats()["in_flight"] == 0
+        assert (flight.executions, flight.coalesced, flight.timeouts) == (1, 2, 1)
+
+    asyncio.run(scenario())
+
+
+def test_failure_reaches_every_caller_and_is_counted_once():
+    async def scenario():
+        flight = SingleFlight("test", timeout=5)
+
+        def fail():
+            threading.Event().wait(0.1)
+            raise ValueError("broken")
+
+        results = await asyncio.gather(
+            flight.run("key", fail), flight.run("key", fail), return_exceptions=True
+        )
+        assert [type(result) for result in results] == [ValueError, ValueError]
+        assert flight.errors == 1
+
+    asyncio.run(scenario())
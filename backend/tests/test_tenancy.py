@@ -0,0 +1,96 @@
+"""
+The tenant-scope hook (app.utils.tenancy) on sessions and through /api/batch.
+
+Both users of the ``api`` fixture get an invoice, an expense category and an
+expense next to their client, so every scoped read has another tenant's rows
+to leave out.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models.client import Client
+from app.models.expense import Expense
+from app.models.expense_category import ExpenseCategory
+from app.models.invoice import Invoice
+from app.utils.tenancy import SKIP_TENANT_SCOPE, scope_session_to_user
+
+
+@pytest.fixture
+def tenants(api):
+    """The api fixture plus each user's (user id, client id, invoice id, expense id)."""
+    client, users, engine = api
+    db = SessionLocal(bind=engine)
+    rows = []
+    try:
+        for index, owner in enumerate(db.query(Client).order_by(Client.id).all(), start=1):
+            invoice = Invoice(
+                invoice_number=f"INV-T{index}", client_id=owner.id, issue_date=date(2026, 1, 1),
+                due_date=date(2026, 1, 31), total_amount=100.0 * index, created_by=owner.created_by,
+            )
+            category = ExpenseCategory(name=f"Travel {index}", created_by=owner.created_by)
+            db.add_all([invoice, category])
+            db.flush()
+            expense = Expense(
+                amount=10.0 * index, category_id=category.id, date=date(2026, 1, 2),
+                description="Taxi", created_by=owner.created_by,
+            )
+            db.add(expense)
+            db.flush()
+            rows.append((owner.created_by, owner.id, invoice.id, expense.id))
+        db.commit()
+    finally:
+        db.close()
+    return client, users, engine, rows
+
+
+def test_scoped_session_sees_only_its_users_rows(tenants):
+    _, _, engine, [(user_id, client_id, invoice_id, expense_id), (_, other_client, other_invoice, other_expense)] = tenants
+    db = SessionLocal(bind=engine)
+    try:
+        scope_session_to_user(db, user_id)
+        assert [row.id for row in db.query(Client)] == [client_id]
+        assert [row.id for row in db.query(Invoice)] == [invoice_id]
+        assert [row.id for row in db.query(Expense)] == [expense_id]
+
+        # Lookups by key, aggregates and joins are scoped as well
+        assert db.get(Invoice, other_invoice) is None
+        assert db.query(Client).filter(Client.id == other_client).first() is None
+        assert db.query(func.sum(Expense.amount)).scalar() == 10.0
+        assert db.query(Invoice.id).join(Client).filter(Client.id == other_client).all() == []
+        assert db.query(ExpenseCategory).count() == 1
+        assert db.query(Expense).filter(Expense.id == other_expense).count() == 0
+    finally:
+        db.close()
+
+
+def test_skip_tenant_scope_sees_every_user(tenants):
+    _, _, engine, rows = tenants
+    db = SessionLocal(bind=engine)
+    try:
+        scope_session_to_user(db, rows[0][0])
+        for model, column in ((Client, 1), (Invoice, 2), (Expense, 3)):
+            ids = db.query(model.id).order_by(model.id).execution_options(**{SKIP_TENANT_SCOPE: True}).all()
+            assert [row_id for (row_id,) in ids] == [row[column] for row in rows]
+    finally:
+        db.close()
+
+
+def test_batch_sub_requests_are_scoped_to_the_caller(tenants):
+    client, [(headers, _), _], _, [(_, client_id, invoice_id, _), (_, other_client, other_invoice, _)] = tenants
+
+    response = client.post("/api/batch", headers=headers, json={"requests": [
+        {"id": "clients", "path": "/api/clients"},
+        {"id": "invoices", "path": "/api/invoices"},
+        {"id": "other-client", "path": f"/api/clients/{other_client}"},
+        {"id": "other-invoice", "path": f"/api/invoices/{other_invoice}"},
+    ]})
+    assert response.status_code == 200
+    clients, invoices, other_client_entry, other_invoice_entry = response.json()["responses"]
+
+    assert [row["id"] for row in clients["body"]] == [client_id]
+    assert [row["id"] for row in invoices["body"]] == [invoice_id]
+    assert other_client_entry["status"] == 404
+    assert other_invoice_entry["status"] == 404